@@ -0,0 +1,240 @@
+import math
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# Admission control untuk endpoint prediksi: batas request yang sedang diproses (in-flight),
+# antrian tunggu berbatas, dan token bucket per klien. Request yang tidak bisa dilayani ditolak
+# lebih awal dengan 429 + Retry-After, alih-alih menumpuk di antrian server dan membuat
+# latensi semua klien memburuk.
+
+Rejection = namedtuple('Rejection', ['reason', 'retry_after'])
+
+
+def parse_client_limits(spec):
+    """
+    Mengubah string "klien=rate:burst,klien2=rate" (mis. dari env CLIENT_RATE_LIMITS) menjadi
+    dict {klien: (rate, burst)}. Burst default sama dengan rate (minimal 1).
+    """
+    limits = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        client_id, _, value = item.partition("=")
+        rate, _, burst = value.partition(":")
+        rate = float(rate)
+        limits[client_id.strip()] = (rate, float(burst) if burst else max(rate, 1.0))
+    return limits
+
+
+# --- 1. Token Bucket per Klien ---
+class TokenBucketLimiter:
+    """
+    Token bucket per klien: setiap request memakai satu token, token terisi `rate` per detik
+    hingga `burst`. Rate <= 0 berarti klien tersebut tidak dibatasi. Jumlah bucket dibatasi
+    `max_clients` (LRU); klien yang tergusur mulai lagi dengan bucket penuh.
+    """
+
+    def __init__(self, rate, burst=None, overrides=None, max_clients=10000):
+        self.default_limit = (float(rate), float(burst) if burst else max(float(rate), 1.0))
+        self.overrides = overrides or {}
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.default_limit[0] > 0 or any(rate > 0 for rate, _ in self.overrides.values())
+
+    def consume(self, client_id):
+        """Memakai satu token. Mengembalikan 0.0 jika diizinkan, atau detik sampai token berikutnya tersedia."""
+        rate, burst = self.overrides.get(client_id, self.default_limit)
+        if rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(client_id)
+            if bucket is None:
+                tokens = burst
+                if len(self._buckets) >= self.max_clients:
+                    self._buckets.popitem(last=False)
+            else:
+                self._buckets.move_to_end(client_id)
+                tokens = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            if tokens >= 1.0:
+                self._buckets[client_id] = [tokens - 1.0, now]
+                return 0.0
+            self._buckets[client_id] = [tokens, now]
+            return (1.0 - tokens) / rate
+
+
+# --- 2. Batas In-Flight dan Antrian ---
+class AdmissionController:
+    """
+    Membatasi request yang diproses bersamaan ke `max_in_flight`. Request berikutnya menunggu
+    di antrian berisi paling banyak `max_queue` request, masing-masing paling lama
+    `queue_timeout` detik; di luar itu request langsung ditolak.
+
+    Pada Gunicorn setiap worker punya controller sendiri, jadi batas berlaku per worker
+    (gauge memakai multiprocess_mode='livesum' sehingga /metrics menampilkan totalnya).
+    `limit_gauge{kind}` diisi oleh setiap proses yang melayani request (bukan saat import), agar
+    dengan preload_app nilainya dilaporkan per worker dan bukan sekali oleh master.
+    """
+
+    def __init__(self, max_in_flight, max_queue, queue_timeout=1.0, retry_after=1.0, rate_limiter=None,
+                 in_flight_gauge=None, queue_depth_gauge=None, rejections_counter=None, queue_wait_histogram=None,
+                 limit_gauge=None):
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+        self.rate_limiter = rate_limiter
+        self.in_flight_gauge = in_flight_gauge
+        self.queue_depth_gauge = queue_depth_gauge
+        self.rejections_counter = rejections_counter
+        self.queue_wait_histogram = queue_wait_histogram
+        self.limit_gauge = limit_gauge
+        self._limits_pid = None
+        self._slot_freed = threading.Condition()
+        self._in_flight = 0
+        self._waiting = 0
+
+    def _reject(self, reason, retry_after):
+        if self.rejections_counter is not None:
+            self.rejections_counter.labels(reason=reason).inc()
+        return Rejection(reason, retry_after)
+
+    def publish_limits(self):
+        """Mengisi limit_gauge untuk proses ini (sekali per pid; dipanggil juga dari hook post_fork Gunicorn)."""
+        if self.limit_gauge is not None and self._limits_pid != os.getpid():
+            self.limit_gauge.labels(kind='in_flight').set(self.max_in_flight)
+            self.limit_gauge.labels(kind='queue').set(self.max_queue)
+            self._limits_pid = os.getpid()
+
+    def _publish(self):
+        self.publish_limits()
+        if self.in_flight_gauge is not None:
+            self.in_flight_gauge.set(self._in_flight)
+        if self.queue_depth_gauge is not None:
+            self.queue_depth_gauge.set(self._waiting)
+
+    def check_rate(self, client_id):
+        """Token bucket klien; mengembalikan Rejection atau None."""
+        if self.rate_limiter is None:
+            return None
+        wait_seconds = self.rate_limiter.consume(client_id)
+        if wait_seconds > 0:
+            return self._reject('rate_limited', wait_seconds)
+        return None
+
+    def try_acquire_slot(self):
+        """Mengambil slot in-flight tanpa menunggu. Mengembalikan True jika berhasil."""
+        with self._slot_freed:
+            if self._in_flight < self.max_in_flight:
+                self._in_flight += 1
+                self._publish()
+                return True
+        return False
+
+    def acquire_slot(self):
+        """Mengambil slot in-flight, menunggu di antrian jika perlu. Mengembalikan Rejection atau None."""
+        with self._slot_freed:
+            if self._in_flight < self.max_in_flight:
+                self._in_flight += 1
+                self._publish()
+                return None
+            if self._waiting >= self.max_queue:
+                return self._reject('queue_full', self.retry_after)
+            self._waiting += 1
+            self._publish()
+            start = time.perf_counter()
+            admitted = self._slot_freed.wait_for(lambda: self._in_flight < self.max_in_flight, timeout=self.queue_timeout)
+            self._waiting -= 1
+            if admitted:
+                self._in_flight += 1
+            self._publish()
+        if self.queue_wait_histogram is not None:
+            self.queue_wait_histogram.observe(time.perf_counter() - start)
+        return None if admitted else self._reject('queue_timeout', self.retry_after)
+
+    def admit(self, client_id):
+        """Rate limit klien lalu slot in-flight (blocking). Mengembalikan Rejection atau None."""
+        return self.check_rate(client_id) or self.acquire_slot()
+
+    def release(self):
+        with self._slot_freed:
+            self._in_flight -= 1
+            self._publish()
+            self._slot_freed.notify()
+
+
+def retry_after_header(rejection):
+    # Retry-After HTTP berupa bilangan bulat detik
+    return str(max(1, math.ceil(rejection.retry_after)))
+
+
+# --- 3. Middleware WSGI ---
+class _ReleaseOnClose:
+    """Membungkus iterable response agar slot dilepas setelah body selesai dikirim (termasuk response streaming)."""
+
+    def __init__(self, iterable, release):
+        self._iterable = iterable
+        self._release = release
+        self._released = False
+
+    def __iter__(self):
+        return iter(self._iterable)
+
+    def close(self):
+        try:
+            if hasattr(self._iterable, 'close'):
+                self._iterable.close()
+        finally:
+            if not self._released:
+                self._released = True
+                self._release()
+
+
+def resolve_client_id(header_value, remote_addr, trust_header):
+    """Kunci token bucket: nilai header klien hanya jika header dipercaya, selain itu alamat IP peer."""
+    if trust_header and header_value:
+        return header_value
+    return remote_addr or 'unknown'
+
+
+class AdmissionMiddleware:
+    """
+    Middleware WSGI yang menjalankan AdmissionController untuk path berawalan `path_prefixes`.
+    Klien diidentifikasi dari alamat IP peer. Header `client_header` (mis. X-Client-Id) hanya dipakai
+    jika `trust_client_header=True`, yaitu saat header itu dipasang proxy tepercaya; tanpa itu klien
+    bisa lolos dari batasnya cukup dengan mengganti nilai header di setiap request.
+    """
+
+    def __init__(self, app, controller, path_prefixes=('/predict',), client_header='X-Client-Id',
+                 trust_client_header=False):
+        self.app = app
+        self.controller = controller
+        self.path_prefixes = tuple(path_prefixes)
+        self.client_environ_key = 'HTTP_' + client_header.upper().replace('-', '_')
+        self.trust_client_header = trust_client_header
+
+    def client_id(self, environ):
+        return resolve_client_id(environ.get(self.client_environ_key), environ.get('REMOTE_ADDR'),
+                                 self.trust_client_header)
+
+    def __call__(self, environ, start_response):
+        if not environ.get('PATH_INFO', '').startswith(self.path_prefixes):
+            return self.app(environ, start_response)
+        rejection = self.controller.admit(self.client_id(environ))
+        if rejection is not None:
+            body = f'{{"error": "Server sibuk ({rejection.reason}), coba lagi nanti."}}'.encode()
+            start_response('429 Too Many Requests', [('Content-Type', 'application/json'),
+                                                     ('Content-Length', str(len(body))),
+                                                     ('Retry-After', retry_after_header(rejection))])
+            return [body]
+        try:
+            return _ReleaseOnClose(self.app(environ, start_response), self.controller.release)
+        except BaseException:
+            self.controller.release()
+            raise
@@ -0,0 +1,143 @@
+# Front-end ASGI untuk model churn, berdampingan dengan `prometheus_exporter:dispatcher` (Flask/waitress).
+# Jalankan dengan: uvicorn asgi_app:app --host 0.0.0.0 --port 5001
+#
+# Endpoint: /predict (model dipilih lewat header X-Model-Name/X-Model-Version), /predict/{nama}/{versi},
+# /models dan /metrics. /predict/bulk, /predict/by-id dan /admin/* hanya tersedia di front-end WSGI:
+# endpoint itu bukan jalur latensi rendah (upload streaming, operasi admin) dan tetap dilayani
+# prometheus_exporter:dispatcher.
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import orjson
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import PlainTextResponse, Response
+from starlette.routing import Route
+import prometheus_exporter as core
+from admission_control import resolve_client_id, retry_after_header
+from traffic_recorder import REPLAY_HEADER, recorded_headers
+from response_formats import (JSON, FLOAT32, FLOAT32_COLUMNS, EXPLAIN_MIMETYPES, UnsupportedFormat, decode_request,
+                              encode_response, negotiate, request_format)
+
+# --- 1. Executor Scoring Terbatas ---
+# Scoring bersifat CPU-bound, jadi dijalankan di thread pool agar event loop tetap responsif.
+# Semaphore membatasi jumlah pekerjaan yang menunggu executor supaya antriannya tidak tumbuh tanpa batas.
+SCORING_THREADS = int(os.environ.get("SCORING_THREADS", "4"))
+SCORING_MAX_PENDING = int(os.environ.get("SCORING_MAX_PENDING", str(SCORING_THREADS * 4)))
+scoring_executor = ThreadPoolExecutor(max_workers=SCORING_THREADS, thread_name_prefix="scoring")
+scoring_slots = None
+metrics_registry = core.metrics_registry()
+
+
+def json_response(content, status_code=200):
+    return Response(orjson.dumps(content), status_code=status_code, media_type="application/json")
+
+
+# --- 2. Endpoint ---
+async def predict(request):
+    if core.traffic_recorder is not None and not request.headers.get(REPLAY_HEADER):
+        core.traffic_recorder.record(request.method, request.url.path + (f"?{request.url.query}" if request.url.query else ""),
+                                     recorded_headers(request.headers), await request.body())
+    # Admission control yang sama dengan front-end WSGI; menunggu slot dilakukan di threadpool
+    # agar event loop tidak ikut terblokir
+    client_id = resolve_client_id(request.headers.get(core.ADMISSION_CLIENT_HEADER),
+                                  request.client.host if request.client else None, core.ADMISSION_TRUST_CLIENT_HEADER)
+    rejection = core.admission.check_rate(client_id)
+    if rejection is None and not core.admission.try_acquire_slot():
+        rejection = await run_in_threadpool(core.admission.acquire_slot)
+    if rejection is not None:
+        return Response(orjson.dumps({"error": f"Server sibuk ({rejection.reason}), coba lagi nanti."}), status_code=429,
+                        media_type="application/json", headers={"Retry-After": retry_after_header(rejection)})
+    try:
+        return await score_request(request)
+    finally:
+        core.admission.release()
+
+
+async def score_request(request):
+    global scoring_slots
+    start_time = time.time()
+    # Model registry dipilih lewat URL (/predict/{nama}/{versi}) atau header; memuat model bisa lama,
+    # jadi dijalankan di luar event loop
+    if "name" in request.path_params:
+        model_name, model_version = request.path_params["name"], request.path_params["version"]
+    else:
+        model_name, model_version = request.headers.get("x-model-name"), request.headers.get("x-model-version")
+    try:
+        bundle = None
+        if model_name:
+            bundle = await run_in_threadpool(core.registry_bundle, model_name, model_version)
+    except core.ModelNotFound as e:
+        core.PREDICTION_FAILURES.inc()
+        return json_response({"error": str(e.args[0])}, status_code=404)
+    except Exception as e:
+        core.PREDICTION_FAILURES.inc()
+        core.logger.error("model_registry_gagal_dimuat", model=model_name, error=str(e))
+        return json_response({"error": f"Gagal memuat model {model_name!r}: {e}"}, status_code=503)
+    if bundle is None and core.current_model() is None:
+        core.PREDICTION_FAILURES.inc()
+        core.logger.error("model_belum_dimuat", endpoint="/predict")
+        return json_response({"error": "Model not loaded"}, status_code=500)
+
+    core.PREDICTION_REQUESTS.inc()
+
+    response_mimetype = negotiate(request.headers.get("accept"))
+    if response_mimetype is None:
+        core.PREDICTION_FAILURES.inc()
+        return json_response({"error": "Format pada header Accept tidak didukung."}, status_code=406)
+    if core.explain_requested(request.query_params) and response_mimetype not in EXPLAIN_MIMETYPES:
+        core.PREDICTION_FAILURES.inc()
+        return json_response({"error": core.EXPLAIN_NOT_ACCEPTABLE}, status_code=406)
+    try:
+        request_mimetype = request_format(request.headers.get("content-type", "").split(";")[0].strip())
+    except UnsupportedFormat as e:
+        core.PREDICTION_FAILURES.inc()
+        return json_response({"error": str(e)}, status_code=415)
+
+    try:
+        body = await request.body()
+        with core.stage_latency.time('parse'):
+            if request_mimetype != JSON:
+                raw_data = decode_request(request_mimetype, body)
+            else:
+                raw_data = orjson.loads(body)
+        if scoring_slots is None:
+            scoring_slots = asyncio.Semaphore(SCORING_MAX_PENDING)
+        async with scoring_slots:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(scoring_executor, core.predict_records, raw_data, start_time, bundle,
+                                                  core.explain_top_k(request.query_params))
+        with core.stage_latency.time('serialize'):
+            if response_mimetype == JSON:
+                return json_response(core.to_json_ready(response))
+            headers = {"X-Columns": FLOAT32_COLUMNS} if response_mimetype == FLOAT32 else None
+            return Response(encode_response(response, response_mimetype), media_type=response_mimetype, headers=headers)
+
+    except Exception as e:
+        core.PREDICTION_FAILURES.inc()
+        core.logger.error("prediksi_gagal", error=str(e))
+        return json_response({"error": str(e)}, status_code=400)
+
+
+async def metrics(request):
+    return Response(generate_latest(metrics_registry), media_type=CONTENT_TYPE_LATEST)
+
+
+async def models(request):
+    return json_response(core.available_models())
+
+
+async def home(request):
+    return PlainTextResponse("Churn Prediction Model Serving App. Gunakan endpoint /predict untuk prediksi.")
+
+
+# --- 3. Aplikasi ASGI ---
+app = Starlette(routes=[
+    Route('/', home),
+    Route('/predict', predict, methods=['POST']),
+    Route('/predict/{name}/{version}', predict, methods=['POST']),
+    Route('/models', models),
+    Route('/metrics', metrics),
+])
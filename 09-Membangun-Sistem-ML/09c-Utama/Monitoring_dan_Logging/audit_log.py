@@ -0,0 +1,221 @@
+import atexit
+import glob
+import os
+import threading
+import time
+import uuid
+import numpy as np
+
+# Audit log prediksi: setiap baris yang di-skor (input mentah, prediksi, probabilitas, versi model,
+# latensi) ditambahkan ke buffer kolumnar di memori, lalu thread latar menulisnya ke file
+# Parquet/Arrow baru setiap kali buffer mencapai batas ukuran atau umur (rotasi per flush).
+
+# Kolom input mengikuti format telco-dataset.csv mentah (tanpa Churn), sehingga file audit bisa
+# langsung diproses initial_cleaning di automate_Reisya-Junita.py.
+RAW_COLUMNS = [
+    'customerID', 'gender', 'SeniorCitizen', 'Partner', 'Dependents', 'tenure', 'PhoneService',
+    'MultipleLines', 'InternetService', 'OnlineSecurity', 'OnlineBackup', 'DeviceProtection',
+    'TechSupport', 'StreamingTV', 'StreamingMovies', 'Contract', 'PaperlessBilling', 'PaymentMethod',
+    'MonthlyCharges', 'TotalCharges',
+]
+RAW_NUMERIC_COLUMNS = ('tenure', 'MonthlyCharges', 'TotalCharges')
+AUDIT_COLUMNS = ['request_id', 'scored_at', 'model_version', 'latency_seconds', 'prediction', 'probability_churn']
+FILE_EXTENSIONS = {"parquet": ".parquet", "arrow": ".arrow"}
+
+
+def _label_array(values):
+    """
+    Kolom prediksi mengikuti tipe classes_ model: label integer (berapa pun nilainya) disimpan
+    int64, label lain (mis. 'Yes'/'No') sebagai string, sehingga model apa pun tidak menggagalkan flush.
+    """
+    import pyarrow as pa
+    if all(isinstance(value, int) for value in values):
+        return pa.array(values, type=pa.int64())
+    return pa.array([None if value is None else str(value) for value in values], type=pa.string())
+
+
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class AuditLogSink:
+    """
+    Buffer kolumnar (satu list per kolom) yang di-flush ke `output_dir` oleh thread latar.
+    `append()` hanya memperpanjang list di bawah lock; konversi tipe dan penulisan file terjadi
+    di thread flush. Jika penulisan tertinggal dan buffer melewati `max_buffer_rows`, baris baru
+    dibuang dan dihitung (request tidak pernah menunggu disk).
+    """
+
+    def __init__(self, output_dir, file_format="parquet", flush_rows=50000, flush_seconds=60.0,
+                 max_buffer_rows=500000, rows_written_counter=None, rows_dropped_counter=None,
+                 flush_duration_histogram=None, buffer_rows_gauge=None):
+        if file_format not in FILE_EXTENSIONS:
+            raise ValueError(f"Format audit log tidak didukung: {file_format!r} (pilih parquet atau arrow).")
+        self.output_dir = output_dir
+        self.file_format = file_format
+        self.flush_rows = flush_rows
+        self.flush_seconds = flush_seconds
+        self.max_buffer_rows = max_buffer_rows
+        self.rows_written_counter = rows_written_counter
+        self.rows_dropped_counter = rows_dropped_counter
+        self.flush_duration_histogram = flush_duration_histogram
+        self.buffer_rows_gauge = buffer_rows_gauge
+        os.makedirs(output_dir, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._flush_requested = threading.Event()
+        self._buffer = self._empty_buffer()
+        self._rows = 0
+        self._oldest = None
+        self._sequence = 0
+        self._worker = None
+        self._worker_pid = None
+        atexit.register(self.flush)
+
+    @staticmethod
+    def _empty_buffer():
+        return {col: [] for col in RAW_COLUMNS + AUDIT_COLUMNS}
+
+    # --- 1. Append (jalur request) ---
+    def append(self, records, predictions, churn_probabilities, model_version, latency_seconds):
+        self._ensure_worker()
+        n_rows = len(records)
+        request_id = uuid.uuid4().hex
+        now = time.time()
+        with self._lock:
+            if self._rows + n_rows > self.max_buffer_rows:
+                dropped = True
+            else:
+                dropped = False
+                buffer = self._buffer
+                for col in RAW_COLUMNS:
+                    buffer[col].extend([record.get(col) for record in records])
+                buffer['request_id'].extend([request_id] * n_rows)
+                buffer['scored_at'].extend([now] * n_rows)
+                buffer['model_version'].extend([str(model_version)] * n_rows)
+                buffer['latency_seconds'].extend([latency_seconds] * n_rows)
+                buffer['prediction'].extend(predictions.tolist())
+                buffer['probability_churn'].extend(churn_probabilities.tolist())
+                if self._oldest is None:
+                    self._oldest = now
+                self._rows += n_rows
+                rows = self._rows
+        if dropped:
+            if self.rows_dropped_counter is not None:
+                self.rows_dropped_counter.inc(n_rows)
+            return
+        if self.buffer_rows_gauge is not None:
+            self.buffer_rows_gauge.set(rows)
+        if rows >= self.flush_rows:
+            self._flush_requested.set()
+
+    # --- 2. Flush ke File Kolumnar (thread latar) ---
+    def _to_table(self, buffer):
+        import pyarrow as pa
+        columns = {}
+        for col in RAW_COLUMNS:
+            values = buffer[col]
+            if col in RAW_NUMERIC_COLUMNS:
+                array = np.fromiter((_as_float(v) for v in values), dtype=np.float64, count=len(values))
+                columns[col] = pa.array(array, mask=np.isnan(array))
+            else:
+                columns[col] = pa.array([None if v is None else str(v) for v in values], type=pa.string())
+        columns['request_id'] = pa.array(buffer['request_id'], type=pa.string())
+        scored_at_us = (np.array(buffer['scored_at'], dtype=np.float64) * 1e6).astype(np.int64)
+        columns['scored_at'] = pa.array(scored_at_us, type=pa.timestamp('us', tz='UTC'))
+        columns['model_version'] = pa.array(buffer['model_version'], type=pa.string())
+        columns['latency_seconds'] = pa.array(buffer['latency_seconds'], type=pa.float64())
+        columns['prediction'] = _label_array(buffer['prediction'])
+        columns['probability_churn'] = pa.array(buffer['probability_churn'], type=pa.float64())
+        return pa.table(columns)
+
+    def _write(self, table, sequence):
+        name = f"audit-{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{os.getpid()}-{sequence:05d}"
+        path = os.path.join(self.output_dir, name + FILE_EXTENSIONS[self.file_format])
+        tmp_path = path + ".tmp"
+        if self.file_format == "parquet":
+            import pyarrow.parquet as pq
+            pq.write_table(table, tmp_path)
+        else:
+            import pyarrow.feather as feather
+            feather.write_feather(table, tmp_path)
+        # Rename atomik agar pembaca tidak pernah melihat file setengah jadi
+        os.replace(tmp_path, path)
+        return path
+
+    def flush(self):
+        """Menulis isi buffer saat ini ke satu file baru. Mengembalikan path file atau None."""
+        with self._lock:
+            if self._rows == 0:
+                return None
+            buffer, rows = self._buffer, self._rows
+            self._buffer, self._rows, self._oldest = self._empty_buffer(), 0, None
+            self._sequence += 1
+            sequence = self._sequence
+        if self.buffer_rows_gauge is not None:
+            self.buffer_rows_gauge.set(0)
+
+        start = time.perf_counter()
+        try:
+            path = self._write(self._to_table(buffer), sequence)
+        except Exception as e:
+            if self.rows_dropped_counter is not None:
+                self.rows_dropped_counter.inc(rows)
+            print(f"[ERROR] Gagal menulis audit log ({rows} baris): {e}")
+            return None
+        if self.flush_duration_histogram is not None:
+            self.flush_duration_histogram.observe(time.perf_counter() - start)
+        if self.rows_written_counter is not None:
+            self.rows_written_counter.inc(rows)
+        return path
+
+    def _ensure_worker(self):
+        # Thread tidak ikut tersalin saat fork, jadi flusher dibuat ulang per proses
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="audit-log", daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def _run(self):
+        while True:
+            self._flush_requested.wait(timeout=min(self.flush_seconds, 1.0))
+            self._flush_requested.clear()
+            oldest = self._oldest
+            if self._rows >= self.flush_rows or (oldest is not None and time.time() - oldest >= self.flush_seconds):
+                self.flush()
+
+
+# --- 3. Membaca Audit Log untuk Retraining ---
+def load_audit_log(path_or_dir, raw_only=True):
+    """
+    Membaca satu file atau semua file audit di folder menjadi DataFrame.
+    Dengan raw_only=True hanya kolom format telco mentah yang dikembalikan, siap untuk
+    initial_cleaning(); kolom audit (prediksi, versi model, latensi) ikut jika raw_only=False.
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    if os.path.isdir(path_or_dir):
+        paths = sorted(glob.glob(os.path.join(path_or_dir, "audit-*.parquet")) +
+                       glob.glob(os.path.join(path_or_dir, "audit-*.arrow")))
+    else:
+        paths = [path_or_dir]
+    tables = [pq.read_table(p) if p.endswith(".parquet") else feather.read_table(p) for p in paths]
+    # File dari model berlabel integer dan berlabel string bisa bercampur di satu folder; samakan ke string
+    if len({table.schema.field('prediction').type for table in tables}) > 1:
+        tables = [table.set_column(table.schema.get_field_index('prediction'), 'prediction',
+                                   table['prediction'].cast(pa.string())) for table in tables]
+    df = pa.concat_tables(tables).to_pandas()
+    # initial_cleaning memeriksa dtype == 'object' untuk kolom kategorikal (mis. SeniorCitizen),
+    # jadi kolom string dikembalikan sebagai object seperti hasil pd.read_csv
+    for col in RAW_COLUMNS:
+        if col not in RAW_NUMERIC_COLUMNS:
+            df[col] = df[col].astype(object)
+    return df[RAW_COLUMNS] if raw_only else df
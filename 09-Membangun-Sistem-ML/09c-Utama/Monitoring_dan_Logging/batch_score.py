@@ -0,0 +1,143 @@
+import argparse
+import contextlib
+import importlib.util
+import io
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from churn_scorer import ChurnScorer
+from feature_encoder import ChurnFeatureEncoder, final_columns
+
+# Scoring ulang seluruh basis pelanggan secara offline (tanpa HTTP):
+# CSV mentah dibaca per chunk -> initial_cleaning -> encode -> scoring di process pool -> CSV/Parquet.
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+AUTOMATE_SCRIPT_PATH = os.path.join(BASE_DIR, "..", "..", "09a-Eksperimen", "preprocessing", "automate_Reisya-Junita.py")
+DEFAULT_MODEL_PATH = os.environ.get("MODEL_PATH", "./tuned-churn-model-dagshub/tuned-churn-model-dagshub")
+DEFAULT_CHUNK_SIZE = 50000
+
+
+# --- 1. Pembersihan yang Sama dengan Pipeline Preprocessing ---
+def load_initial_cleaning(script_path=AUTOMATE_SCRIPT_PATH):
+    """Memuat fungsi `initial_cleaning` dari automate_Reisya-Junita.py (nama file tidak bisa di-import biasa)."""
+    spec = importlib.util.spec_from_file_location("automate_preprocessing", script_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.initial_cleaning
+
+
+# --- 2. State per Proses Worker ---
+# Model, encoder, dan fungsi cleaning dimuat sekali per proses oleh initializer, bukan per chunk.
+_worker = {}
+
+
+def load_scoring_model(model_path, compiled_model_path=None):
+    if compiled_model_path:
+        from compiled_model import load_compiled_model
+        return load_compiled_model(compiled_model_path)
+    import mlflow.sklearn
+    return mlflow.sklearn.load_model(model_path)
+
+
+def init_worker(model_path, compiled_model_path, threshold):
+    model = load_scoring_model(model_path, compiled_model_path)
+    _worker['scorer'] = ChurnScorer(model, threshold=threshold, columns=final_columns)
+    _worker['encoder'] = ChurnFeatureEncoder(final_columns)
+    _worker['initial_cleaning'] = load_initial_cleaning()
+
+
+def score_chunk(df_chunk):
+    """Membersihkan, meng-encode, dan men-skor satu chunk; mengembalikan DataFrame hasil."""
+    customer_ids = df_chunk['customerID'].to_numpy() if 'customerID' in df_chunk.columns else None
+    # initial_cleaning mencetak log untuk setiap panggilan; di sini dibungkam agar output tidak banjir
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_cleaned = _worker['initial_cleaning'](df_chunk)
+    X = _worker['encoder'].encode(df_cleaned.to_dict('records'))
+    predictions, churn_probabilities = _worker['scorer'].score(X)
+
+    result = pd.DataFrame({'prediction': predictions.astype(np.int8), 'probability_churn': churn_probabilities})
+    if customer_ids is not None:
+        result.insert(0, 'customerID', customer_ids)
+    return result
+
+
+# --- 3. Penulis Output (CSV atau Parquet) ---
+class PredictionWriter:
+    def __init__(self, output_path):
+        self.output_path = output_path
+        self.is_parquet = output_path.endswith((".parquet", ".pq"))
+        self._parquet_writer = None
+        self._wrote_header = False
+
+    def write(self, result):
+        if self.is_parquet:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+            table = pa.Table.from_pandas(result, preserve_index=False)
+            if self._parquet_writer is None:
+                self._parquet_writer = pq.ParquetWriter(self.output_path, table.schema)
+            self._parquet_writer.write_table(table)
+        else:
+            result.to_csv(self.output_path, mode='a' if self._wrote_header else 'w',
+                          header=not self._wrote_header, index=False)
+            self._wrote_header = True
+
+    def close(self):
+        if self._parquet_writer is not None:
+            self._parquet_writer.close()
+
+
+# --- 4. Pipeline Batch ---
+def run_batch(input_path, output_path, workers, chunk_size, model_path, compiled_model_path=None, threshold=0.5):
+    """
+    Membaca CSV per chunk dan membagikannya ke process pool. Jumlah chunk yang sedang diproses
+    dibatasi (2 x workers) agar memori tetap datar; hasil ditulis berurutan sesuai input.
+    Mengembalikan (jumlah baris, durasi detik).
+    """
+    start = time.perf_counter()
+    writer = PredictionWriter(output_path)
+    n_rows = 0
+    max_in_flight = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker,
+                             initargs=(model_path, compiled_model_path, threshold)) as executor:
+        pending = []
+        for df_chunk in pd.read_csv(input_path, chunksize=chunk_size):
+            pending.append(executor.submit(score_chunk, df_chunk))
+            if len(pending) >= max_in_flight:
+                result = pending.pop(0).result()
+                writer.write(result)
+                n_rows += len(result)
+        for future in pending:
+            result = future.result()
+            writer.write(result)
+            n_rows += len(result)
+    writer.close()
+    return n_rows, time.perf_counter() - start
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch scoring churn offline dari CSV mentah format telco.")
+    parser.add_argument("input_path", help="CSV mentah (format telco-dataset.csv)")
+    parser.add_argument("output_path", help="File hasil: .csv atau .parquet")
+    parser.add_argument("--model-path", default=DEFAULT_MODEL_PATH)
+    parser.add_argument("--compiled-model-path", default=os.environ.get("COMPILED_MODEL_PATH"),
+                        help="Opsional: model .npz dari compiled_model.py (lebih cepat, tanpa sklearn/mlflow)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--workers", type=int, nargs="+", default=[os.cpu_count() or 1],
+                        help="Satu atau lebih jumlah worker; setiap nilai dijalankan dan rows/sec-nya dilaporkan")
+    parser.add_argument("--threshold", type=float, default=float(os.environ.get("DECISION_THRESHOLD", "0.5")))
+    args = parser.parse_args()
+
+    print(f"--- Batch Scoring: {args.input_path} -> {args.output_path} (chunk {args.chunk_size}) ---")
+    print(f"{'workers':>8} | {'rows':>10} | {'detik':>8} | {'rows/sec':>12}")
+    print("-" * 48)
+    for workers in args.workers:
+        n_rows, elapsed = run_batch(args.input_path, args.output_path, workers, args.chunk_size,
+                                    args.model_path, args.compiled_model_path, args.threshold)
+        print(f"{workers:>8} | {n_rows:>10} | {elapsed:>8.2f} | {n_rows / elapsed:>12,.0f}")
+    print(f"[INFO] Prediksi disimpan di {args.output_path}")
+    print("--- Batch Scoring Selesai ---")
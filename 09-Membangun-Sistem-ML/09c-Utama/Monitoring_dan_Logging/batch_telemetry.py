@@ -0,0 +1,110 @@
+import weakref
+from importlib.metadata import version
+import numpy as np
+
+# Telemetri distribusi fitur per batch: satu kolom dibucket sekaligus dengan NumPy,
+# lalu setiap bucket Prometheus di-update sekali (bukan satu observe()/inc() per nilai).
+# observe_histogram_batch menulis atribut privat Histogram (_upper_bounds, _buckets, _sum), jadi
+# prometheus-client di-pin di requirements.txt dan atribut itu diperiksa untuk setiap histogram
+# pada pemakaian pertama (exporter juga memeriksa histogram fiturnya saat start).
+
+# Label `contract` dibatasi ke kategori yang dikenal agar string sembarang dari klien
+# tidak menambah time series baru tanpa batas.
+KNOWN_CONTRACTS = ('Month-to-month', 'One year', 'Two year')
+OTHER_LABEL = 'other'
+
+# Di bawah ukuran ini overhead NumPy lebih mahal dari loop biasa (request 1 baris tetap cepat)
+SMALL_BATCH_ROWS = 16
+
+
+# --- 1. Ekstraksi Kolom dari Records ---
+def _as_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def numeric_column(records, field):
+    """Mengambil satu field numerik dari list of dict; nilai hilang/non-numerik dibuang (seperti to_numeric coerce)."""
+    values = np.fromiter((_as_float(record.get(field)) for record in records), dtype=np.float64, count=len(records))
+    return values[~np.isnan(values)]
+
+
+def _category_code(value, index, other_index):
+    if value is None:
+        return -1
+    try:
+        return index.get(value, other_index)
+    except TypeError:
+        # Nilai tak-hashable (list/dict dari JSON) diperlakukan seperti kategori asing
+        return other_index
+
+
+def count_categories(records, field, known_values, other_label=OTHER_LABEL):
+    """
+    Menghitung kemunculan kategori dengan np.bincount. Nilai di luar `known_values` digabung ke
+    `other_label`; record tanpa field tersebut tidak dihitung. Mengembalikan dict {label: jumlah > 0}.
+    """
+    if len(records) < SMALL_BATCH_ROWS:
+        counts = {}
+        for record in records:
+            value = record.get(field)
+            if value is not None:
+                label = value if value in known_values else other_label
+                counts[label] = counts.get(label, 0) + 1
+        return counts
+
+    index = {value: i for i, value in enumerate(known_values)}
+    other_index = len(known_values)
+    codes = np.fromiter((_category_code(record.get(field), index, other_index) for record in records),
+                        dtype=np.intp, count=len(records))
+    counts = np.bincount(codes[codes >= 0], minlength=other_index + 1)
+    labels = list(known_values) + [other_label]
+    return {labels[i]: int(counts[i]) for i in np.flatnonzero(counts)}
+
+
+# --- 2. Update Kolektor Prometheus per Bucket ---
+# Histogram yang sudah lolos check_histogram_internals (diperiksa sekali per objek)
+_checked_histograms = weakref.WeakSet()
+
+
+def check_histogram_internals(histogram):
+    """
+    Gagal keras (RuntimeError) jika `histogram` tidak punya atribut privat yang ditulis
+    observe_histogram_batch, mis. setelah prometheus-client di-upgrade melewati versi yang di-pin.
+    """
+    upper_bounds = getattr(histogram, '_upper_bounds', None)
+    buckets = getattr(histogram, '_buckets', None)
+    if (not isinstance(upper_bounds, list) or not isinstance(buckets, list) or len(buckets) != len(upper_bounds)
+            or not all(hasattr(bucket, 'inc') for bucket in buckets) or not hasattr(getattr(histogram, '_sum', None), 'inc')):
+        raise RuntimeError(f"prometheus-client {version('prometheus-client')} tidak kompatibel dengan "
+                           f"observe_histogram_batch (_upper_bounds/_buckets/_sum berubah); gunakan versi di requirements.txt.")
+    _checked_histograms.add(histogram)
+
+
+def observe_histogram_batch(histogram, values):
+    """
+    Setara dengan `histogram.observe(v)` untuk setiap v, tetapi bucket dihitung dengan
+    np.searchsorted + np.bincount dan setiap bucket hanya di-inc sekali.
+    Bucket dicari dengan side='left' sehingga v masuk ke bucket pertama dengan v <= batas atas,
+    sama seperti Histogram.observe.
+    """
+    if histogram not in _checked_histograms:
+        check_histogram_internals(histogram)
+    values = np.asarray(values, dtype=np.float64)
+    if values.size < SMALL_BATCH_ROWS:
+        for value in values.tolist():
+            histogram.observe(value)
+        return
+    upper_bounds = np.asarray(histogram._upper_bounds, dtype=np.float64)
+    bucket_counts = np.bincount(np.searchsorted(upper_bounds, values, side='left'), minlength=len(upper_bounds))
+    for i in np.flatnonzero(bucket_counts):
+        histogram._buckets[i].inc(int(bucket_counts[i]))
+    histogram._sum.inc(float(values.sum()))
+
+
+def inc_counter_batch(counter, label_name, counts):
+    """Menambahkan hasil count_categories ke Counter berlabel, satu inc() per label."""
+    for label, count in counts.items():
+        counter.labels(**{label_name: label}).inc(count)
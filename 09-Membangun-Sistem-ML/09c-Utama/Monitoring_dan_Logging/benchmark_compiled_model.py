@@ -0,0 +1,63 @@
+import os
+import time
+import warnings
+import numpy as np
+from compiled_model import compile_model, load_compiled_model, save_compiled_model
+from reference_models import train_reference_random_forest
+
+# --- KONFIGURASI ---
+MODEL_PATH = os.environ.get("MODEL_PATH", "./tuned-churn-model-dagshub/tuned-churn-model-dagshub")
+BATCH_SIZES = [1, 32, 1024]
+REPEATS = {1: 300, 32: 200, 1024: 50}
+TOLERANCE = 1e-9
+
+# Model dilatih dengan DataFrame; benchmark memakai ndarray seperti jalur serving
+warnings.filterwarnings("ignore", message="X does not have valid feature names")
+
+
+def measure(fn, X, repeats):
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings, 50)
+
+
+def benchmark_model(label, sk_model, X_pool, tmp_path):
+    # Bandingkan versi yang sudah melewati save/load, sama seperti yang dipakai serving
+    save_compiled_model(compile_model(sk_model), tmp_path)
+    compiled = load_compiled_model(tmp_path)
+
+    for batch_size in BATCH_SIZES:
+        X = X_pool[:batch_size]
+        max_diff = np.max(np.abs(sk_model.predict_proba(X) - compiled.predict_proba(X)))
+        if max_diff > TOLERANCE or not np.array_equal(sk_model.predict(X), compiled.predict(X)):
+            raise AssertionError(f"{label} batch {batch_size}: selisih {max_diff:.3e} melebihi toleransi")
+
+        sk_p50 = measure(sk_model.predict_proba, X, REPEATS[batch_size])
+        compiled_p50 = measure(compiled.predict_proba, X, REPEATS[batch_size])
+        print(f"{label:<20} | {batch_size:>6} | {sk_p50 * 1e3:>12.4f} | {compiled_p50 * 1e3:>14.4f} | "
+              f"{sk_p50 / compiled_p50:>7.1f}x | {max_diff:>9.1e}")
+    os.remove(tmp_path)
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    print("Melatih ulang RandomForest referensi dari parameter run tuning RF...")
+    rf_model, X_test = train_reference_random_forest()
+    X_pool = X_test.to_numpy()
+    while len(X_pool) < max(BATCH_SIZES):
+        X_pool = np.vstack([X_pool, X_pool])
+
+    print("--- Benchmark predict_proba: sklearn vs model terkompilasi NumPy ---")
+    print(f"{'model':<20} | {'batch':>6} | {'sklearn (ms)':>12} | {'compiled (ms)':>14} | {'speedup':>8} | {'max |diff|':>9}")
+    print("-" * 86)
+    benchmark_model("RandomForest", rf_model, X_pool, "./_bench_rf.npz")
+
+    if os.path.exists(MODEL_PATH):
+        import mlflow.sklearn
+        benchmark_model("LogisticRegression", mlflow.sklearn.load_model(MODEL_PATH), X_pool, "./_bench_lr.npz")
+    else:
+        print(f"[WARNING] Model di {MODEL_PATH} tidak ditemukan, benchmark LogisticRegression dilewati.")
+    print("--- Benchmark Selesai ---")
@@ -0,0 +1,78 @@
+import time
+import tracemalloc
+import numpy as np
+import pandas as pd
+from feature_encoder import ChurnFeatureEncoder, final_columns
+from inference import create_sample_data
+
+# --- KONFIGURASI ---
+BATCH_SIZES = [1, 100, 10000]
+# Jumlah pengulangan per batch size (batch besar cukup diulang lebih sedikit)
+REPEATS = {1: 2000, 100: 500, 10000: 30}
+
+
+# --- 1. Dua Jalur Encoding yang Dibandingkan ---
+def encode_with_pandas(records):
+    """Jalur lama di prometheus_exporter: DataFrame -> get_dummies -> reindex."""
+    df_raw = pd.DataFrame(records)
+    df_encoded = pd.get_dummies(df_raw).astype(float)
+    return df_encoded.reindex(columns=final_columns, fill_value=0)
+
+
+def make_encoder_path(encoder):
+    def encode_with_encoder(records):
+        return encoder.encode(records)
+    return encode_with_encoder
+
+
+# --- 2. Pengukuran Latensi dan Alokasi ---
+def measure_latency(fn, records, repeats):
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(records)
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings, 50), np.percentile(timings, 99)
+
+
+def measure_allocations(fn, records, repeats=5):
+    """Mengukur puncak alokasi (tracemalloc) dan total blok yang dialokasikan per panggilan."""
+    fn(records)  # warm-up agar cache/import tidak ikut terhitung
+    peaks, blocks = [], []
+    for _ in range(repeats):
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        fn(records)
+        after = tracemalloc.take_snapshot()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak)
+        blocks.append(sum(max(stat.count_diff, 0) for stat in after.compare_to(before, 'filename')))
+    return int(np.median(peaks)), int(np.median(blocks))
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    encoder = ChurnFeatureEncoder(final_columns)
+    paths = [
+        ("pandas get_dummies", encode_with_pandas),
+        ("ChurnFeatureEncoder", make_encoder_path(encoder)),
+    ]
+
+    print("--- Benchmark Encoding: pd.get_dummies vs ChurnFeatureEncoder ---")
+    print(f"{'batch':>6} | {'jalur':<20} | {'p50 (ms)':>10} | {'p99 (ms)':>10} | {'peak alloc (KiB)':>16} | {'blok baru':>9}")
+    print("-" * 88)
+    for batch_size in BATCH_SIZES:
+        records = create_sample_data(num_samples=batch_size)
+
+        # Pastikan kedua jalur menghasilkan matriks yang sama sebelum diukur
+        expected = encode_with_pandas(records).to_numpy()
+        actual = encoder.encode(records)
+        if not np.array_equal(expected, actual):
+            raise AssertionError(f"Hasil encoding berbeda untuk batch {batch_size}")
+
+        for name, fn in paths:
+            p50, p99 = measure_latency(fn, records, REPEATS[batch_size])
+            peak, blocks = measure_allocations(fn, records)
+            print(f"{batch_size:>6} | {name:<20} | {p50 * 1e3:>10.4f} | {p99 * 1e3:>10.4f} | {peak / 1024:>16.1f} | {blocks:>9}")
+    print("--- Benchmark Selesai ---")
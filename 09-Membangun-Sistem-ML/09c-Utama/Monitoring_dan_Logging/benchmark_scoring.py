@@ -0,0 +1,65 @@
+import os
+import time
+import numpy as np
+from churn_scorer import ChurnScorer
+from feature_encoder import final_columns
+from reference_models import train_reference_random_forest
+
+# --- KONFIGURASI ---
+MODEL_PATH = os.environ.get("MODEL_PATH", "./tuned-churn-model-dagshub/tuned-churn-model-dagshub")
+BATCH_SIZES = [1, 100, 1000]
+REPEATS = {1: 300, 100: 200, 1000: 50}
+
+
+# --- 1. Dua Cara Scoring yang Dibandingkan ---
+def score_two_pass(model, X):
+    """Jalur lama: predict lalu predict_proba pada matriks yang sama."""
+    predictions = model.predict(X)
+    churn_probabilities = model.predict_proba(X)[:, 1]
+    return predictions, churn_probabilities
+
+
+def measure(fn, X, repeats):
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(X)
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings, 50)
+
+
+def benchmark_model(label, model, X_pool):
+    scorer = ChurnScorer(model, columns=final_columns)
+    for batch_size in BATCH_SIZES:
+        X = X_pool[:batch_size]
+
+        # Label dan probabilitas harus identik dengan jalur lama
+        old_labels, old_proba = score_two_pass(model, X)
+        new_labels, new_proba = scorer.score(X)
+        if not (np.array_equal(old_labels, new_labels) and np.array_equal(old_proba, new_proba)):
+            raise AssertionError(f"Hasil scoring berbeda untuk {label}, batch {batch_size}")
+
+        old_p50 = measure(lambda X: score_two_pass(model, X), X, REPEATS[batch_size])
+        new_p50 = measure(scorer.score, X, REPEATS[batch_size])
+        print(f"{label:<20} | {batch_size:>6} | {old_p50 * 1e3:>16.3f} | {new_p50 * 1e3:>15.3f} | {old_p50 / new_p50:>7.2f}x")
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    print("Melatih ulang RandomForest referensi dari parameter run tuning RF...")
+    rf_model, X_test = train_reference_random_forest()
+    X_pool = X_test.to_numpy()
+    while len(X_pool) < max(BATCH_SIZES):
+        X_pool = np.vstack([X_pool, X_pool])
+
+    print("--- Benchmark Scoring: predict + predict_proba vs ChurnScorer (predict_proba sekali) ---")
+    print(f"{'model':<20} | {'batch':>6} | {'2 lintasan (ms)':>16} | {'1 lintasan (ms)':>15} | {'speedup':>8}")
+    print("-" * 78)
+    benchmark_model("RandomForest", rf_model, X_pool)
+
+    if os.path.exists(MODEL_PATH):
+        import mlflow.sklearn
+        benchmark_model("LogisticRegression", mlflow.sklearn.load_model(MODEL_PATH), X_pool)
+    else:
+        print(f"[WARNING] Model di {MODEL_PATH} tidak ditemukan, benchmark LogisticRegression dilewati.")
+    print("--- Benchmark Selesai ---")
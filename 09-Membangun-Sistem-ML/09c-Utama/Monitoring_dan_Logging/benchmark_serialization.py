@@ -0,0 +1,81 @@
+import json
+import time
+import numpy as np
+import orjson
+from response_formats import ARROW, FLOAT32, MSGPACK, decode_float32_response, decode_request, encode_response
+from inference import create_sample_data
+
+# --- KONFIGURASI ---
+N_ROWS = 10000
+REPEATS = 20
+
+
+def measure(fn, repeats=REPEATS):
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings, 50)
+
+
+def to_json_ready(response):
+    return {key: value.tolist() for key, value in response.items()}
+
+
+# --- 1. Payload Request Arrow ---
+def encode_arrow_request(records):
+    import pyarrow as pa
+    table = pa.Table.from_pylist(records)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    import msgpack
+    rng = np.random.default_rng(42)
+    churn_probabilities = rng.random(N_ROWS)
+    response = {'predictions': (churn_probabilities >= 0.5).astype(np.int64), 'probabilities_churn': churn_probabilities}
+
+    response_encoders = {
+        "json (stdlib)": lambda: json.dumps(to_json_ready(response)).encode(),
+        "json (orjson)": lambda: orjson.dumps(to_json_ready(response)),
+        "msgpack": lambda: encode_response(response, MSGPACK),
+        "arrow ipc": lambda: encode_response(response, ARROW),
+        "float32 LE": lambda: encode_response(response, FLOAT32),
+    }
+    response_decoders = {
+        "json (stdlib)": json.loads,
+        "json (orjson)": orjson.loads,
+        "msgpack": msgpack.unpackb,
+        "arrow ipc": lambda body: decode_request(ARROW, body),
+        "float32 LE": decode_float32_response,
+    }
+
+    print(f"--- Benchmark Serialisasi Response: {N_ROWS} baris (prediksi + probabilitas) ---")
+    print(f"{'format':<14} | {'encode (ms)':>11} | {'decode (ms)':>11} | {'ukuran (KB)':>11}")
+    print("-" * 56)
+    for name, encode in response_encoders.items():
+        body = encode()
+        encode_p50 = measure(encode)
+        decode_p50 = measure(lambda: response_decoders[name](body))
+        print(f"{name:<14} | {encode_p50 * 1e3:>11.3f} | {decode_p50 * 1e3:>11.3f} | {len(body) / 1024:>11.1f}")
+
+    # Sisi request: payload berisi record mentah (string + numerik), jadi float32 tidak berlaku
+    records = create_sample_data(N_ROWS)
+    request_bodies = {
+        "json (stdlib)": (json.dumps(records).encode(), json.loads),
+        "json (orjson)": (orjson.dumps(records), orjson.loads),
+        "msgpack": (msgpack.packb(records), lambda body: decode_request(MSGPACK, body)),
+        "arrow ipc": (encode_arrow_request(records), lambda body: decode_request(ARROW, body)),
+    }
+    print(f"\n--- Benchmark Decode Request: {N_ROWS} record input ---")
+    print(f"{'format':<14} | {'decode (ms)':>11} | {'ukuran (KB)':>11}")
+    print("-" * 42)
+    for name, (body, decode) in request_bodies.items():
+        decode_p50 = measure(lambda: decode(body))
+        print(f"{name:<14} | {decode_p50 * 1e3:>11.3f} | {len(body) / 1024:>11.1f}")
+    print("--- Benchmark Selesai ---")
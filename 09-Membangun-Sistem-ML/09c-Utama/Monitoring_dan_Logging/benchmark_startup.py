@@ -0,0 +1,58 @@
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+
+# --- KONFIGURASI ---
+MODEL_PATH = os.environ.get("MODEL_PATH", "./tuned-churn-model-dagshub/tuned-churn-model-dagshub")
+PACKAGED_MODEL_PATH = os.environ.get("PACKAGED_MODEL_PATH", "./packaged_model")
+COMPILED_MODEL_PATH = os.environ.get("COMPILED_MODEL_PATH", "./compiled_model.npz")
+REPEATS = 5
+
+# Setiap pengukuran dijalankan di interpreter baru agar import yang sudah ter-cache tidak ikut terhitung.
+# RSS diambil dari /proc (Linux) setelah model dimuat dan satu prediksi dijalankan.
+CHILD_TEMPLATE = """
+import json, time
+start = time.perf_counter()
+{load}
+import numpy as np
+model.predict_proba(np.zeros((1, 30)))
+elapsed = time.perf_counter() - start
+rss_kb = 0
+with open('/proc/self/status') as f:
+    for line in f:
+        if line.startswith('VmRSS:'):
+            rss_kb = int(line.split()[1])
+print(json.dumps({{"seconds": elapsed, "rss_mb": rss_kb / 1024}}))
+"""
+
+LOADERS = {
+    "mlflow.sklearn": f"import mlflow.sklearn\nmodel = mlflow.sklearn.load_model({MODEL_PATH!r})",
+    "package_model": f"from package_model import load_packaged_model\nmodel = load_packaged_model({PACKAGED_MODEL_PATH!r})",
+    "compiled_model": f"from compiled_model import load_compiled_model\nmodel = load_compiled_model({COMPILED_MODEL_PATH!r})",
+}
+REQUIRED_PATHS = {"mlflow.sklearn": MODEL_PATH, "package_model": PACKAGED_MODEL_PATH, "compiled_model": COMPILED_MODEL_PATH}
+
+
+def measure_cold_start(load_code):
+    env = dict(os.environ, PYTHONWARNINGS="ignore")
+    output = subprocess.run([sys.executable, "-c", CHILD_TEMPLATE.format(load=load_code)], env=env,
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    print("--- Benchmark Cold Start: import + load + 1 prediksi di proses baru ---")
+    print(f"{'loader':<16} | {'p50 (s)':>8} | {'min (s)':>8} | {'RSS (MB)':>9}")
+    print("-" * 51)
+    for name, load_code in LOADERS.items():
+        if not os.path.exists(REQUIRED_PATHS[name]):
+            print(f"[WARNING] {REQUIRED_PATHS[name]} tidak ditemukan, loader {name} dilewati.")
+            continue
+        results = [measure_cold_start(load_code) for _ in range(REPEATS)]
+        seconds = np.array([r["seconds"] for r in results])
+        rss = np.median([r["rss_mb"] for r in results])
+        print(f"{name:<16} | {np.median(seconds):>8.3f} | {seconds.min():>8.3f} | {rss:>9.1f}")
+    print("--- Benchmark Selesai ---")
@@ -0,0 +1,81 @@
+import time
+import numpy as np
+from prometheus_client import CollectorRegistry, Counter, Histogram
+from batch_telemetry import KNOWN_CONTRACTS, count_categories, inc_counter_batch, numeric_column, observe_histogram_batch
+from inference import create_sample_data
+
+# --- KONFIGURASI ---
+BATCH_SIZES = [1, 100, 10000]
+REPEATS = {1: 2000, 100: 300, 10000: 10}
+NUMERIC_FEATURES = ['tenure', 'MonthlyCharges', 'TotalCharges']
+
+
+def make_metrics():
+    """Metrik dengan nama yang sama seperti di prometheus_exporter, di registry terpisah per jalur."""
+    registry = CollectorRegistry()
+    histograms = {
+        'tenure': Histogram('input_feature_tenure_distribution', 'tenure', registry=registry),
+        'MonthlyCharges': Histogram('input_feature_monthlycharges_distribution', 'MonthlyCharges', registry=registry),
+        'TotalCharges': Histogram('input_feature_totalcharges_distribution', 'TotalCharges', registry=registry),
+    }
+    contract_counter = Counter('input_feature_contract_type_count', 'contract', ['contract'], registry=registry)
+    return registry, histograms, contract_counter
+
+
+# --- 1. Dua Jalur Telemetri yang Dibandingkan ---
+def telemetry_per_value(records, histograms, contract_counter):
+    """Jalur lama: satu observe()/inc() per nilai."""
+    for feature in NUMERIC_FEATURES:
+        for record in records:
+            try:
+                histograms[feature].observe(float(record[feature]))
+            except (KeyError, TypeError, ValueError):
+                pass
+    for record in records:
+        contract = record.get('Contract')
+        if contract is not None:
+            contract_counter.labels(contract=contract if contract in KNOWN_CONTRACTS else 'other').inc()
+
+
+def telemetry_batch(records, histograms, contract_counter):
+    """Jalur baru: bucket per kolom dengan NumPy, satu update per bucket."""
+    for feature in NUMERIC_FEATURES:
+        observe_histogram_batch(histograms[feature], numeric_column(records, feature))
+    inc_counter_batch(contract_counter, 'contract', count_categories(records, 'Contract', KNOWN_CONTRACTS))
+
+
+def snapshot(registry):
+    return sorted((s.name, tuple(sorted(s.labels.items())), round(s.value, 6))
+                  for metric in registry.collect() for s in metric.samples if not s.name.endswith('_created'))
+
+
+def measure(fn, records, repeats):
+    timings = np.empty(repeats)
+    for i in range(repeats):
+        start = time.perf_counter()
+        fn(records)
+        timings[i] = time.perf_counter() - start
+    return np.percentile(timings, 50)
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    print("--- Benchmark Telemetri Fitur: observe() per nilai vs update per bucket ---")
+    print(f"{'batch':>6} | {'per nilai (ms)':>14} | {'per bucket (ms)':>15} | {'speedup':>8}")
+    print("-" * 54)
+    for batch_size in BATCH_SIZES:
+        records = create_sample_data(batch_size)
+        # Satu kontrak tak dikenal untuk memastikan label 'other' juga sama
+        records[0]['Contract'] = 'Kontrak tidak dikenal'
+
+        old_registry, old_hists, old_counter = make_metrics()
+        new_registry, new_hists, new_counter = make_metrics()
+        telemetry_per_value(records, old_hists, old_counter)
+        telemetry_batch(records, new_hists, new_counter)
+        if snapshot(old_registry) != snapshot(new_registry):
+            raise AssertionError(f"Hasil metrik berbeda untuk batch {batch_size}")
+
+        old_p50 = measure(lambda r: telemetry_per_value(r, old_hists, old_counter), records, REPEATS[batch_size])
+        new_p50 = measure(lambda r: telemetry_batch(r, new_hists, new_counter), records, REPEATS[batch_size])
+        print(f"{batch_size:>6} | {old_p50 * 1e3:>14.3f} | {new_p50 * 1e3:>15.3f} | {old_p50 / new_p50:>7.1f}x")
+    print("--- Benchmark Selesai ---")
@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from inference import create_sample_data
+
+# --- KONFIGURASI ---
+HOST = "127.0.0.1"
+PORT = 5011
+WORKER_COUNTS = [1, 2, 4, 8]
+CLIENT_THREADS = 32
+DURATION_SECONDS = 15
+BATCH_SIZE = 1
+
+
+# --- 1. Menjalankan Server ---
+def start_waitress():
+    cmd = ["waitress-serve", f"--host={HOST}", f"--port={PORT}", "prometheus_exporter:dispatcher"]
+    return subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def start_gunicorn(n_workers):
+    env = dict(os.environ, WEB_CONCURRENCY=str(n_workers), GUNICORN_BIND=f"{HOST}:{PORT}")
+    cmd = [sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "prometheus_exporter:dispatcher"]
+    return subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+
+def wait_until_ready(timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if requests.get(f"http://{HOST}:{PORT}/", timeout=1).ok:
+                return
+        except requests.exceptions.RequestException:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("Server tidak siap dalam batas waktu.")
+
+
+# --- 2. Generator Beban ---
+def run_load(duration, client_threads, batch_size):
+    """Mengirim request sebanyak-banyaknya selama `duration` detik; mengembalikan (sukses, gagal)."""
+    url = f"http://{HOST}:{PORT}/predict"
+    payloads = [create_sample_data(num_samples=batch_size) for _ in range(200)]
+    deadline = time.time() + duration
+
+    def client_loop(seed):
+        session = requests.Session()
+        ok, failed, i = 0, 0, seed
+        while time.time() < deadline:
+            try:
+                response = session.post(url, json=payloads[i % len(payloads)], timeout=10)
+                if response.ok:
+                    ok += 1
+                else:
+                    failed += 1
+            except requests.exceptions.RequestException:
+                failed += 1
+            i += 1
+        return ok, failed
+
+    with ThreadPoolExecutor(max_workers=client_threads) as pool:
+        results = list(pool.map(client_loop, range(client_threads)))
+    return sum(r[0] for r in results), sum(r[1] for r in results)
+
+
+def benchmark(label, start_fn):
+    server = start_fn()
+    try:
+        wait_until_ready()
+        run_load(2, CLIENT_THREADS, BATCH_SIZE)  # warm-up
+        ok, failed = run_load(DURATION_SECONDS, CLIENT_THREADS, BATCH_SIZE)
+        print(f"{label:<22} | {ok / DURATION_SECONDS:>10.1f} | {failed:>6}")
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    print(f"--- Benchmark Throughput vs Jumlah Worker ({CLIENT_THREADS} klien, {DURATION_SECONDS} s, batch={BATCH_SIZE}) ---")
+    print(f"{'mode':<22} | {'req/detik':>10} | {'gagal':>6}")
+    print("-" * 46)
+    benchmark("waitress (1 proses)", start_waitress)
+    for n_workers in WORKER_COUNTS:
+        benchmark(f"gunicorn {n_workers} worker", lambda: start_gunicorn(n_workers))
+    print("--- Benchmark Selesai ---")
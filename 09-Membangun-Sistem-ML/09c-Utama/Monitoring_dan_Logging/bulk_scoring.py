@@ -0,0 +1,113 @@
+import csv
+import io
+import json
+import numpy as np
+
+# Format yang didukung endpoint /predict/bulk (input dan output memakai format yang sama)
+CSV_MIMETYPES = ("text/csv", "application/csv")
+NDJSON_MIMETYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl")
+
+
+# --- 1. Parser Streaming: membaca body request per chunk ---
+def _normalize_raw_row(row):
+    # File telco mentah menyimpan SeniorCitizen sebagai 0/1; samakan dengan initial_cleaning (No/Yes)
+    senior = row.get('SeniorCitizen')
+    if senior in ('0', '1', 0, 1):
+        row['SeniorCitizen'] = 'Yes' if str(senior) == '1' else 'No'
+    return row
+
+
+def iter_csv_chunks(stream, chunk_size):
+    """Membaca CSV dari stream biner secara bertahap dan menghasilkan list of dict per chunk."""
+    reader = csv.DictReader(io.TextIOWrapper(stream, encoding='utf-8', newline=''))
+    chunk = []
+    for row in reader:
+        chunk.append(_normalize_raw_row(row))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_ndjson_chunks(stream, chunk_size):
+    """Membaca NDJSON (satu objek JSON per baris) dari stream biner secara bertahap."""
+    chunk = []
+    for line in io.TextIOWrapper(stream, encoding='utf-8'):
+        line = line.strip()
+        if not line:
+            continue
+        chunk.append(_normalize_raw_row(json.loads(line)))
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_record_chunks(stream, mimetype, chunk_size):
+    if mimetype in CSV_MIMETYPES:
+        return iter_csv_chunks(stream, chunk_size)
+    if mimetype in NDJSON_MIMETYPES:
+        return iter_ndjson_chunks(stream, chunk_size)
+    raise ValueError(f"Content-Type tidak didukung untuk bulk scoring: {mimetype!r}. Gunakan text/csv atau application/x-ndjson.")
+
+
+# --- 2. Formatter Output per Chunk ---
+def format_csv_chunk(records, predictions, churn_probabilities, write_header):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if write_header:
+        writer.writerow(['customerID', 'prediction', 'probability_churn'])
+    for record, pred, prob in zip(records, predictions.tolist(), churn_probabilities.tolist()):
+        writer.writerow([record.get('customerID', ''), pred, prob])
+    return buffer.getvalue()
+
+
+def format_ndjson_chunk(records, predictions, churn_probabilities):
+    lines = []
+    for record, pred, prob in zip(records, predictions.tolist(), churn_probabilities.tolist()):
+        result = {'prediction': pred, 'probability_churn': prob}
+        if 'customerID' in record:
+            result['customerID'] = record['customerID']
+        lines.append(json.dumps(result))
+    return "\n".join(lines) + "\n"
+
+
+def format_error(mimetype, message, rows_done):
+    # Status HTTP sudah terkirim saat streaming, jadi error dilaporkan sebagai baris terakhir
+    if mimetype in CSV_MIMETYPES:
+        return f"# error after {rows_done} rows: {message}\n"
+    return json.dumps({'error': message, 'rows_scored': rows_done}) + "\n"
+
+
+# --- 3. Pipeline Streaming ---
+def stream_bulk_predictions(stream, mimetype, chunk_size, encoder, score_fn, on_chunk=None):
+    """
+    Generator: parse -> encode -> score per chunk berukuran tetap, lalu hasilnya langsung di-yield.
+    Memori tetap datar berapa pun ukuran file karena hanya satu chunk yang dipegang setiap saat.
+    `on_chunk(records, predictions, churn_probabilities)` dipanggil setelah tiap chunk (metrik, audit log).
+    Nilai kembalian generator (lewat `yield from`) adalah (rows_done, error atau None).
+    """
+    rows_done = 0
+    try:
+        for records in iter_record_chunks(stream, mimetype, chunk_size):
+            X = encoder.encode(records)
+            predictions, churn_probabilities = score_fn(X)
+            if on_chunk is not None:
+                on_chunk(records, predictions, churn_probabilities)
+            if mimetype in CSV_MIMETYPES:
+                yield format_csv_chunk(records, predictions, churn_probabilities, write_header=rows_done == 0)
+            else:
+                yield format_ndjson_chunk(records, predictions, churn_probabilities)
+            rows_done += len(records)
+    except Exception as e:
+        yield format_error(mimetype, str(e), rows_done)
+        return rows_done, e
+    return rows_done, None
+
+
+def count_classes(predictions):
+    """Menghitung jumlah prediksi per kelas (Churn / No_Churn) dengan satu operasi vektor."""
+    n_churn = int(np.count_nonzero(np.asarray(predictions).astype(int) == 1))
+    return {'Churn': n_churn, 'No_Churn': len(predictions) - n_churn}
@@ -0,0 +1,442 @@
+import asyncio
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+import numpy as np
+import requests
+from requests.adapters import HTTPAdapter
+from response_formats import ARROW, FLOAT32, JSON, MSGPACK, MIMETYPE_ALIASES, decode_float32_response
+
+# Client Python untuk layanan churn, pengganti copy-paste send_request dari inference.py:
+# - koneksi keep-alive dipakai ulang (pool requests.Session / aiohttp.ClientSession),
+# - predict(record) dari banyak pemanggil dalam jendela singkat digabung menjadi satu request batch,
+# - 429/503 dan koneksi gagal dicoba ulang dengan backoff ber-jitter, menghormati Retry-After,
+# - response biner (msgpack / Arrow / float32) di-decode ke array NumPy.
+# aiohttp baru diimpor saat AsyncChurnClient dipakai, sehingga client sinkron cukup butuh requests.
+
+# --- KONFIGURASI ---
+DEFAULT_BASE_URL = os.environ.get("CHURN_SERVICE_URL", "http://localhost:5001")
+RETRY_STATUSES = (429, 503)
+# Penanda berhenti untuk thread pengumpul batch (dikirim close())
+_STOP = object()
+
+# Hasil satu pelanggan dari predict(); reasons hanya terisi jika explain aktif dan formatnya JSON/msgpack/Arrow
+Prediction = namedtuple('Prediction', ['prediction', 'probability_churn', 'reasons'])
+
+
+class ChurnServiceError(Exception):
+    """Server mengembalikan status error (setelah retry habis untuk 429/503)."""
+
+    def __init__(self, status, message):
+        super().__init__(f"HTTP {status}: {message}")
+        self.status = status
+        self.message = message
+
+
+# --- 1. Encode Request dan Decode Response ---
+def encode_request(records, request_format=JSON):
+    if request_format == MSGPACK:
+        import msgpack
+        return msgpack.packb(records)
+    return json.dumps(records).encode()
+
+
+def decode_response(content_type, body):
+    """
+    Body response /predict -> dict dengan 'predictions' (int) dan 'probabilities_churn' (float) sebagai
+    array NumPy; kunci lain (reasons, reason_unit, customerIDs, missing) diteruskan apa adanya.
+    """
+    mimetype = (content_type or JSON).split(";")[0].strip().lower()
+    mimetype = MIMETYPE_ALIASES.get(mimetype, mimetype)
+    if mimetype == FLOAT32:
+        predictions, churn_probabilities = decode_float32_response(body)
+        return {'predictions': predictions, 'probabilities_churn': churn_probabilities}
+    if mimetype == ARROW:
+        import pyarrow as pa
+        table = pa.ipc.open_stream(body).read_all()
+        payload = {'predictions': table.column('prediction').to_numpy().astype(np.int64),
+                   'probabilities_churn': table.column('probability_churn').to_numpy()}
+        if 'reasons' in table.column_names:
+            payload['reasons'] = table.column('reasons').to_pylist()
+            payload['reason_unit'] = table.schema.metadata[b'reason_unit'].decode()
+        return payload
+    if mimetype == MSGPACK:
+        import msgpack
+        payload = msgpack.unpackb(body, raw=False)
+    else:
+        payload = json.loads(body)
+    payload['predictions'] = np.asarray(payload['predictions'], dtype=np.int64)
+    payload['probabilities_churn'] = np.asarray(payload['probabilities_churn'], dtype=np.float64)
+    return payload
+
+
+def split_predictions(response, expected_rows=None):
+    """Memecah response batch menjadi list Prediction per baris; jumlah baris harus sama dengan `expected_rows`."""
+    n_rows = len(response['predictions'])
+    if expected_rows is not None and (n_rows != expected_rows or len(response['probabilities_churn']) != expected_rows):
+        raise ValueError(f"Server mengembalikan {n_rows} prediksi untuk {expected_rows} pelanggan.")
+    reasons = response.get('reasons') or [None] * n_rows
+    return [Prediction(int(prediction), float(probability), row_reasons) for prediction, probability, row_reasons
+            in zip(response['predictions'], response['probabilities_churn'], reasons)]
+
+
+def error_message(content_type, body):
+    if (content_type or "").startswith(JSON):
+        try:
+            return json.loads(body).get("error", body.decode(errors="replace"))
+        except (ValueError, AttributeError):
+            pass
+    return body.decode(errors="replace")[:200]
+
+
+# --- 2. Retry dengan Backoff ---
+def parse_retry_after(value):
+    """Header Retry-After (detik atau HTTP-date) -> detik, atau None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_delay(attempt, retry_after=None, backoff_base=0.1, backoff_cap=5.0):
+    """
+    Full jitter: acak 0..min(cap, base * 2^attempt), agar klien yang ditolak bersamaan tidak
+    kembali bersamaan. Jika server memberi Retry-After, nilai itu dipakai sebagai batas bawah,
+    tetapi tetap dibatasi `backoff_cap` agar server (atau proxy) tidak bisa membuat klien tidur lama.
+    """
+    if retry_after is not None:
+        return min(retry_after, backoff_cap) + random.uniform(0, backoff_base)
+    return random.uniform(0, min(backoff_cap, backoff_base * 2 ** attempt))
+
+
+class _ClientConfig:
+    """Konfigurasi bersama client sinkron dan asinkron."""
+
+    def __init__(self, base_url, response_format, request_format, model_name, model_version, client_id,
+                 timeout, max_retries, backoff_base, backoff_cap, batch_window, max_batch_size):
+        self.base_url = base_url.rstrip("/")
+        self.response_format = response_format
+        self.request_format = request_format
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_cap = backoff_cap
+        self.batch_window = batch_window
+        self.max_batch_size = max_batch_size
+        self.headers = {"Accept": response_format, "Content-Type": request_format}
+        if model_name:
+            # Model dari registry server (X-Model-Name / X-Model-Version)
+            self.headers["X-Model-Name"] = model_name
+            if model_version:
+                self.headers["X-Model-Version"] = str(model_version)
+        if client_id:
+            # Identitas untuk rate limit per klien di admission control server
+            self.headers["X-Client-Id"] = client_id
+
+    def result_timeout(self):
+        """Batas waktu menunggu hasil predict(): semua percobaan + jeda retry terpanjang + jendela batch."""
+        return (self.timeout * (self.max_retries + 1) + (self.backoff_cap + self.backoff_base) * self.max_retries
+                + self.batch_window)
+
+    def json_headers(self):
+        """Header untuk body JSON buatan client sendiri (mis. /predict/by-id), apa pun `request_format`-nya."""
+        return {**self.headers, "Content-Type": JSON}
+
+    @staticmethod
+    def params(explain, top_k):
+        if not explain:
+            return None
+        return {"explain": "true", **({"top_k": str(top_k)} if top_k else {})}
+
+
+# --- 3. Client Sinkron ---
+class ChurnClient(_ClientConfig):
+    """
+    Client thread-safe berbasis requests.Session (pool `pool_size` koneksi keep-alive).
+
+    - `predict_batch(records)`: satu request untuk list pelanggan, hasil dict array NumPy.
+    - `submit(record)` / `predict(record)`: satu pelanggan; panggilan dari semua thread dalam
+      `batch_window` detik (atau sampai `max_batch_size` baris) digabung menjadi satu request.
+      `submit` mengembalikan Future sehingga satu thread pun bisa menitipkan banyak pelanggan.
+    - `close()` menghentikan thread pengumpul; batch yang sudah dititipkan tetap dikirim dulu.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, response_format=MSGPACK, request_format=JSON, model_name=None,
+                 model_version=None, client_id=None, timeout=10.0, max_retries=3, backoff_base=0.1, backoff_cap=5.0,
+                 batch_window=0.005, max_batch_size=256, pool_size=8):
+        super().__init__(base_url, response_format, request_format, model_name, model_version, client_id,
+                         timeout, max_retries, backoff_base, backoff_cap, batch_window, max_batch_size)
+        self.pool_size = pool_size
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self._executor = None
+        self._closed = False
+
+    def _post(self, path, body, params=None, headers=None):
+        """POST dengan retry untuk 429/503 dan koneksi gagal; mengembalikan response sukses."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.post(self.base_url + path, data=body, headers=headers or self.headers,
+                                             params=params, timeout=self.timeout)
+            except requests.ConnectionError:
+                if attempt == self.max_retries:
+                    raise
+                time.sleep(retry_delay(attempt, None, self.backoff_base, self.backoff_cap))
+                continue
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                time.sleep(retry_delay(attempt, retry_after, self.backoff_base, self.backoff_cap))
+                continue
+            if response.status_code >= 400:
+                raise ChurnServiceError(response.status_code,
+                                        error_message(response.headers.get("Content-Type"), response.content))
+            return response
+
+    def predict_batch(self, records, explain=False, top_k=None):
+        response = self._post("/predict", encode_request(records, self.request_format), self.params(explain, top_k))
+        return decode_response(response.headers.get("Content-Type"), response.content)
+
+    def predict_by_id(self, customer_ids, explain=False, top_k=None):
+        """Scoring dari feature store server (/predict/by-id); response selalu JSON."""
+        response = self._post("/predict/by-id", json.dumps({"customerIDs": list(customer_ids)}).encode(),
+                              self.params(explain, top_k), self.json_headers())
+        return decode_response(response.headers.get("Content-Type"), response.content)
+
+    def submit(self, record):
+        """Menitipkan satu pelanggan ke batch berikutnya; Future berisi Prediction."""
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((record, time.perf_counter(), future))
+        return future
+
+    def predict(self, record, timeout=None):
+        """Satu pelanggan lewat batch; TimeoutError jika hasil tidak datang dalam `timeout` (default result_timeout())."""
+        return self.submit(record).result(timeout=self.result_timeout() if timeout is None else timeout)
+
+    # Batching sisi klien: thread pengumpul menutup batch, pengiriman berjalan di pool thread
+    def _ensure_worker(self):
+        # Thread tidak ikut tersalin saat fork, jadi pengumpul dan pool-nya dibuat ulang per proses
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("ChurnClient sudah ditutup.")
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._queue = queue.Queue()
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="churn-client")
+            self._worker = threading.Thread(target=self._run, name="churn-client-batcher", daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def _collect_batch(self):
+        """Batch berikutnya, atau None jika close() mengirim _STOP."""
+        first = self._queue.get()
+        if first is _STOP:
+            return None
+        batch = [first]
+        deadline = first[1] + self.batch_window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _STOP:
+                # Batch ini tetap dikirim; thread berhenti di putaran berikutnya
+                self._queue.put(_STOP)
+                break
+            batch.append(item)
+        return batch
+
+    def _send_batch(self, batch):
+        try:
+            results = split_predictions(self.predict_batch([record for record, _, _ in batch]), expected_rows=len(batch))
+            for (_, _, future), result in zip(batch, results):
+                future.set_result(result)
+        except Exception as e:
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+            if batch is None:
+                return
+            try:
+                self._executor.submit(self._send_batch, batch)
+            except RuntimeError as e:
+                # Pool sudah ditutup lewat close()
+                for _, _, future in batch:
+                    future.set_exception(e)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            worker_running = self._worker_pid == os.getpid() and self._worker.is_alive()
+        if worker_running:
+            self._queue.put(_STOP)
+            self._worker.join()
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+        # Pelanggan yang masuk antrian setelah _STOP tidak akan pernah dikirim
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                item[2].set_exception(RuntimeError("ChurnClient sudah ditutup."))
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# --- 4. Client Asinkron ---
+class AsyncChurnClient(_ClientConfig):
+    """
+    Versi asyncio (aiohttp) dengan API yang sama: `await predict_batch(records)`,
+    `await predict(record)` (digabung per `batch_window`), `await predict_by_id(ids)`.
+    Dipakai sebagai `async with AsyncChurnClient(...) as client:`.
+    """
+
+    def __init__(self, base_url=DEFAULT_BASE_URL, response_format=MSGPACK, request_format=JSON, model_name=None,
+                 model_version=None, client_id=None, timeout=10.0, max_retries=3, backoff_base=0.1, backoff_cap=5.0,
+                 batch_window=0.005, max_batch_size=256, pool_size=32):
+        super().__init__(base_url, response_format, request_format, model_name, model_version, client_id,
+                         timeout, max_retries, backoff_base, backoff_cap, batch_window, max_batch_size)
+        self.pool_size = pool_size
+        self.session = None
+        self._pending = []
+        self._flush_handle = None
+        self._tasks = set()
+
+    async def __aenter__(self):
+        self._session()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _session(self):
+        # ClientSession harus dibuat di dalam event loop yang berjalan
+        import aiohttp
+        if self.session is None:
+            self.session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.pool_size, keepalive_timeout=60),
+                                                 timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self.session
+
+    async def _post(self, path, body, params=None, headers=None):
+        import aiohttp
+        session = self._session()
+        for attempt in range(self.max_retries + 1):
+            try:
+                async with session.post(self.base_url + path, data=body, headers=headers or self.headers,
+                                        params=params) as response:
+                    content = await response.read()
+                    status, response_headers = response.status, response.headers
+            except aiohttp.ClientConnectionError:
+                if attempt == self.max_retries:
+                    raise
+                await asyncio.sleep(retry_delay(attempt, None, self.backoff_base, self.backoff_cap))
+                continue
+            if status in RETRY_STATUSES and attempt < self.max_retries:
+                retry_after = parse_retry_after(response_headers.get("Retry-After"))
+                await asyncio.sleep(retry_delay(attempt, retry_after, self.backoff_base, self.backoff_cap))
+                continue
+            if status >= 400:
+                raise ChurnServiceError(status, error_message(response_headers.get("Content-Type"), content))
+            return response_headers.get("Content-Type"), content
+
+    async def predict_batch(self, records, explain=False, top_k=None):
+        return decode_response(*await self._post("/predict", encode_request(records, self.request_format),
+                                                 self.params(explain, top_k)))
+
+    async def predict_by_id(self, customer_ids, explain=False, top_k=None):
+        return decode_response(*await self._post("/predict/by-id", json.dumps({"customerIDs": list(customer_ids)}).encode(),
+                                                 self.params(explain, top_k), self.json_headers()))
+
+    async def predict(self, record, timeout=None):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((record, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        return await asyncio.wait_for(future, self.result_timeout() if timeout is None else timeout)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._send_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, batch):
+        try:
+            results = split_predictions(await self.predict_batch([record for record, _ in batch]), expected_rows=len(batch))
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+
+    async def close(self):
+        self._flush()
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    from inference import create_sample_data
+
+    print("--- Contoh Client Churn: 100 pelanggan lewat predict() yang di-batch otomatis ---")
+    customers = create_sample_data(num_samples=100)
+    with ChurnClient() as client:
+        start = time.perf_counter()
+        results = [future.result() for future in [client.submit(customer) for customer in customers]]
+        print(f"[INFO] Sinkron: {len(results)} prediksi dalam {(time.perf_counter() - start) * 1e3:.1f} ms, "
+              f"{sum(result.prediction for result in results)} diprediksi churn.")
+        print(client.predict_batch(customers[:2], explain=True))
+
+    async def main():
+        async with AsyncChurnClient() as client:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(client.predict(customer) for customer in customers))
+            print(f"[INFO] Asinkron: {len(results)} prediksi dalam {(time.perf_counter() - start) * 1e3:.1f} ms.")
+
+    asyncio.run(main())
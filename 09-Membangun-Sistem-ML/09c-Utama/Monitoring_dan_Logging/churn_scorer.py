@@ -0,0 +1,63 @@
+import copy
+import numpy as np
+
+
+class ChurnScorer:
+    """
+    Inti scoring satu-lintasan: `predict_proba` dipanggil sekali, lalu label kelas
+    diturunkan dari ambang keputusan (`threshold`) terhadap probabilitas churn.
+    Untuk RandomForest ini berarti setiap pohon hanya ditelusuri sekali per request
+    (sebelumnya sekali untuk predict dan sekali lagi untuk predict_proba).
+
+    Dengan threshold=0.5 label identik dengan `model.predict` (perbandingan strict `>`,
+    sama seperti argmax sklearn yang memilih kelas negatif saat seri).
+    Estimator tanpa probabilitas memakai `decision_function` (skor > 0 berarti `classes_[1]`,
+    seperti konvensi sklearn) atau `predict`; pada kedua fallback itu probabilitas dikembalikan 0, sama seperti perilaku lama.
+    """
+
+    def __init__(self, model, threshold=0.5, positive_class=1, columns=None):
+        self.model = model
+        self.threshold = float(threshold)
+
+        classes = getattr(model, 'classes_', np.array([0, 1]))
+        if len(classes) != 2 or positive_class not in classes:
+            raise ValueError(f"Model harus biner dengan kelas positif {positive_class!r}, ditemukan {list(classes)}.")
+        self.classes = classes
+        self.positive_class = positive_class
+        self.negative_class = classes[0] if classes[1] == positive_class else classes[1]
+        self.positive_index = int(np.flatnonzero(classes == positive_class)[0])
+
+        if hasattr(model, 'predict_proba'):
+            self.mode = 'proba'
+        elif hasattr(model, 'decision_function'):
+            self.mode = 'decision'
+            print("[WARNING] Model tidak punya predict_proba; label diambil dari decision_function, probabilitas = 0.")
+        else:
+            self.mode = 'predict'
+            print("[WARNING] Model tidak punya predict_proba/decision_function; probabilitas = 0.")
+
+        # Model dilatih dengan DataFrame, sedangkan serving mengirim ndarray. Setelah urutan kolom
+        # dipastikan sama, scoring memakai salinan dangkal estimator tanpa `feature_names_in_`
+        # (array koefisien/pohon tetap dibagi), sehingga sklearn tidak memunculkan peringatan
+        # "X does not have valid feature names" dan filter warnings global tidak perlu disentuh.
+        self.estimator = model
+        feature_names = getattr(model, 'feature_names_in_', None)
+        if feature_names is not None and columns is not None:
+            if list(feature_names) != list(columns):
+                raise ValueError("Urutan kolom model tidak sama dengan final_columns.")
+            self.estimator = copy.copy(model)
+            del self.estimator.feature_names_in_
+
+    def score(self, X):
+        """Mengembalikan (labels, churn_probabilities) untuk matriks fitur X."""
+        if self.mode == 'proba':
+            churn_probabilities = self.estimator.predict_proba(X)[:, self.positive_index]
+            labels = np.where(churn_probabilities > self.threshold, self.positive_class, self.negative_class)
+        elif self.mode == 'decision':
+            scores = self.estimator.decision_function(X)
+            labels = np.where(scores > 0, self.classes[1], self.classes[0])
+            churn_probabilities = np.zeros(len(labels))
+        else:
+            labels = np.asarray(self.estimator.predict(X))
+            churn_probabilities = np.zeros(len(labels))
+        return labels, churn_probabilities
@@ -0,0 +1,224 @@
+import argparse
+import numpy as np
+
+# Representasi ringkas model churn untuk serving latensi rendah.
+# Hanya butuh NumPy saat inferensi: tidak ada validasi input sklearn dan tidak ada overhead
+# Python per-estimator, sehingga scoring 1 baris jauh lebih murah.
+
+
+# --- 1. LogisticRegression: dot product coef/intercept ---
+class CompiledLogisticRegression:
+    kind = "logistic_regression"
+
+    def __init__(self, coef, intercept, classes, feature_names=None):
+        self.coef = np.asarray(coef, dtype=np.float64).ravel()
+        self.intercept = float(np.asarray(intercept).ravel()[0])
+        self.classes_ = np.asarray(classes)
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+
+    def decision_function(self, X):
+        return np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+
+    def predict_proba(self, X):
+        # Sama dengan sklearn untuk kasus biner: expit(decision) -> [1 - p, p]
+        with np.errstate(over='ignore'):
+            p = 1.0 / (1.0 + np.exp(-self.decision_function(X)))
+        return np.column_stack([1.0 - p, p])
+
+    def predict(self, X):
+        return self.classes_[(self.decision_function(X) > 0).astype(np.intp)]
+
+    def contributions(self, X, class_index=1):
+        """Kontribusi log-odds per fitur (coef * x) dan bias (intercept) untuk kelas `class_index`."""
+        sign = 1.0 if class_index == 1 else -1.0
+        return np.asarray(X, dtype=np.float64) * (sign * self.coef), sign * self.intercept
+
+    def to_arrays(self):
+        return {"coef": self.coef, "intercept": np.array([self.intercept])}
+
+    @classmethod
+    def from_arrays(cls, arrays, classes, feature_names):
+        return cls(arrays["coef"], arrays["intercept"], classes, feature_names)
+
+
+# --- 2. RandomForest: array node datar yang ditelusuri secara vektor ---
+class CompiledForest:
+    """
+    Semua pohon digabung ke satu set array node (feature, threshold, left, right, value)
+    dengan indeks global. Daun menunjuk ke dirinya sendiri (left = right = indeks daun),
+    sehingga penelusuran cukup diulang `max_depth` kali untuk semua pohon x semua baris sekaligus.
+    `value` menyimpan proporsi kelas per node (sudah dinormalisasi seperti predict_proba pohon sklearn).
+
+    Untuk reason codes, `node_delta[n] = value[n] - value[parent(n)]` dan `delta_feature[n]` = fitur
+    split di parent (-1 untuk root) dihitung saat export: kontribusi fitur pada satu baris adalah
+    jumlah delta di sepanjang jalur root -> daun yang melewati split fitur tersebut.
+    """
+    kind = "random_forest"
+
+    def __init__(self, feature, threshold, left, right, value, roots, max_depth, classes, feature_names=None,
+                 node_delta=None, delta_feature=None):
+        self.feature = np.asarray(feature, dtype=np.intp)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.intp)
+        self.right = np.asarray(right, dtype=np.intp)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.intp)
+        self.max_depth = int(max_depth)
+        self.classes_ = np.asarray(classes)
+        if feature_names is not None:
+            self.feature_names_in_ = np.asarray(feature_names, dtype=object)
+        if node_delta is None or delta_feature is None:
+            # File .npz lama tanpa delta: hitung sekali saat load
+            node_delta, delta_feature = self._compute_node_deltas()
+        self.node_delta = np.asarray(node_delta, dtype=np.float64)
+        self.delta_feature = np.asarray(delta_feature, dtype=np.intp)
+
+    def _compute_node_deltas(self):
+        n_nodes = len(self.feature)
+        node_ids = np.arange(n_nodes)
+        is_internal = self.left != node_ids
+        parent = np.full(n_nodes, -1, dtype=np.intp)
+        parent[self.left[is_internal]] = node_ids[is_internal]
+        parent[self.right[is_internal]] = node_ids[is_internal]
+        has_parent = parent >= 0
+        node_delta = np.zeros_like(self.value)
+        node_delta[has_parent] = self.value[has_parent] - self.value[parent[has_parent]]
+        delta_feature = np.where(has_parent, self.feature[np.maximum(parent, 0)], -1)
+        return node_delta, delta_feature
+
+    @classmethod
+    def from_sklearn(cls, forest, feature_names=None):
+        features, thresholds, lefts, rights, values, roots = [], [], [], [], [], []
+        offset, max_depth = 0, 0
+        for estimator in forest.estimators_:
+            tree = estimator.tree_
+            n_nodes = tree.node_count
+            node_ids = np.arange(n_nodes)
+            is_leaf = tree.children_left == -1
+
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree.feature))
+            thresholds.append(np.where(is_leaf, 0.0, tree.threshold))
+            lefts.append(np.where(is_leaf, node_ids, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, node_ids, tree.children_right) + offset)
+
+            node_value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = node_value.sum(axis=1, keepdims=True)
+            normalizer[normalizer == 0.0] = 1.0
+            values.append(node_value / normalizer)
+
+            max_depth = max(max_depth, tree.max_depth)
+            offset += n_nodes
+
+        return cls(np.concatenate(features), np.concatenate(thresholds), np.concatenate(lefts),
+                   np.concatenate(rights), np.concatenate(values), np.array(roots), max_depth,
+                   forest.classes_, feature_names)
+
+    def apply(self, X):
+        """Mengembalikan indeks daun global dengan shape (n_trees, n_rows)."""
+        # Pohon sklearn membandingkan fitur dalam float32, jadi X di-cast dulu agar hasil split identik
+        X32 = np.asarray(X, dtype=np.float32)
+        rows = np.arange(X32.shape[0])
+        node = np.repeat(self.roots[:, None], X32.shape[0], axis=1)
+        for _ in range(self.max_depth):
+            go_left = X32[rows, self.feature[node]] <= self.threshold[node]
+            node = np.where(go_left, self.left[node], self.right[node])
+        return node
+
+    def predict_proba(self, X):
+        return self.value[self.apply(X)].mean(axis=0)
+
+    def contributions(self, X, class_index=1):
+        """
+        Kontribusi per fitur (n_rows, n_features) terhadap probabilitas kelas `class_index`, plus bias
+        (rata-rata nilai root). bias + kontribusi.sum(axis=1) == predict_proba(X)[:, class_index].
+        """
+        X32 = np.asarray(X, dtype=np.float32)
+        n_rows, n_features = X32.shape
+        rows = np.arange(n_rows)
+        flat_rows = np.broadcast_to(rows * n_features, (len(self.roots), n_rows))
+        totals = np.zeros(n_rows * n_features)
+        node = np.repeat(self.roots[:, None], n_rows, axis=1)
+        for _ in range(self.max_depth):
+            go_left = X32[rows, self.feature[node]] <= self.threshold[node]
+            child = np.where(go_left, self.left[node], self.right[node])
+            moved = child != node
+            totals += np.bincount((flat_rows + self.delta_feature[child])[moved],
+                                  weights=self.node_delta[child, class_index][moved], minlength=totals.size)
+            node = child
+        bias = self.value[self.roots, class_index].mean()
+        return totals.reshape(n_rows, n_features) / len(self.roots), bias
+
+    def predict(self, X):
+        return self.classes_[np.argmax(self.predict_proba(X), axis=1)]
+
+    def to_arrays(self):
+        return {"feature": self.feature, "threshold": self.threshold, "left": self.left,
+                "right": self.right, "value": self.value, "roots": self.roots,
+                "max_depth": np.array([self.max_depth]), "node_delta": self.node_delta,
+                "delta_feature": self.delta_feature}
+
+    @classmethod
+    def from_arrays(cls, arrays, classes, feature_names):
+        return cls(arrays["feature"], arrays["threshold"], arrays["left"], arrays["right"],
+                   arrays["value"], arrays["roots"], int(arrays["max_depth"][0]), classes, feature_names,
+                   arrays.get("node_delta"), arrays.get("delta_feature"))
+
+
+COMPILED_KINDS = {
+    CompiledLogisticRegression.kind: CompiledLogisticRegression,
+    CompiledForest.kind: CompiledForest,
+}
+
+
+# --- 3. Export dan Load ---
+def compile_model(model):
+    """Mengubah estimator sklearn (LogisticRegression / RandomForestClassifier) menjadi bentuk terkompilasi."""
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+
+    feature_names = getattr(model, 'feature_names_in_', None)
+    if isinstance(model, LogisticRegression):
+        if model.coef_.shape[0] != 1:
+            raise ValueError("Hanya LogisticRegression biner yang didukung.")
+        return CompiledLogisticRegression(model.coef_, model.intercept_, model.classes_, feature_names)
+    if isinstance(model, RandomForestClassifier):
+        if model.n_outputs_ != 1:
+            raise ValueError("Hanya RandomForest dengan satu output yang didukung.")
+        return CompiledForest.from_sklearn(model, feature_names)
+    raise TypeError(f"Tipe model tidak didukung untuk kompilasi: {type(model).__name__}")
+
+
+def save_compiled_model(compiled, path):
+    arrays = compiled.to_arrays()
+    feature_names = getattr(compiled, 'feature_names_in_', None)
+    np.savez(path, kind=np.array(compiled.kind), classes=compiled.classes_,
+             feature_names=np.array([] if feature_names is None else list(feature_names), dtype=str),
+             **arrays)
+
+
+def load_compiled_model(path):
+    """Memuat model terkompilasi dari file .npz (tanpa pickle, tanpa sklearn/mlflow)."""
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {key: data[key] for key in data.files}
+    kind = str(arrays.pop("kind"))
+    classes = arrays.pop("classes")
+    feature_names = arrays.pop("feature_names")
+    if kind not in COMPILED_KINDS:
+        raise ValueError(f"Jenis model terkompilasi tidak dikenal: {kind}")
+    return COMPILED_KINDS[kind].from_arrays(arrays, classes, list(feature_names) if len(feature_names) else None)
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export model MLflow sklearn menjadi model terkompilasi (.npz).")
+    parser.add_argument("model_path", nargs="?", default="./tuned-churn-model-dagshub/tuned-churn-model-dagshub")
+    parser.add_argument("output_path", nargs="?", default="./compiled_model.npz")
+    args = parser.parse_args()
+
+    import mlflow.sklearn
+    sk_model = mlflow.sklearn.load_model(args.model_path)
+    compiled = compile_model(sk_model)
+    save_compiled_model(compiled, args.output_path)
+    print(f"[INFO] Model {type(sk_model).__name__} dikompilasi ({compiled.kind}) dan disimpan di {args.output_path}")
@@ -0,0 +1,227 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+import numpy as np
+from feature_encoder import final_columns
+
+# Deteksi drift input terhadap data training (dataset_processed.csv).
+# Baseline ringkas (batas bin + frekuensi kategori) dihitung sekali secara offline dan disimpan sebagai JSON.
+# Di jalur request hanya ada update counter O(batch) dengan memori konstan; PSI/KS dihitung di thread latar.
+
+# --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_DATA_PATH = os.path.join(BASE_DIR, "..", "..", "09a-Eksperimen", "telco-dataset_raw", "telco-dataset.csv")
+DEFAULT_BASELINE_PATH = "./drift_baseline.json"
+NUMERIC_BINS = 10
+# Proporsi minimum agar log pada PSI tetap terdefinisi untuk bin kosong
+PSI_EPSILON = 1e-4
+BASELINE_CATEGORY = "(baseline)"
+
+
+# --- 1. Membangun Profil Baseline dari Data Training ---
+def _group_columns(columns):
+    """Memisahkan kolom numerik dan grup one-hot per field, sama seperti ChurnFeatureEncoder."""
+    numeric, categorical = [], {}
+    for col in columns:
+        field, sep, value = col.partition('_')
+        if sep:
+            categorical.setdefault(field, []).append(col)
+        else:
+            numeric.append(col)
+    return numeric, categorical
+
+
+def raw_numeric_scaling(raw_path, numeric_columns):
+    """
+    Mean dan std (ddof=0) kolom numerik data mentah setelah initial_cleaning, yaitu parameter
+    StandardScaler di automate_Reisya-Junita.py. Dipakai untuk menstandarkan nilai mentah dari request
+    agar sebanding dengan kolom numerik dataset_processed.csv.
+    """
+    import pandas as pd
+    from batch_score import load_initial_cleaning
+    with contextlib.redirect_stdout(io.StringIO()):
+        df_cleaned = load_initial_cleaning()(pd.read_csv(raw_path))
+    return {col: (float(df_cleaned[col].mean()), float(df_cleaned[col].std(ddof=0))) for col in numeric_columns}
+
+
+def build_baseline(processed_path, raw_path=None, columns=final_columns, n_bins=NUMERIC_BINS):
+    import pandas as pd
+    df = pd.read_csv(processed_path)
+    numeric, categorical = _group_columns(columns)
+    scaling = raw_numeric_scaling(raw_path, numeric) if raw_path else {}
+
+    baseline = {"source": os.path.basename(processed_path), "n_rows": int(len(df)), "numeric": {}, "categorical": {}}
+    for col in numeric:
+        values = df[col].to_numpy(dtype=np.float64)
+        edges = np.unique(np.quantile(values, np.arange(1, n_bins) / n_bins))
+        counts = np.bincount(np.searchsorted(edges, values, side='right'), minlength=len(edges) + 1)
+        mean, scale = scaling.get(col, (0.0, 1.0))
+        baseline["numeric"][col] = {
+            "edges": edges.tolist(),
+            "expected": (counts / counts.sum()).tolist(),
+            # nilai request distandarkan dengan (x - mean) / scale sebelum dibinning
+            "mean": mean,
+            "scale": scale,
+        }
+    for field, cols in categorical.items():
+        frequencies = df[cols].to_numpy(dtype=np.float64).mean(axis=0)
+        baseline["categorical"][field] = {
+            "columns": cols,
+            "categories": [BASELINE_CATEGORY] + [col.partition('_')[2] for col in cols],
+            "expected": [max(0.0, 1.0 - float(frequencies.sum()))] + frequencies.tolist(),
+        }
+    return baseline
+
+
+def save_baseline(baseline, path):
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+# --- 2. Skor Drift ---
+def population_stability_index(expected, actual_counts, epsilon=PSI_EPSILON):
+    actual = actual_counts / max(actual_counts.sum(), 1)
+    expected = np.clip(expected, epsilon, None)
+    actual = np.clip(actual, epsilon, None)
+    return float(np.sum((actual - expected) * np.log(actual / expected)))
+
+
+def binned_ks_statistic(expected, actual_counts):
+    """Statistik KS pada batas bin: selisih maksimum antara CDF baseline dan CDF live."""
+    actual = actual_counts / max(actual_counts.sum(), 1)
+    return float(np.max(np.abs(np.cumsum(actual) - np.cumsum(expected))))
+
+
+# --- 3. Monitor Streaming ---
+class DriftMonitor:
+    """
+    Counter bin per fitur (memori konstan) yang di-update dari matriks fitur ter-encode per request.
+    Setiap `interval_seconds` thread latar menghitung PSI (semua fitur) dan KS (fitur numerik) untuk
+    jendela yang terkumpul, meng-update gauge, lalu mengosongkan counter (tumbling window).
+    Jendela dengan kurang dari `min_rows` baris dibiarkan terus terkumpul sampai interval berikutnya.
+    """
+
+    def __init__(self, baseline, columns=final_columns, interval_seconds=60.0, min_rows=200,
+                 psi_gauge=None, ks_gauge=None, window_rows_gauge=None, last_evaluation_gauge=None):
+        self.interval_seconds = interval_seconds
+        self.min_rows = min_rows
+        self.psi_gauge = psi_gauge
+        self.ks_gauge = ks_gauge
+        self.window_rows_gauge = window_rows_gauge
+        self.last_evaluation_gauge = last_evaluation_gauge
+
+        column_index = {col: i for i, col in enumerate(columns)}
+        self.numeric = []  # (nama, indeks kolom, edges, mean, scale, expected)
+        for name, profile in baseline["numeric"].items():
+            self.numeric.append((name, column_index[name], np.asarray(profile["edges"]),
+                                 profile["mean"], profile["scale"] or 1.0, np.asarray(profile["expected"])))
+        self.categorical = []  # (nama, indeks kolom one-hot, expected)
+        for name, profile in baseline["categorical"].items():
+            self.categorical.append((name, np.array([column_index[col] for col in profile["columns"]]),
+                                     np.asarray(profile["expected"])))
+
+        self._lock = threading.Lock()
+        self._reset_counts()
+        self._worker = None
+        self._worker_pid = None
+
+    def _reset_counts(self):
+        self._numeric_counts = [np.zeros(len(expected), dtype=np.int64) for *_, expected in self.numeric]
+        self._categorical_counts = [np.zeros(len(expected), dtype=np.int64) for *_, expected in self.categorical]
+        self._rows = 0
+
+    def _ensure_worker(self):
+        # Thread tidak ikut tersalin saat fork, jadi timer dibuat ulang per proses
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._reset_counts()
+            self._worker = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def update(self, X):
+        """Menambahkan satu batch matriks fitur (final_columns) ke counter jendela aktif. O(batch)."""
+        self._ensure_worker()
+        X = np.asarray(X)
+        n_rows = len(X)
+        if n_rows == 0:
+            return
+        numeric_updates = []
+        for _, col_idx, edges, mean, scale, expected in self.numeric:
+            z = (X[:, col_idx] - mean) / scale
+            numeric_updates.append(np.bincount(np.searchsorted(edges, z, side='right'), minlength=len(expected)))
+        categorical_updates = []
+        for _, col_idx, _ in self.categorical:
+            hits = np.rint(X[:, col_idx].sum(axis=0)).astype(np.int64)
+            categorical_updates.append(np.concatenate([[n_rows - hits.sum()], hits]))
+
+        with self._lock:
+            for counts, update in zip(self._numeric_counts, numeric_updates):
+                counts += update
+            for counts, update in zip(self._categorical_counts, categorical_updates):
+                counts += update
+            self._rows += n_rows
+
+    def evaluate(self, force=False):
+        """Menghitung skor drift untuk jendela aktif. Mengembalikan dict atau None jika baris belum cukup."""
+        with self._lock:
+            if self._rows == 0 or (self._rows < self.min_rows and not force):
+                return None
+            numeric_counts, categorical_counts, rows = self._numeric_counts, self._categorical_counts, self._rows
+            self._reset_counts()
+
+        scores = {}
+        for (name, *_, expected), counts in zip(self.numeric, numeric_counts):
+            scores[name] = {"psi": population_stability_index(expected, counts),
+                            "ks": binned_ks_statistic(expected, counts)}
+        for (name, _, expected), counts in zip(self.categorical, categorical_counts):
+            scores[name] = {"psi": population_stability_index(expected, counts)}
+
+        for name, score in scores.items():
+            if self.psi_gauge is not None:
+                self.psi_gauge.labels(feature=name).set(score["psi"])
+            if self.ks_gauge is not None and "ks" in score:
+                self.ks_gauge.labels(feature=name).set(score["ks"])
+        if self.window_rows_gauge is not None:
+            self.window_rows_gauge.set(rows)
+        if self.last_evaluation_gauge is not None:
+            self.last_evaluation_gauge.set(time.time())
+        return scores
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval_seconds)
+            try:
+                self.evaluate()
+            except Exception as e:
+                print(f"[ERROR] Evaluasi drift gagal: {e}")
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    from reference_models import PROCESSED_DATA_PATH
+
+    parser = argparse.ArgumentParser(description="Membangun profil baseline drift dari dataset_processed.csv.")
+    parser.add_argument("--processed-path", default=PROCESSED_DATA_PATH)
+    parser.add_argument("--raw-path", default=RAW_DATA_PATH,
+                        help="CSV mentah untuk parameter standardisasi kolom numerik ('' = request sudah terstandarkan)")
+    parser.add_argument("--output", default=DEFAULT_BASELINE_PATH)
+    parser.add_argument("--bins", type=int, default=NUMERIC_BINS)
+    args = parser.parse_args()
+
+    baseline = build_baseline(args.processed_path, args.raw_path or None, n_bins=args.bins)
+    save_baseline(baseline, args.output)
+    print(f"[INFO] Baseline drift ({len(baseline['numeric'])} numerik, {len(baseline['categorical'])} kategorikal, "
+          f"{baseline['n_rows']} baris) disimpan di {args.output}")
@@ -0,0 +1,118 @@
+from array import array
+import numpy as np
+
+# --- 1. Skema Kolom Input Model ---
+# Urutan kolom ini harus sama persis dengan yang dipakai saat training (lihat signature di MLmodel).
+final_columns = [
+    'tenure', 'MonthlyCharges', 'TotalCharges', 'gender_Male',
+    'SeniorCitizen_Yes', 'Partner_Yes', 'Dependents_Yes',
+    'PhoneService_Yes', 'MultipleLines_No phone service',
+    'MultipleLines_Yes', 'InternetService_Fiber optic', 'InternetService_No',
+    'OnlineSecurity_No internet service', 'OnlineSecurity_Yes',
+    'OnlineBackup_No internet service', 'OnlineBackup_Yes',
+    'DeviceProtection_No internet service', 'DeviceProtection_Yes',
+    'TechSupport_No internet service', 'TechSupport_Yes',
+    'StreamingTV_No internet service', 'StreamingTV_Yes',
+    'StreamingMovies_No internet service', 'StreamingMovies_Yes',
+    'Contract_One year', 'Contract_Two year', 'PaperlessBilling_Yes',
+    'PaymentMethod_Credit card (automatic)', 'PaymentMethod_Electronic check',
+    'PaymentMethod_Mailed check'
+]
+
+
+# --- 2. Validasi Bentuk Payload ---
+def normalize_records(raw_data):
+    """Mengubah payload JSON (dict atau list of dict) menjadi list of dict."""
+    if isinstance(raw_data, dict):
+        return [raw_data]
+    if isinstance(raw_data, list):
+        return raw_data
+    raise ValueError("Input data must be a dictionary or a list of dictionaries.")
+
+
+# --- 3. Encoder dengan Skema Tetap ---
+class ChurnFeatureEncoder:
+    """
+    Encoder one-hot yang dikompilasi sekali dari `final_columns`.
+    Setiap record JSON dipetakan langsung ke baris array NumPy lewat tabel
+    (field, value) -> indeks kolom, tanpa DataFrame dan tanpa pd.get_dummies.
+    Hasilnya identik dengan get_dummies(...).reindex(columns=final_columns, fill_value=0):
+    kategori yang tidak dikenal (atau kategori baseline) menghasilkan nol.
+    """
+
+    def __init__(self, columns=None, dtype=np.float64):
+        self.columns = list(columns if columns is not None else final_columns)
+        self.n_features = len(self.columns)
+        self.dtype = np.dtype(dtype)
+        # field numerik -> indeks kolom, field kategorikal -> {value: indeks kolom}
+        self.numeric_index = {}
+        self.category_index = {}
+        for col_idx, col in enumerate(self.columns):
+            field, sep, value = col.partition('_')
+            if sep:
+                self.category_index.setdefault(field, {})[value] = col_idx
+            else:
+                self.numeric_index[col] = col_idx
+
+    def _to_float(self, field, value):
+        """Mengubah nilai numerik ke float; string kosong dianggap hilang (None -> kolom tetap 0)."""
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            if isinstance(value, str) and not value.strip():
+                return None
+            raise ValueError(f"Nilai numerik tidak valid untuk '{field}': {value!r}")
+
+    def encode(self, records, dtype=None, out=None):
+        """
+        Meng-encode list of dict menjadi matriks (n_records, n_features).
+        Jika `out` diberikan (array yang sudah dialokasikan), baris-barisnya ditimpa dan
+        dikembalikan sebagai view sehingga tidak ada alokasi matriks baru.
+        """
+        n_rows = len(records)
+        if out is not None:
+            if not out.flags.c_contiguous:
+                raise ValueError("Buffer `out` harus C-contiguous.")
+            X = out[:n_rows]
+            X.fill(0)
+        else:
+            X = np.zeros((n_rows, self.n_features), dtype=dtype or self.dtype)
+
+        # Tulis lewat view datar: indeks = baris * n_features + kolom
+        X_flat = X.reshape(-1)
+        n_features = self.n_features
+        numeric_index = self.numeric_index
+        category_index = self.category_index
+        # array typed menghindari satu objek int/float Python per nilai pada batch besar
+        hot_idx = array('q')
+        num_idx, num_vals = array('q'), array('d')
+        base = 0
+        for record in records:
+            if not isinstance(record, dict):
+                raise ValueError("Input data must be a dictionary or a list of dictionaries.")
+            for field, value in record.items():
+                value_map = category_index.get(field)
+                if value_map is not None:
+                    col_idx = value_map.get(value) if isinstance(value, str) else None
+                    if col_idx is not None:
+                        hot_idx.append(base + col_idx)
+                    continue
+                col_idx = numeric_index.get(field)
+                if col_idx is not None and value is not None:
+                    number = self._to_float(field, value)
+                    if number is not None:
+                        num_idx.append(base + col_idx)
+                        num_vals.append(number)
+            base += n_features
+
+        if hot_idx:
+            X_flat[np.frombuffer(hot_idx, dtype=np.int64)] = 1.0
+        if num_idx:
+            X_flat[np.frombuffer(num_idx, dtype=np.int64)] = np.frombuffer(num_vals, dtype=np.float64)
+        return X
+
+    def encode_one(self, record, out=None):
+        """Meng-encode satu record menjadi matriks (1, n_features)."""
+        if out is not None and out.ndim == 1:
+            out = out.reshape(1, -1)
+        return self.encode([record], out=out)
@@ -0,0 +1,315 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import threading
+import time
+import numpy as np
+from feature_encoder import ChurnFeatureEncoder, final_columns
+
+# Feature store lokal: baris pelanggan yang sudah di-encode disimpan di matriks float32 yang
+# di-memory-map (features-<generasi>.npy) + index customerID -> baris. /predict/by-id cukup
+# mengambil baris dari matriks ini, tanpa parsing dan encoding per request.
+#
+# Isi folder store:
+#   manifest.json       kolom, jumlah baris, kapasitas, generasi, file data aktif
+#   customer_ids.txt    satu customerID per baris (diakhiri newline), urutannya = urutan baris matriks
+#                       (hanya ditambah, sehingga pembaca cukup membaca bagian baru sejak offset terakhir)
+#   features-<g>.npy    matriks (kapasitas, n_fitur) float32
+#
+# Update (upsert) menimpa baris pelanggan lama di tempat dan menambah pelanggan baru di kapasitas
+# cadangan; jika kapasitas habis dibuat file data baru (generasi baru). Pembaca melihat perubahan
+# baris lama langsung (mmap bersama) dan pelanggan baru setelah refresh() membaca manifest terbaru.
+
+MANIFEST_FILE = "manifest.json"
+IDS_FILE = "customer_ids.txt"
+LOCK_FILE = ".lock"
+FORMAT_VERSION = 2
+DTYPE = np.float32
+DEFAULT_CHUNK_SIZE = 50000
+
+
+class InvalidCustomerID(ValueError):
+    """customerID kosong atau mengandung newline (tidak bisa disimpan satu per baris)."""
+
+
+def validate_customer_id(customer_id):
+    customer_id = str(customer_id)
+    if not customer_id or "\n" in customer_id or "\r" in customer_id:
+        raise InvalidCustomerID(f"customerID tidak valid: {customer_id!r} (tidak boleh kosong atau mengandung newline).")
+    return customer_id
+
+
+@contextlib.contextmanager
+def _exclusive_lock(path):
+    """
+    Lock antar-proses untuk penulis: flock di POSIX, msvcrt.locking di Windows. Modulnya diimpor
+    di sini (bukan di atas) agar server tetap bisa diimpor di Windows tanpa feature store.
+    """
+    with open(path, "a+b") as lock_file:
+        try:
+            import fcntl
+        except ImportError:
+            import msvcrt
+            lock_file.seek(0)
+            while True:
+                try:
+                    # LK_LOCK mencoba ulang selama ~10 detik lalu OSError; terus menunggu seperti flock
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:
+                    continue
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            return
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _write_atomic(path, text):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class FeatureStore:
+    """
+    Akses baca (serving) dan tulis (upsert) ke satu folder feature store.
+    Pembaca memanggil `lookup()`; index dan file data dimuat ulang otomatis paling sering
+    setiap `refresh_seconds` jika manifest berubah (mis. setelah upsert dari proses lain).
+    """
+
+    def __init__(self, path, refresh_seconds=5.0, encoder=None):
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.encoder = encoder or ChurnFeatureEncoder(final_columns)
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._manifest_mtime = None
+        self._next_check = 0.0
+        self.manifest = None
+        self.customer_ids = []
+        self.index = {}
+        self.matrix = None
+        self._ids_offset = 0
+        self._load()
+
+    # --- 1. Membuat Store Baru ---
+    @classmethod
+    def create(cls, path, capacity=1024, columns=final_columns):
+        os.makedirs(path, exist_ok=True)
+        data_file = "features-1.npy"
+        np.lib.format.open_memmap(os.path.join(path, data_file), mode="w+", dtype=DTYPE,
+                                  shape=(max(int(capacity), 1), len(columns))).flush()
+        _write_atomic(os.path.join(path, IDS_FILE), "")
+        cls._write_manifest(path, {"format_version": FORMAT_VERSION, "columns": list(columns), "n_rows": 0,
+                                   "capacity": max(int(capacity), 1), "generation": 1, "data_file": data_file})
+        return cls(path, encoder=ChurnFeatureEncoder(columns))
+
+    @staticmethod
+    def _write_manifest(path, manifest):
+        manifest["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        _write_atomic(os.path.join(path, MANIFEST_FILE), json.dumps(manifest, indent=2))
+
+    # --- 2. Memuat dan Refresh (sisi pembaca) ---
+    def _read_manifest(self):
+        with open(os.path.join(self.path, MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def _load(self):
+        """
+        Membaca manifest terbaru. customerID baru dibaca dari offset terakhir di file id (file hanya
+        ditambah), jadi biaya refresh sebanding dengan jumlah pelanggan baru, bukan total pelanggan.
+        """
+        # Satu pemuat dalam satu waktu: offset dan daftar id hanya boleh dimajukan sekali
+        with self._load_lock:
+            manifest_path = os.path.join(self.path, MANIFEST_FILE)
+            mtime = os.stat(manifest_path).st_mtime_ns
+            manifest = self._read_manifest()
+            if manifest.get("format_version") != FORMAT_VERSION:
+                raise ValueError(f"Format feature store {manifest.get('format_version')} tidak didukung "
+                                 f"(butuh {FORMAT_VERSION}); bangun ulang dengan feature_store.py build.")
+            if manifest["columns"] != self.encoder.columns:
+                raise ValueError("Kolom feature store tidak sama dengan skema input model (final_columns).")
+            n_rows = manifest["n_rows"]
+            customer_ids, index, offset, matrix = self.customer_ids, self.index, self._ids_offset, self.matrix
+            if self.manifest is not None and (n_rows < len(customer_ids)
+                                              or manifest["generation"] < self.manifest["generation"]):
+                # Store dibuat ulang di folder yang sama: index lama tidak berlaku
+                customer_ids, index, offset, matrix = [], {}, 0, None
+            new_ids = []
+            if n_rows > len(customer_ids):
+                with open(os.path.join(self.path, IDS_FILE), "rb") as f:
+                    f.seek(offset)
+                    # Hanya sampai n_rows: file id bisa sudah ditambah writer sebelum manifest diperbarui
+                    for line in f.read().split(b"\n")[:n_rows - len(customer_ids)]:
+                        new_ids.append(line.decode("utf-8"))
+                        offset += len(line) + 1
+            if matrix is None or manifest["data_file"] != self.manifest["data_file"]:
+                matrix = np.load(os.path.join(self.path, manifest["data_file"]), mmap_mode="r")
+            with self._lock:
+                # Matriks diganti dulu sebelum id baru masuk index; lookup membatasi baris ke n_rows
+                # yang dilihatnya, jadi index yang diperbarui di tempat tetap aman dibaca bersamaan
+                self.matrix = matrix
+                for row, customer_id in enumerate(new_ids, start=len(customer_ids)):
+                    index[customer_id] = row
+                customer_ids.extend(new_ids)
+                self.customer_ids, self.index, self._ids_offset = customer_ids, index, offset
+                self.manifest = manifest
+                self._manifest_mtime = mtime
+
+    def refresh(self, force=False):
+        """Memuat ulang index jika manifest berubah. Mengembalikan True jika ada yang dimuat ulang."""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        self._next_check = now + self.refresh_seconds
+        if os.stat(os.path.join(self.path, MANIFEST_FILE)).st_mtime_ns == self._manifest_mtime:
+            return False
+        try:
+            self._load()
+        except FileNotFoundError:
+            # Manifest dibaca tepat sebelum penulis mengganti file data; coba lagi dengan manifest terbaru
+            self._load()
+        return True
+
+    def __len__(self):
+        return self.manifest["n_rows"]
+
+    def lookup(self, customer_ids):
+        """
+        Mengambil baris fitur untuk `customer_ids`. Mengembalikan (X float64, id yang ditemukan,
+        id yang tidak ada); urutan X mengikuti urutan id yang ditemukan.
+        """
+        self.refresh()
+        with self._lock:
+            index, matrix, n_rows = self.index, self.matrix, len(self.customer_ids)
+        found, rows, missing = [], [], []
+        for customer_id in customer_ids:
+            row = index.get(customer_id)
+            if row is None or row >= n_rows:
+                missing.append(customer_id)
+            else:
+                found.append(customer_id)
+                rows.append(row)
+        X = np.empty((len(rows), matrix.shape[1]), dtype=np.float64)
+        if rows:
+            # Fancy indexing menyalin baris dari mmap; cast ke float64 sesuai dtype encoder di /predict
+            X[:] = matrix[np.asarray(rows, dtype=np.intp)]
+        return X, found, missing
+
+    # --- 3. Upsert Inkremental (sisi penulis) ---
+    def upsert(self, customer_ids, records):
+        """
+        Meng-encode `records` (format sama dengan payload /predict) dan menulisnya ke store.
+        Pelanggan yang sudah ada ditimpa di tempat; pelanggan baru ditambahkan. Penulis dari
+        beberapa proses diserialkan dengan file lock. Mengembalikan (jumlah update, jumlah baru).
+        """
+        if len(customer_ids) != len(records):
+            raise ValueError("Jumlah customerID dan record tidak sama.")
+        customer_ids = [validate_customer_id(customer_id) for customer_id in customer_ids]
+        X = self.encoder.encode(records, dtype=DTYPE)
+        with _exclusive_lock(os.path.join(self.path, LOCK_FILE)):
+            # State terbaru dari disk: penulis lain mungkin sudah menambah pelanggan
+            self._load()
+            manifest = dict(self.manifest)
+            n_rows = manifest["n_rows"]
+            rows = np.empty(len(customer_ids), dtype=np.intp)
+            new_rows = {}
+            for i, customer_id in enumerate(customer_ids):
+                row = self.index.get(customer_id)
+                if row is None:
+                    row = new_rows.setdefault(customer_id, n_rows + len(new_rows))
+                rows[i] = row
+            new_ids = list(new_rows)
+            n_updated = len(customer_ids) - len(new_ids)
+            total_rows = n_rows + len(new_ids)
+
+            data_path = os.path.join(self.path, manifest["data_file"])
+            retired_path = None
+            if total_rows > manifest["capacity"]:
+                data_path, retired_path = self._grow(manifest, total_rows)
+            matrix = np.load(data_path, mmap_mode="r+")
+            # Baris duplikat dalam satu batch: yang terakhir menang (urutan assignment NumPy)
+            matrix[rows] = X
+            matrix.flush()
+            del matrix
+
+            if new_ids:
+                with open(os.path.join(self.path, IDS_FILE), "ab") as f:
+                    f.write("".join(customer_id + "\n" for customer_id in new_ids).encode("utf-8"))
+            manifest["n_rows"] = total_rows
+            self._write_manifest(self.path, manifest)
+            if retired_path is not None:
+                # mmap yang masih terbuka di proses pembaca tetap valid setelah file dihapus (POSIX);
+                # di Windows file yang masih di-mmap tidak bisa dihapus dan dibiarkan sebagai sisa
+                try:
+                    os.remove(retired_path)
+                except PermissionError:
+                    pass
+            # Hanya id baru yang dibaca dan ditambahkan ke index di memori
+            self._load()
+        return n_updated, len(new_ids)
+
+    def _grow(self, manifest, min_rows):
+        """Menyalin matriks ke file data baru berkapasitas 2x (generasi baru); pembaca lama tetap memakai file lama."""
+        old_path = os.path.join(self.path, manifest["data_file"])
+        capacity = max(min_rows, 2 * manifest["capacity"])
+        generation = manifest["generation"] + 1
+        data_file = f"features-{generation}.npy"
+        new_matrix = np.lib.format.open_memmap(os.path.join(self.path, data_file), mode="w+", dtype=DTYPE,
+                                               shape=(capacity, len(manifest["columns"])))
+        n_rows = manifest["n_rows"]
+        new_matrix[:n_rows] = np.load(old_path, mmap_mode="r")[:n_rows]
+        new_matrix.flush()
+        del new_matrix
+        manifest.update(capacity=capacity, generation=generation, data_file=data_file)
+        return os.path.join(self.path, data_file), old_path
+
+
+# --- 4. Build/Update dari CSV Mentah ---
+def upsert_csv(store, csv_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Membaca CSV mentah format telco per chunk, membersihkannya seperti pipeline training, lalu upsert."""
+    import pandas as pd
+    from batch_score import load_initial_cleaning
+    initial_cleaning = load_initial_cleaning()
+    n_updated = n_added = 0
+    for df_chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+        customer_ids = df_chunk['customerID'].astype(str).tolist()
+        # initial_cleaning mencetak log untuk setiap panggilan; dibungkam agar output tidak banjir
+        with contextlib.redirect_stdout(io.StringIO()):
+            df_cleaned = initial_cleaning(df_chunk)
+        updated, added = store.upsert(customer_ids, df_cleaned.to_dict('records'))
+        n_updated += updated
+        n_added += added
+    return n_updated, n_added
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Membangun / memperbarui feature store pelanggan dari CSV mentah format telco.")
+    parser.add_argument("command", choices=["build", "update"],
+                        help="build: store baru dari CSV lengkap; update: upsert pelanggan yang berubah/baru")
+    parser.add_argument("store_path", help="Folder feature store")
+    parser.add_argument("csv_path", help="CSV mentah (format telco-dataset.csv, wajib ada kolom customerID)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    if args.command == "build":
+        if os.path.exists(os.path.join(args.store_path, MANIFEST_FILE)):
+            parser.error(f"{args.store_path} sudah berisi feature store; gunakan perintah update.")
+        store = FeatureStore.create(args.store_path)
+    else:
+        store = FeatureStore(args.store_path)
+    n_updated, n_added = upsert_csv(store, args.csv_path, args.chunk_size)
+    print(f"[INFO] Feature store {args.store_path}: {n_added} pelanggan baru, {n_updated} diperbarui "
+          f"(total {len(store)}, kapasitas {store.manifest['capacity']}) dalam {time.perf_counter() - start:.2f} s.")
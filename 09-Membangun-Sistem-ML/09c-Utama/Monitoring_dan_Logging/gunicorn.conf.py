@@ -0,0 +1,46 @@
+# Konfigurasi Gunicorn untuk mode serving multi-proses (pre-fork).
+# Jalankan dengan: gunicorn -c gunicorn.conf.py prometheus_exporter:dispatcher
+import gc
+import os
+import shutil
+
+# --- 1. Direktori Metrik Multi-Proses ---
+# Harus di-set sebelum prometheus_client di-import oleh aplikasi, karena itu diletakkan di sini
+# (file konfigurasi dibaca Gunicorn sebelum aplikasi dimuat). File metrik dari run sebelumnya
+# dibersihkan di sini juga, bukan di hook on_starting, karena dengan preload_app aplikasi
+# (dan file metrik milik master) sudah dibuat sebelum on_starting dipanggil.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+shutil.rmtree(os.environ["PROMETHEUS_MULTIPROC_DIR"], ignore_errors=True)
+os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# --- 2. Pengaturan Worker ---
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5001")
+workers = int(os.environ.get("WEB_CONCURRENCY", "4"))
+worker_class = "gthread"
+# Admission control berlaku per worker dan request yang menunggu slot ikut memegang thread, jadi
+# default threads = ADMISSION_MAX_IN_FLIGHT + ADMISSION_MAX_QUEUE + 1 (sama seperti --threads waitress
+# di Dockerfile): selalu ada thread bebas untuk menolak dengan 429, sehingga antrian terjadi di
+# aplikasi (berbatas) dan bukan di antrian Gunicorn yang tidak terlihat oleh admission control.
+threads = int(os.environ.get("GUNICORN_THREADS") or
+              int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "8")) + int(os.environ.get("ADMISSION_MAX_QUEUE", "32")) + 1)
+timeout = 60
+# Model dimuat sekali di master sebelum fork, lalu dibagi ke worker secara copy-on-write
+preload_app = True
+
+
+# --- 3. Hooks ---
+def pre_fork(server, worker):
+    # Pindahkan objek yang sudah ada (termasuk model) ke generasi permanen GC,
+    # supaya siklus GC di worker tidak menyentuh halaman memori bersama dan memicu copy.
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    # Batas admission dilaporkan per worker (gauge livesum), bukan sekali oleh master saat preload
+    from prometheus_exporter import admission
+    admission.publish_limits()
+
+
+def child_exit(server, worker):
+    from prometheus_client import multiprocess
+    multiprocess.mark_process_dead(worker.pid)
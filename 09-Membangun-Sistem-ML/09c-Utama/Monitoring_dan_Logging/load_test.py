@@ -0,0 +1,169 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+from collections import Counter
+import aiohttp
+import numpy as np
+from inference import API_URL, create_sample_data
+
+# Load test asyncio untuk layanan churn: koneksi keep-alive dipakai ulang (satu ClientSession),
+# laju request bisa dibatasi (open loop, RPS target) atau secepat mungkin (closed loop),
+# dan hasilnya ditulis ke file JSON untuk perbandingan sebelum/sesudah perubahan serving.
+
+# --- KONFIGURASI ---
+N_PAYLOADS = 200
+PERCENTILES = {"p50": 50, "p90": 90, "p99": 99, "p999": 99.9}
+
+
+# --- 1. Payload ---
+def build_payloads(batch_size, n_payloads=N_PAYLOADS):
+    """Payload JSON di-serialize sekali di awal agar CPU klien tidak ikut terukur sebagai latensi."""
+    return [json.dumps(create_sample_data(num_samples=batch_size)).encode() for _ in range(n_payloads)]
+
+
+# --- 2. Satu Request ---
+async def send_one(session, url, body, headers, scheduled_at, stats):
+    """
+    Latensi diukur dari waktu request *dijadwalkan*, bukan saat benar-benar dikirim, sehingga
+    antrian di sisi klien saat server melambat tetap terhitung (menghindari coordinated omission).
+    """
+    try:
+        async with session.post(url, data=body, headers=headers) as response:
+            await response.read()
+            status = response.status
+    except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+        status = type(e).__name__
+    if stats is not None:
+        stats["latencies"].append(time.perf_counter() - scheduled_at)
+        stats["status"][str(status)] += 1
+
+
+def new_stats():
+    return {"latencies": [], "status": Counter()}
+
+
+# --- 3. Pola Beban ---
+async def open_loop(session, url, payloads, headers, rps, concurrency, duration, stats):
+    """Request dijadwalkan tetap `rps` per detik; paling banyak `concurrency` yang berjalan bersamaan."""
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+    start = time.perf_counter()
+    n_requests = int(duration * rps)
+
+    async def guarded(body, scheduled_at):
+        async with slots:
+            await send_one(session, url, body, headers, scheduled_at, stats)
+
+    for i in range(n_requests):
+        scheduled_at = start + i / rps
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(guarded(payloads[i % len(payloads)], scheduled_at))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+
+
+async def closed_loop(session, url, payloads, headers, concurrency, duration, stats):
+    """`concurrency` klien mengirim request berikutnya segera setelah response diterima."""
+    deadline = time.perf_counter() + duration
+
+    async def client(offset):
+        i = offset
+        while time.perf_counter() < deadline:
+            await send_one(session, url, payloads[i % len(payloads)], headers, time.perf_counter(), stats)
+            i += concurrency
+
+    await asyncio.gather(*(client(offset) for offset in range(concurrency)))
+
+
+async def run_phase(session, url, payloads, headers, rps, concurrency, duration, stats):
+    if rps > 0:
+        await open_loop(session, url, payloads, headers, rps, concurrency, duration, stats)
+    else:
+        await closed_loop(session, url, payloads, headers, concurrency, duration, stats)
+
+
+async def run_load_test(url, rps=0.0, concurrency=32, batch_size=1, duration=30.0, warmup=5.0,
+                        timeout=10.0, headers=None):
+    """Menjalankan warm-up (tidak dihitung) lalu fase pengukuran; mengembalikan dict hasil."""
+    payloads = build_payloads(batch_size)
+    headers = {"Content-Type": "application/json", **(headers or {})}
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        if warmup > 0:
+            await run_phase(session, url, payloads, headers, rps, concurrency, warmup, None)
+        stats = new_stats()
+        start = time.perf_counter()
+        await run_phase(session, url, payloads, headers, rps, concurrency, duration, stats)
+        elapsed = time.perf_counter() - start
+    return summarize(stats, elapsed, url=url, rps=rps, concurrency=concurrency, batch_size=batch_size,
+                     duration=duration, warmup=warmup)
+
+
+# --- 4. Ringkasan Hasil ---
+def summarize(stats, elapsed, **config):
+    latencies_ms = np.asarray(stats["latencies"], dtype=np.float64) * 1e3
+    n_requests = len(latencies_ms)
+    n_ok = sum(count for status, count in stats["status"].items() if status.isdigit() and 200 <= int(status) < 300)
+    result = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": {**config, "mode": "open_loop" if config.get("rps") else "closed_loop"},
+        "requests": n_requests,
+        "ok": n_ok,
+        "errors": n_requests - n_ok,
+        "error_rate": (n_requests - n_ok) / n_requests if n_requests else 0.0,
+        "status_codes": dict(stats["status"]),
+        "elapsed_seconds": elapsed,
+        "throughput_rps": n_requests / elapsed if elapsed else 0.0,
+        "throughput_rows_per_second": n_ok * config.get("batch_size", 1) / elapsed if elapsed else 0.0,
+        "latency_ms": {},
+    }
+    if n_requests:
+        result["latency_ms"] = {name: float(np.percentile(latencies_ms, q)) for name, q in PERCENTILES.items()}
+        result["latency_ms"].update(mean=float(latencies_ms.mean()), max=float(latencies_ms.max()))
+    return result
+
+
+def print_summary(result):
+    config = result["config"]
+    print(f"--- Load Test {config['url']} ({config['mode']}, rps={config['rps'] or 'maks'}, "
+          f"concurrency={config['concurrency']}, batch={config['batch_size']}) ---")
+    print(f"Request      : {result['requests']} ({result['ok']} ok, error rate {result['error_rate'] * 100:.2f}%)")
+    print(f"Throughput   : {result['throughput_rps']:.1f} req/s, {result['throughput_rows_per_second']:.1f} baris/s")
+    if result["latency_ms"]:
+        print("Latensi (ms) : " + ", ".join(f"{name}={value:.2f}" for name, value in result["latency_ms"].items()))
+    print(f"Status       : {result['status_codes']}")
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test asyncio untuk endpoint prediksi churn.")
+    parser.add_argument("--url", default=API_URL)
+    parser.add_argument("--rps", type=float, default=0.0, help="Target request/detik (0 = secepat mungkin, closed loop)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Maksimal request bersamaan (= ukuran pool koneksi)")
+    parser.add_argument("--batch-size", type=int, default=1, help="Jumlah pelanggan per request")
+    parser.add_argument("--duration", type=float, default=30.0, help="Durasi pengukuran (detik)")
+    parser.add_argument("--warmup", type=float, default=5.0, help="Durasi warm-up yang tidak dihitung (detik)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Timeout per request (detik)")
+    parser.add_argument("--header", action="append", default=[], help="Header tambahan, mis. X-Client-Id:loadtest")
+    parser.add_argument("--label", default=None, help="Label bebas untuk membedakan hasil sebelum/sesudah")
+    parser.add_argument("--output", default="load_test_result.json", help="File hasil JSON")
+    args = parser.parse_args()
+
+    extra_headers = dict(header.split(":", 1) for header in args.header)
+    result = asyncio.run(run_load_test(args.url, rps=args.rps, concurrency=args.concurrency, batch_size=args.batch_size,
+                                       duration=args.duration, warmup=args.warmup, timeout=args.timeout,
+                                       headers={key.strip(): value.strip() for key, value in extra_headers.items()}))
+    result["label"] = args.label
+    print_summary(result)
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"[INFO] Hasil disimpan di {args.output}")
@@ -0,0 +1,118 @@
+import os
+import queue
+import threading
+import time
+import numpy as np
+
+
+class _PendingRequest:
+    """Satu request yang menunggu di antrian batching."""
+    __slots__ = ('X', 'enqueued_at', 'done', 'result', 'error')
+
+    def __init__(self, X):
+        self.X = X
+        self.enqueued_at = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Mengumpulkan baris dari request-request yang datang bersamaan, lalu men-skor
+    semuanya dalam satu panggilan `score_fn` yang tervektorisasi.
+
+    Sebuah batch ditutup ketika jumlah baris mencapai `max_batch_size` atau ketika
+    request pertama di batch sudah menunggu `max_wait_seconds`. `score_fn(X)` harus
+    mengembalikan tuple array yang panjangnya sama dengan jumlah baris X; setiap
+    pemanggil menerima potongan (slice) miliknya sendiri.
+    """
+
+    def __init__(self, score_fn, max_batch_size=256, max_wait_seconds=0.002,
+                 queue_depth_gauge=None, batch_size_histogram=None, queue_wait_histogram=None,
+                 result_timeout_seconds=30.0):
+        self.score_fn = score_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_seconds = max_wait_seconds
+        self.queue_depth_gauge = queue_depth_gauge
+        self.batch_size_histogram = batch_size_histogram
+        self.queue_wait_histogram = queue_wait_histogram
+        self.result_timeout_seconds = result_timeout_seconds
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    def _ensure_worker(self):
+        # Thread tidak ikut tersalin saat fork, jadi worker dibuat ulang per proses. Antrian hanya diganti
+        # setelah fork (isinya milik thread proses induk); jika worker mati di proses yang sama, antrian
+        # lama dipakai terus agar request yang sudah menunggu tetap di-skor oleh worker baru.
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            if self._worker_pid is not None and self._worker_pid != os.getpid():
+                self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, name="micro-batcher", daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def submit(self, X):
+        """Memasukkan matriks X ke antrian dan menunggu hasil skor untuk baris-barisnya."""
+        self._ensure_worker()
+        pending = _PendingRequest(X)
+        self._queue.put(pending)
+        if self.queue_depth_gauge is not None:
+            self.queue_depth_gauge.inc()
+
+        if not pending.done.wait(self.result_timeout_seconds):
+            raise TimeoutError("Micro-batch tidak selesai dalam batas waktu.")
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def _take(self, block_timeout):
+        pending = self._queue.get(timeout=block_timeout)
+        if self.queue_depth_gauge is not None:
+            self.queue_depth_gauge.dec()
+        if self.queue_wait_histogram is not None:
+            self.queue_wait_histogram.observe(time.perf_counter() - pending.enqueued_at)
+        return pending
+
+    def _collect_batch(self):
+        first = self._take(block_timeout=None)
+        batch = [first]
+        n_rows = len(first.X)
+        deadline = first.enqueued_at + self.max_wait_seconds
+        while n_rows < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                pending = self._take(block_timeout=remaining)
+            except queue.Empty:
+                break
+            batch.append(pending)
+            n_rows += len(pending.X)
+        return batch, n_rows
+
+    def _run(self):
+        while True:
+            batch, n_rows = self._collect_batch()
+            try:
+                if self.batch_size_histogram is not None:
+                    self.batch_size_histogram.observe(n_rows)
+                X_batch = batch[0].X if len(batch) == 1 else np.vstack([p.X for p in batch])
+                outputs = self.score_fn(X_batch)
+                start = 0
+                for pending in batch:
+                    end = start + len(pending.X)
+                    pending.result = tuple(output[start:end] for output in outputs)
+                    start = end
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            finally:
+                for pending in batch:
+                    pending.done.set()
@@ -0,0 +1,224 @@
+import os
+import re
+import threading
+import time
+from urllib.parse import unquote, urlparse
+import numpy as np
+
+# Hot reload model tanpa downtime: versi baru dimuat dan di-warm-up di thread latar,
+# lalu ditukar secara atomik. Request yang sedang berjalan tetap memakai bundle lama
+# (mereka sudah memegang referensinya) sampai selesai.
+
+# Baris contoh untuk warm-up model baru sebelum dipakai melayani request
+WARMUP_RECORDS = [
+    {"gender": "Female", "SeniorCitizen": "No", "Partner": "Yes", "Dependents": "No", "tenure": 1,
+     "PhoneService": "No", "MultipleLines": "No phone service", "InternetService": "DSL",
+     "OnlineSecurity": "No", "OnlineBackup": "Yes", "DeviceProtection": "No", "TechSupport": "No",
+     "StreamingTV": "No", "StreamingMovies": "No", "Contract": "Month-to-month", "PaperlessBilling": "Yes",
+     "PaymentMethod": "Electronic check", "MonthlyCharges": 29.85, "TotalCharges": 29.85},
+    {"gender": "Male", "SeniorCitizen": "No", "Partner": "No", "Dependents": "No", "tenure": 34,
+     "PhoneService": "Yes", "MultipleLines": "No", "InternetService": "Fiber optic",
+     "OnlineSecurity": "Yes", "OnlineBackup": "No", "DeviceProtection": "Yes", "TechSupport": "No",
+     "StreamingTV": "Yes", "StreamingMovies": "Yes", "Contract": "One year", "PaperlessBilling": "No",
+     "PaymentMethod": "Mailed check", "MonthlyCharges": 56.95, "TotalCharges": 1889.5},
+]
+WARMUP_ROUNDS = 3
+
+
+# --- 1. Menemukan Versi Model Terbaru ---
+def resolve_registry_source(source, mlruns_dir):
+    """
+    Mengubah `source` di meta.yaml registry MLflow menjadi path lokal. Registry di repo ini dibuat di
+    mesin lain (file:///D:/...), jadi jika path aslinya tidak ada, bagian setelah `mlruns/`
+    dipetakan ke folder mlruns lokal.
+    """
+    path = unquote(urlparse(source).path) if source.startswith("file:") else source
+    if re.match(r"^/[A-Za-z]:/", path):
+        path = path[1:]
+    if os.path.exists(path):
+        return path
+    _, sep, relative = path.replace("\\", "/").partition("mlruns/")
+    if sep:
+        return os.path.join(mlruns_dir, *relative.split("/"))
+    return path
+
+
+def _read_meta(meta_path):
+    # meta.yaml registry berisi pasangan `key: value` sederhana; tidak perlu parser YAML lengkap
+    meta = {}
+    with open(meta_path) as f:
+        for line in f:
+            key, sep, value = line.partition(":")
+            if sep and not line.startswith(" "):
+                meta[key.strip()] = value.strip()
+    return meta
+
+
+def discover_latest(watch_path):
+    """
+    Mengembalikan (versi, path model) terbaru di `watch_path`, yang bisa berupa:
+    - folder model registry MLflow (mlruns/models/<nama>) -> version-N tertinggi dengan status READY
+    - folder satu versi registry (mlruns/models/<nama>/version-N)
+    - folder model MLflow (berisi MLmodel) atau file .npz -> versi = waktu modifikasi terakhir
+    """
+    version_dirs = []
+    if os.path.isdir(watch_path):
+        for name in os.listdir(watch_path):
+            match = re.fullmatch(r"version-(\d+)", name)
+            if match:
+                version_dirs.append((int(match.group(1)), os.path.join(watch_path, name)))
+    if not version_dirs and os.path.exists(os.path.join(watch_path, "meta.yaml")):
+        match = re.search(r"version-(\d+)$", os.path.normpath(watch_path))
+        if match:
+            version_dirs.append((int(match.group(1)), watch_path))
+
+    if version_dirs:
+        mlruns_dir = os.path.normpath(os.path.join(version_dirs[0][1], "..", "..", ".."))
+        for number, version_dir in sorted(version_dirs, reverse=True):
+            meta = _read_meta(os.path.join(version_dir, "meta.yaml"))
+            if meta.get("status", "READY") == "READY" and meta.get("source"):
+                return str(number), resolve_registry_source(meta["source"], mlruns_dir)
+        return None, None
+
+    if not os.path.exists(watch_path):
+        return None, None
+    if os.path.isdir(watch_path):
+        mtime = max(os.path.getmtime(os.path.join(watch_path, name)) for name in os.listdir(watch_path))
+    else:
+        mtime = os.path.getmtime(watch_path)
+    return f"{mtime:.0f}", watch_path
+
+
+def load_model_from_path(model_path):
+    """Memuat model terkompilasi (.npz), artefak package_model.py (manifest.json), atau model MLflow sklearn."""
+    if model_path.endswith(".npz"):
+        from compiled_model import load_compiled_model
+        return load_compiled_model(model_path)
+    from package_model import is_packaged_model, load_packaged_model
+    if is_packaged_model(model_path):
+        return load_packaged_model(model_path)
+    # mlflow hanya di-import untuk artefak MLflow, karena import-nya dominan pada waktu startup
+    import mlflow.sklearn
+    return mlflow.sklearn.load_model(model_path)
+
+
+def warm_up(scorer, warmup_X):
+    """Menjalankan beberapa prediksi contoh dan memastikan outputnya valid sebelum model melayani request."""
+    for _ in range(WARMUP_ROUNDS):
+        labels, churn_probabilities = scorer.score(warmup_X)
+    if len(labels) != len(warmup_X) or not np.all(np.isfinite(churn_probabilities)):
+        raise ValueError("Warm-up model baru menghasilkan output yang tidak valid.")
+
+
+# --- 2. Bundle Model yang Ditukar Secara Atomik ---
+class ModelBundle:
+    """
+    Model + scorer + info versi. Tidak pernah diubah setelah dibuat; reload membuat bundle baru.
+    `name` adalah nama model di registry ("default" untuk model utama di /predict).
+    """
+    __slots__ = ('model', 'scorer', 'version', 'path', 'loaded_at', 'name')
+
+    def __init__(self, model, scorer, version, path, name="default"):
+        self.model = model
+        self.scorer = scorer
+        self.version = version
+        self.path = path
+        self.name = name
+        self.loaded_at = time.time()
+
+
+# --- 3. Model Manager ---
+class ModelManager:
+    """
+    Memegang bundle model aktif. Jika `watch_path` diberikan, thread latar memeriksa versi baru
+    setiap `poll_seconds`; versi baru dimuat, di-warm-up dengan `warmup_X`, lalu menggantikan
+    bundle aktif dengan satu assignment (atomik di CPython). Gagal memuat/warm-up tidak mengganggu
+    model yang sedang melayani.
+    """
+
+    def __init__(self, make_scorer, warmup_X=None, watch_path=None, poll_seconds=30.0,
+                 version_gauge=None, version_info_gauge=None, load_duration_gauge=None, reloads_counter=None):
+        self.make_scorer = make_scorer
+        self.warmup_X = warmup_X
+        self.watch_path = watch_path
+        self.poll_seconds = poll_seconds
+        self.version_gauge = version_gauge
+        self.version_info_gauge = version_info_gauge
+        self.load_duration_gauge = load_duration_gauge
+        self.reloads_counter = reloads_counter
+        self._bundle = None
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    @property
+    def current(self):
+        """Bundle aktif (atau None). Pemanggil sebaiknya mengambilnya sekali per request."""
+        if self.watch_path is not None:
+            self._ensure_worker()
+        return self._bundle
+
+    def load(self, model_path, version):
+        """Memuat, warm-up, dan menukar model secara sinkron. Mengembalikan bundle baru."""
+        with self._reload_lock:
+            start = time.perf_counter()
+            model = load_model_from_path(model_path)
+            scorer = self.make_scorer(model)
+            if self.warmup_X is not None:
+                warm_up(scorer, self.warmup_X)
+            duration = time.perf_counter() - start
+
+            previous = self._bundle
+            self._bundle = ModelBundle(model, scorer, version, model_path)
+            self._record_swap(previous, self._bundle, duration)
+            return self._bundle
+
+    def _record_swap(self, previous, bundle, duration):
+        if self.load_duration_gauge is not None:
+            self.load_duration_gauge.set(duration)
+        if self.version_gauge is not None:
+            try:
+                self.version_gauge.set(float(bundle.version))
+            except (TypeError, ValueError):
+                pass
+        if self.version_info_gauge is not None:
+            if previous is not None:
+                self.version_info_gauge.labels(version=str(previous.version)).set(0)
+            self.version_info_gauge.labels(version=str(bundle.version)).set(1)
+        if self.reloads_counter is not None and previous is not None:
+            self.reloads_counter.labels(result='success').inc()
+        print(f"[INFO] Model versi {bundle.version} aktif ({bundle.path}, dimuat dalam {duration:.2f} s).")
+
+    def check_for_update(self):
+        """Satu kali pemeriksaan versi; memuat versi baru jika berbeda dari yang aktif."""
+        version, model_path = discover_latest(self.watch_path)
+        if version is None or (self._bundle is not None and self._bundle.version == version):
+            return False
+        try:
+            self.load(model_path, version)
+            return True
+        except Exception as e:
+            if self.reloads_counter is not None:
+                self.reloads_counter.labels(result='failure').inc()
+            print(f"[ERROR] Gagal memuat model versi {version} dari {model_path}: {e}")
+            return False
+
+    def _ensure_worker(self):
+        # Thread tidak ikut tersalin saat fork, jadi poller dibuat ulang per proses
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="model-manager", daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def _run(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.check_for_update()
+            except Exception as e:
+                print(f"[ERROR] Pemeriksaan versi model gagal: {e}")
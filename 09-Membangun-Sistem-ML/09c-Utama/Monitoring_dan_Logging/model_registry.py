@@ -0,0 +1,203 @@
+import os
+import re
+import threading
+import time
+from model_manager import ModelBundle, _read_meta, discover_latest, load_model_from_path, resolve_registry_source, warm_up
+
+# Serving banyak model/versi dalam satu proses: setiap versi di registry MLflow lokal
+# (mlruns/models/<nama>/version-N) bisa dipanggil lewat /predict/<nama>/<versi> atau header.
+# Model dimuat saat pertama kali dipakai (lazy), encoder dipakai bersama karena semua model
+# memakai skema final_columns, dan model yang lama tidak dipakai di-unload agar memori terbatas.
+
+
+class ModelNotFound(KeyError):
+    """Nama model atau versi tidak ada di registry."""
+
+
+# --- 1. Memindai Registry ---
+def scan_registry(mlruns_dir):
+    """Mengembalikan {nama: {versi: path model}} untuk semua versi READY di mlruns/models."""
+    models = {}
+    models_dir = os.path.join(mlruns_dir, "models")
+    if not os.path.isdir(models_dir):
+        return models
+    for name in sorted(os.listdir(models_dir)):
+        model_dir = os.path.join(models_dir, name)
+        if not os.path.isdir(model_dir):
+            continue
+        for entry in os.listdir(model_dir):
+            match = re.fullmatch(r"version-(\d+)", entry)
+            meta_path = os.path.join(model_dir, entry, "meta.yaml")
+            if not match or not os.path.exists(meta_path):
+                continue
+            meta = _read_meta(meta_path)
+            if meta.get("status", "READY") == "READY" and meta.get("source"):
+                models.setdefault(name, {})[match.group(1)] = resolve_registry_source(meta["source"], mlruns_dir)
+    return models
+
+
+def parse_extra_models(spec):
+    """Mengubah "nama=path,nama2=path2" (env MODEL_REGISTRY_MODELS) menjadi dict {nama: path}."""
+    extra = {}
+    for item in (spec or "").split(","):
+        name, sep, path = item.partition("=")
+        if sep and name.strip():
+            extra[name.strip()] = path.strip()
+    return extra
+
+
+# --- 2. Registry dengan Lazy Load dan Unload ---
+class ModelRegistry:
+    """
+    Memetakan (nama, versi) ke ModelBundle. Sumber model: registry MLflow di `mlruns_dir` dan
+    `extra_models` {nama: path} (folder MLflow/packaged, file .npz, atau folder registry; versinya
+    dari discover_latest). Versi "latest" berarti nomor versi tertinggi.
+
+    Bundle yang tidak dipakai selama `idle_seconds` di-unload oleh thread latar, dan jumlah model
+    termuat dibatasi `max_loaded` (yang paling lama tidak dipakai dikeluarkan). Request yang masih
+    memegang bundle tetap aman karena bundle hanya dilepas dari registry, bukan dihancurkan.
+    """
+
+    def __init__(self, make_scorer, mlruns_dir=None, extra_models=None, warmup_X=None, idle_seconds=900.0,
+                 max_loaded=4, rescan_seconds=30.0, loaded_gauge=None, loads_counter=None, unloads_counter=None,
+                 load_duration_gauge=None):
+        self.make_scorer = make_scorer
+        self.mlruns_dir = mlruns_dir
+        self.extra_models = extra_models or {}
+        self.warmup_X = warmup_X
+        self.idle_seconds = idle_seconds
+        self.max_loaded = max_loaded
+        self.rescan_seconds = rescan_seconds
+        self.loaded_gauge = loaded_gauge
+        self.loads_counter = loads_counter
+        self.unloads_counter = unloads_counter
+        self.load_duration_gauge = load_duration_gauge
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._loaded = {}  # (nama, versi) -> [bundle, waktu terakhir dipakai]
+        self._available = {}
+        self._last_scan = 0.0
+        self._worker = None
+        self._worker_pid = None
+        self.rescan()
+
+    def rescan(self):
+        available = scan_registry(self.mlruns_dir) if self.mlruns_dir else {}
+        for name, path in self.extra_models.items():
+            version, model_path = discover_latest(path)
+            if version is not None:
+                available.setdefault(name, {})[version] = model_path
+        self._available = available
+        self._last_scan = time.monotonic()
+        return available
+
+    def available(self):
+        """{nama: [versi...]} yang bisa dipanggil, ditandai versi yang sedang termuat."""
+        loaded = set(self._loaded)
+        return {name: {version: (name, version) in loaded for version in sorted(versions, key=_version_key)}
+                for name, versions in self._available.items()}
+
+    def resolve(self, name, version="latest"):
+        """Mengembalikan (versi, path) untuk nama/versi; memindai ulang registry jika belum ditemukan."""
+        for attempt in range(2):
+            versions = self._available.get(name, {})
+            if version in (None, "", "latest") and versions:
+                version = max(versions, key=_version_key)
+            if version in versions:
+                return version, versions[version]
+            if attempt == 0 and time.monotonic() - self._last_scan >= self.rescan_seconds:
+                self.rescan()
+            else:
+                break
+        raise ModelNotFound(f"Model {name!r} versi {version!r} tidak ada di registry.")
+
+    def get(self, name, version="latest"):
+        """Bundle untuk nama/versi; dimuat dan di-warm-up saat pertama kali diminta."""
+        self._ensure_worker()
+        version, model_path = self.resolve(name, version)
+        key = (name, version)
+        entry = self._loaded.get(key)
+        if entry is not None:
+            entry[1] = time.monotonic()
+            return entry[0]
+        with self._lock:
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+        # Satu lock per versi: request lain untuk versi yang sama menunggu, versi lain tidak terblokir
+        with load_lock:
+            entry = self._loaded.get(key)
+            if entry is None:
+                entry = [self._load(name, version, model_path), time.monotonic()]
+                with self._lock:
+                    self._loaded[key] = entry
+                    self._evict_over_capacity(keep=key)
+        entry[1] = time.monotonic()
+        return entry[0]
+
+    def _load(self, name, version, model_path):
+        start = time.perf_counter()
+        try:
+            scorer = self.make_scorer(load_model_from_path(model_path))
+            if self.warmup_X is not None:
+                warm_up(scorer, self.warmup_X)
+        except Exception:
+            if self.loads_counter is not None:
+                self.loads_counter.labels(model=name, result='failure').inc()
+            raise
+        duration = time.perf_counter() - start
+        if self.loads_counter is not None:
+            self.loads_counter.labels(model=name, result='success').inc()
+        if self.load_duration_gauge is not None:
+            self.load_duration_gauge.labels(model=name, version=version).set(duration)
+        if self.loaded_gauge is not None:
+            self.loaded_gauge.labels(model=name, version=version).set(1)
+        print(f"[INFO] Model registry {name} versi {version} dimuat ({model_path}, {duration:.2f} s).")
+        return ModelBundle(scorer.model, scorer, version, model_path, name=name)
+
+    # --- 3. Unload Model yang Tidak Dipakai ---
+    def _unload(self, key, reason):
+        # Dipanggil dengan self._lock dipegang
+        self._loaded.pop(key, None)
+        if self.loaded_gauge is not None:
+            self.loaded_gauge.labels(model=key[0], version=key[1]).set(0)
+        if self.unloads_counter is not None:
+            self.unloads_counter.labels(reason=reason).inc()
+        print(f"[INFO] Model registry {key[0]} versi {key[1]} di-unload ({reason}).")
+
+    def _evict_over_capacity(self, keep):
+        while len(self._loaded) > self.max_loaded:
+            candidates = [key for key in self._loaded if key != keep]
+            if not candidates:
+                break
+            self._unload(min(candidates, key=lambda key: self._loaded[key][1]), 'capacity')
+
+    def unload_idle(self):
+        """Meng-unload bundle yang tidak dipakai lebih dari idle_seconds. Mengembalikan jumlah yang di-unload."""
+        deadline = time.monotonic() - self.idle_seconds
+        with self._lock:
+            idle = [key for key, (_, last_used) in self._loaded.items() if last_used < deadline]
+            for key in idle:
+                self._unload(key, 'idle')
+        return len(idle)
+
+    def _ensure_worker(self):
+        # Thread tidak ikut tersalin saat fork, jadi thread unload dibuat ulang per proses
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(target=self._run, name="model-registry", daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def _run(self):
+        while True:
+            time.sleep(min(max(self.idle_seconds / 4, 1.0), 60.0))
+            try:
+                self.unload_idle()
+            except Exception as e:
+                print(f"[ERROR] Unload model registry gagal: {e}")
+
+
+def _version_key(version):
+    return (0, int(version), "") if str(version).isdigit() else (1, 0, str(version))
@@ -0,0 +1,87 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+import joblib
+from feature_encoder import final_columns
+
+# Artefak model minimal untuk serving: model.joblib (array numpy bisa di-mmap) + manifest.json.
+# Loader di sini hanya butuh joblib/numpy/sklearn, tanpa import mlflow yang berat saat startup.
+
+MANIFEST_FILE = "manifest.json"
+MODEL_FILE = "model.joblib"
+FORMAT_VERSION = 1
+
+
+# --- 1. Packaging (sekali, offline) ---
+def _sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def package_model(model, output_dir, columns=final_columns, source=None):
+    """Menyimpan model dan skema inputnya ke `output_dir`; mengembalikan manifest."""
+    feature_names = getattr(model, 'feature_names_in_', None)
+    if feature_names is not None and list(feature_names) != list(columns):
+        raise ValueError("Urutan kolom model tidak sama dengan skema input yang akan ditulis ke manifest.")
+
+    import sklearn
+    os.makedirs(output_dir, exist_ok=True)
+    model_path = os.path.join(output_dir, MODEL_FILE)
+    # Tanpa kompresi agar array besar (mis. node pohon) bisa di-mmap saat load
+    joblib.dump(model, model_path, compress=0)
+
+    manifest = {
+        "format_version": FORMAT_VERSION,
+        "model_file": MODEL_FILE,
+        "sha256": _sha256(model_path),
+        "estimator": f"{type(model).__module__}.{type(model).__name__}",
+        "sklearn_version": sklearn.__version__,
+        "classes": [c.item() if hasattr(c, 'item') else c for c in getattr(model, 'classes_', [])],
+        "columns": list(columns),
+        "source": source,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+    }
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+# --- 2. Loader Cepat (saat serving) ---
+def is_packaged_model(path):
+    return os.path.isfile(os.path.join(path, MANIFEST_FILE))
+
+
+def load_packaged_model(path, columns=final_columns, mmap_mode='r', verify_checksum=False):
+    """
+    Memuat model dari folder hasil package_model. Skema input di manifest harus sama dengan `columns`.
+    Dengan mmap_mode='r' array numpy dipetakan langsung dari file (dibagi antar worker lewat page cache).
+    """
+    with open(os.path.join(path, MANIFEST_FILE)) as f:
+        manifest = json.load(f)
+    if manifest.get("format_version") != FORMAT_VERSION:
+        raise ValueError(f"Versi format artefak tidak didukung: {manifest.get('format_version')}")
+    if columns is not None and manifest["columns"] != list(columns):
+        raise ValueError("Skema input di manifest tidak sama dengan final_columns.")
+
+    model_path = os.path.join(path, manifest["model_file"])
+    if verify_checksum and _sha256(model_path) != manifest["sha256"]:
+        raise ValueError(f"Checksum {model_path} tidak cocok dengan manifest.")
+    return joblib.load(model_path, mmap_mode=mmap_mode)
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mengemas model MLflow sklearn menjadi artefak joblib + manifest.json.")
+    parser.add_argument("model_path", nargs="?", default="./tuned-churn-model-dagshub/tuned-churn-model-dagshub")
+    parser.add_argument("output_dir", nargs="?", default="./packaged_model")
+    args = parser.parse_args()
+
+    import mlflow.sklearn
+    sk_model = mlflow.sklearn.load_model(args.model_path)
+    manifest = package_model(sk_model, args.output_dir, source=os.path.abspath(args.model_path))
+    print(f"[INFO] Model {manifest['estimator']} dikemas ke {args.output_dir} (sha256 {manifest['sha256'][:12]}...)")
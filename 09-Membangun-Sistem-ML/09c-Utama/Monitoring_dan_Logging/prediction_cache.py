@@ -0,0 +1,141 @@
+import hashlib
+import threading
+import time
+import weakref
+from collections import OrderedDict
+import numpy as np
+
+
+class PredictionCache:
+    """
+    Cache prediksi in-process dengan eviction LRU dan TTL.
+
+    Kunci cache adalah (nomor model, hash blake2b 16 byte dari baris `final_columns` yang sudah
+    di-encode), sehingga profil pelanggan yang identik memakai hasil scoring yang sama tanpa peduli
+    urutan field di JSON, dan beberapa model (registry, hot reload) bisa berbagi satu cache tanpa
+    saling menjawab. Nomor model diberikan per objek `model_token` (scorer); entri milik model yang
+    sudah tidak dipakai (token di-garbage-collect) dibuang pada panggilan berikutnya. Memori
+    dibatasi oleh `max_entries`.
+    """
+
+    def __init__(self, max_entries=10000, ttl_seconds=300.0, hits_counter=None, misses_counter=None,
+                 evictions_counter=None, size_gauge=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits_counter = hits_counter
+        self.misses_counter = misses_counter
+        self.evictions_counter = evictions_counter
+        self.size_gauge = size_gauge
+        self._entries = OrderedDict()  # key -> (expires_at, label, churn_probability)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._token_ids = weakref.WeakKeyDictionary()  # model_token -> nomor model di kunci cache
+        self._next_token_id = 0
+        self._retired_tokens = []
+
+    @staticmethod
+    def _key(row):
+        return hashlib.blake2b(row.tobytes(), digest_size=16).digest()
+
+    def _evicted(self, reason, count=1):
+        if self.evictions_counter is not None:
+            self.evictions_counter.labels(reason=reason).inc(count)
+
+    def _update_size(self):
+        if self.size_gauge is not None:
+            self.size_gauge.set(len(self._entries))
+
+    def _token_id(self, model_token):
+        # Dipanggil dengan self._lock dipegang
+        if model_token is None:
+            return 0
+        token_id = self._token_ids.get(model_token)
+        if token_id is None:
+            self._next_token_id += 1
+            token_id = self._token_ids[model_token] = self._next_token_id
+            # Finalizer bisa berjalan di thread mana pun (saat GC), jadi hanya mencatat; pembersihan
+            # entri dilakukan di score() dengan lock dipegang
+            weakref.finalize(model_token, self._retired_tokens.append, token_id)
+        return token_id
+
+    def _purge_retired(self):
+        # Dipanggil dengan self._lock dipegang; mengembalikan jumlah entri yang dibuang
+        retired = set()
+        while self._retired_tokens:
+            retired.add(self._retired_tokens.pop())
+        if not retired:
+            return 0
+        stale = [key for key in self._entries if key[0] in retired]
+        for key in stale:
+            del self._entries[key]
+        return len(stale)
+
+    def invalidate(self):
+        """Mengosongkan cache; hasil scoring yang sedang berjalan dari generasi lama tidak akan disimpan."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+            self._update_size()
+
+    def score(self, X, score_fn, model_token=None):
+        """
+        Mengembalikan (labels, churn_probabilities) untuk X. Baris yang ada di cache diambil langsung;
+        sisanya di-skor sekaligus lewat `score_fn` lalu disimpan.
+        """
+        X = np.ascontiguousarray(X)
+        n_rows = len(X)
+        digests = [self._key(row) for row in X]
+        labels = [None] * n_rows
+        churn_probabilities = np.empty(n_rows, dtype=np.float64)
+        missing = []
+        expired = 0
+        now = time.monotonic()
+
+        with self._lock:
+            retired = self._purge_retired()
+            token_id = self._token_id(model_token)
+            keys = [(token_id, digest) for digest in digests]
+            generation = self._generation
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                if entry is not None and entry[0] > now:
+                    self._entries.move_to_end(key)
+                    labels[i] = entry[1]
+                    churn_probabilities[i] = entry[2]
+                    continue
+                if entry is not None:
+                    del self._entries[key]
+                    expired += 1
+                missing.append(i)
+            if expired or retired:
+                self._update_size()
+
+        if expired:
+            self._evicted('ttl', expired)
+        if retired:
+            self._evicted('model', retired)
+        if self.hits_counter is not None and n_rows > len(missing):
+            self.hits_counter.inc(n_rows - len(missing))
+        if self.misses_counter is not None and missing:
+            self.misses_counter.inc(len(missing))
+
+        if missing:
+            missing_labels, missing_probabilities = score_fn(X[missing])
+            churn_probabilities[missing] = missing_probabilities
+            expires_at = time.monotonic() + self.ttl_seconds
+            evicted = 0
+            with self._lock:
+                store = generation == self._generation
+                for i, label, probability in zip(missing, missing_labels, missing_probabilities):
+                    labels[i] = label
+                    if store:
+                        self._entries[keys[i]] = (expires_at, label, float(probability))
+                        self._entries.move_to_end(keys[i])
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    evicted += 1
+                self._update_size()
+            if evicted:
+                self._evicted('lru', evicted)
+
+        return np.asarray(labels), churn_probabilities
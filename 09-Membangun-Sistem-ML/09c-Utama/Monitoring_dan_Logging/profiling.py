@@ -0,0 +1,115 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+# Alat bantu observabilitas latensi: timer per tahap request dan sampling profiler on-demand.
+
+# Bucket lebih halus dari default Histogram karena tiap tahap biasanya di bawah 1 ms
+STAGE_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+MAX_PROFILE_SECONDS = 60.0
+# Interval di bawah 1 ms membuat loop sampling memonopoli GIL dan ikut memperlambat traffic live
+MIN_INTERVAL_SECONDS = 0.001
+# Thread yang frame teratasnya berada di modul-modul ini sedang menunggu (lock, antrian, select),
+# misalnya thread worker waitress yang idle; stack-nya tidak berisi kerja request
+IDLE_WAIT_MODULES = ('threading.py', 'queue.py', 'selectors.py')
+
+
+# --- 1. Timer per Tahap ---
+class _StageTimer:
+    __slots__ = ('_child', '_start')
+
+    def __init__(self, child):
+        self._child = child
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self._child.observe(time.perf_counter() - self._start)
+        return False
+
+
+class StageLatency:
+    """
+    Pencatat durasi per tahap request ke Histogram berlabel `stage`:
+
+        with stage_latency.time('encode'):
+            X = encoder.encode(records)
+
+    atau `stage_latency.observe('telemetry', detik)` untuk tahap yang waktunya dijumlahkan dari
+    beberapa blok. Child histogram per label di-cache agar `labels()` tidak dipanggil setiap request.
+    """
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+        self._children = {}
+
+    def _child(self, stage):
+        child = self._children.get(stage)
+        if child is None:
+            child = self._children[stage] = self.histogram.labels(stage=stage)
+        return child
+
+    def time(self, stage):
+        return _StageTimer(self._child(stage))
+
+    def observe(self, stage, seconds):
+        self._child(stage).observe(seconds)
+
+
+# --- 2. Sampling Profiler ---
+def _collapse(frame):
+    """Mengubah stack frame menjadi satu baris format collapsed (root;...;leaf) untuk flamegraph."""
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+def _is_idle(frame):
+    return os.path.basename(frame.f_code.co_filename) in IDLE_WAIT_MODULES
+
+
+class SamplingProfiler:
+    """
+    Profiler berbasis sampling untuk traffic live: setiap `interval_seconds` stack semua thread
+    diambil lewat sys._current_frames() dan dihitung. Thread profiler sendiri selalu dilewati, begitu
+    juga thread yang sedang menunggu di threading/queue/selectors kecuali `include_idle=True`.
+    Hanya satu sesi yang boleh berjalan sekaligus. Hasilnya teks "stack jumlah" per baris,
+    bisa langsung diberikan ke flamegraph.pl / speedscope.
+    Pada mode multi-proses (Gunicorn) yang diprofil hanya worker yang menerima request ini.
+    """
+
+    def __init__(self):
+        self._running = threading.Lock()
+
+    def profile(self, seconds, interval_seconds=0.005, include_idle=False):
+        seconds = min(max(float(seconds), 0.0), MAX_PROFILE_SECONDS)
+        interval_seconds = float(interval_seconds)
+        if not interval_seconds >= MIN_INTERVAL_SECONDS:
+            raise ValueError(f"interval_ms minimal {MIN_INTERVAL_SECONDS * 1000:g}.")
+        if not self._running.acquire(blocking=False):
+            raise RuntimeError("Sesi profiling lain sedang berjalan.")
+        try:
+            own_thread = threading.get_ident()
+            stacks = Counter()
+            n_samples = 0
+            deadline = time.perf_counter() + seconds
+            while time.perf_counter() < deadline:
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id != own_thread and (include_idle or not _is_idle(frame)):
+                        stacks[_collapse(frame)] += 1
+                n_samples += 1
+                time.sleep(interval_seconds)
+            return stacks, n_samples
+        finally:
+            self._running.release()
+
+
+def format_collapsed(stacks):
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
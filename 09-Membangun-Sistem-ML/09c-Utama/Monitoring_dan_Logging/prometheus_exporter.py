@@ -1,157 +1,717 @@
 import time
-import pandas as pd
 import numpy as np
-import mlflow.sklearn
-from flask import Flask, request, jsonify
-from prometheus_client import Counter, Histogram, Gauge, make_wsgi_app, generate_latest
+from flask import Flask, Response, request, jsonify, stream_with_context
+from prometheus_client import Counter, Histogram, Gauge, CollectorRegistry, REGISTRY, make_wsgi_app, generate_latest, multiprocess
 from werkzeug.middleware.dispatcher import DispatcherMiddleware
 import os 
+from feature_encoder import ChurnFeatureEncoder, final_columns, normalize_records
+from micro_batcher import MicroBatcher
+from churn_scorer import ChurnScorer
+from model_manager import WARMUP_RECORDS, ModelManager, discover_latest, load_model_from_path, warm_up
+from prediction_cache import PredictionCache
+from bulk_scoring import CSV_MIMETYPES, NDJSON_MIMETYPES, count_classes, stream_bulk_predictions
+from batch_telemetry import (KNOWN_CONTRACTS, check_histogram_internals, count_categories, inc_counter_batch,
+                             numeric_column, observe_histogram_batch)
+from drift_detector import DriftMonitor, load_baseline
+from structured_logger import StructuredLogger
+from audit_log import AuditLogSink
+from feature_store import FeatureStore
+from reason_codes import DEFAULT_TOP_K, make_explainer
+from shadow_scorer import DELTA_BUCKETS, ShadowScorer
+from model_registry import ModelNotFound, ModelRegistry, parse_extra_models
+from traffic_recorder import TrafficRecorder, TrafficRecordingMiddleware
+from admission_control import AdmissionController, AdmissionMiddleware, TokenBucketLimiter, parse_client_limits
+from response_formats import (JSON, FLOAT32, FLOAT32_COLUMNS, EXPLAIN_MIMETYPES, UnsupportedFormat, decode_request,
+                              encode_response, negotiate, request_format)
+from profiling import STAGE_BUCKETS, SamplingProfiler, StageLatency, format_collapsed
+import hmac
+import weakref
 
 # --- 1. Inisialisasi Aplikasi Flask ---
 app = Flask(__name__)
 
-# --- 2. Load Model ---
-model = None
-MODEL_PATH = "./model_artifact/tuned-churn-model-dagshub"
-try:
-    # Periksa apakah path model ada dan bisa diakses
-    if os.path.exists(MODEL_PATH):
-        model = mlflow.sklearn.load_model(MODEL_PATH)
-        print(f"[INFO] Model berhasil dimuat dari {MODEL_PATH}.")
-    else:
-        print(f"[ERROR] Path model tidak ditemukan: {MODEL_PATH}")
-except Exception as e:
-    print(f"[ERROR] Gagal memuat model: {e}")
+# --- 2. Konfigurasi Model ---
+MODEL_PATH = os.environ.get("MODEL_PATH", "./model_artifact/tuned-churn-model-dagshub")
+# Jika di-set, model terkompilasi (.npz dari compiled_model.py) dipakai menggantikan estimator pickle
+COMPILED_MODEL_PATH = os.environ.get("COMPILED_MODEL_PATH")
+# Hot reload: folder model, file .npz, atau folder registry MLflow (mlruns/models/<nama>) yang dipantau
+MODEL_WATCH_PATH = os.environ.get("MODEL_WATCH_PATH")
 
 # --- 3. Definisikan 10 Metrik Lengkap Anda ---
+# multiprocess_mode menentukan cara Gauge digabung antar worker saat PROMETHEUS_MULTIPROC_DIR di-set
+# (mode pre-fork Gunicorn); pada mode single-process (waitress) parameter ini diabaikan.
 PREDICTION_REQUESTS = Counter('prediction_requests_total', 'Total prediction requests received')
 PREDICTION_COUNT = Counter('prediction_class_count', 'Count of predictions per class', ['class_name'])
 PREDICTION_LATENCY = Histogram('prediction_latency_seconds', 'Latency of prediction requests in seconds')
-PREDICTION_FAILURES = Gauge('prediction_failures_total', 'Total prediction requests that failed')
-AVG_CHURN_PROBABILITY = Gauge('average_churn_probability', 'Average probability of churn prediction')
+# Rincian latensi per tahap: parse, validate, telemetry, encode, score, serialize
+PREDICTION_STAGE_LATENCY = Histogram('prediction_stage_latency_seconds', 'Latency of each prediction request stage in seconds',
+                                     ['stage'], buckets=STAGE_BUCKETS)
+PREDICTION_FAILURES = Gauge('prediction_failures_total', 'Total prediction requests that failed', multiprocess_mode='sum')
+AVG_CHURN_PROBABILITY = Gauge('average_churn_probability', 'Average probability of churn prediction', multiprocess_mode='mostrecent')
 TENURE_DISTRIBUTION = Histogram('input_feature_tenure_distribution', 'Distribution of tenure feature in requests')
 MONTHLY_CHARGES_DISTRIBUTION = Histogram('input_feature_monthlycharges_distribution', 'Distribution of MonthlyCharges feature in requests')
 TOTAL_CHARGES_DISTRIBUTION = Histogram('input_feature_totalcharges_distribution', 'Distribution of TotalCharges feature in requests')
 CONTRACT_TYPE_COUNT = Counter('input_feature_contract_type_count', 'Count of contract types in requests', ['contract'])
-LAST_SUCCESSFUL_PREDICTION_TIME = Gauge('last_successful_prediction_timestamp_seconds', 'Timestamp of the last successful prediction')
+LAST_SUCCESSFUL_PREDICTION_TIME = Gauge('last_successful_prediction_timestamp_seconds', 'Timestamp of the last successful prediction', multiprocess_mode='max')
+# observe_histogram_batch menulis atribut privat Histogram; server menolak start jika versinya tidak cocok
+for _histogram in (TENURE_DISTRIBUTION, MONTHLY_CHARGES_DISTRIBUTION, TOTAL_CHARGES_DISTRIBUTION):
+    check_histogram_internals(_histogram)
+
+# Metrik micro-batching (hanya terisi jika BATCHING_ENABLED aktif)
+BATCH_QUEUE_DEPTH = Gauge('prediction_batch_queue_depth', 'Requests waiting in the micro-batching queue', multiprocess_mode='livesum')
+BATCH_SIZE = Histogram('prediction_batch_size_rows', 'Rows scored per micro-batch',
+                       buckets=(1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096))
+BATCH_QUEUE_WAIT = Histogram('prediction_batch_queue_wait_seconds', 'Time requests spend waiting in the micro-batching queue',
+                             buckets=(0.0001, 0.00025, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25))
+
+# Metrik cache prediksi (hanya terisi jika PREDICTION_CACHE_SIZE > 0)
+PREDICTION_CACHE_HITS = Counter('prediction_cache_hits_total', 'Rows served from the prediction cache')
+PREDICTION_CACHE_MISSES = Counter('prediction_cache_misses_total', 'Rows not found in the prediction cache')
+PREDICTION_CACHE_EVICTIONS = Counter('prediction_cache_evictions_total', 'Prediction cache entries evicted', ['reason'])
+PREDICTION_CACHE_SIZE = Gauge('prediction_cache_entries', 'Current number of entries in the prediction cache', multiprocess_mode='livesum')
+
+# Metrik drift input terhadap baseline training (hanya terisi jika baseline drift tersedia)
+FEATURE_DRIFT_PSI = Gauge('feature_drift_psi', 'Population stability index of live inputs vs training baseline', ['feature'], multiprocess_mode='mostrecent')
+FEATURE_DRIFT_KS = Gauge('feature_drift_ks', 'Binned KS statistic of live inputs vs training baseline', ['feature'], multiprocess_mode='mostrecent')
+FEATURE_DRIFT_WINDOW_ROWS = Gauge('feature_drift_window_rows', 'Rows in the last evaluated drift window', multiprocess_mode='mostrecent')
+FEATURE_DRIFT_LAST_EVALUATION = Gauge('feature_drift_last_evaluation_timestamp_seconds', 'Timestamp of the last drift evaluation', multiprocess_mode='max')
+
+# Metrik versi model dan hot reload
+MODEL_VERSION = Gauge('model_version', 'Numeric version of the active model (registry version or file mtime)', multiprocess_mode='mostrecent')
+MODEL_VERSION_INFO = Gauge('model_version_info', 'Active model version (1 = active)', ['version'], multiprocess_mode='mostrecent')
+MODEL_LOAD_DURATION = Gauge('model_load_duration_seconds', 'Time to load and warm up the active model', multiprocess_mode='mostrecent')
+MODEL_RELOADS = Counter('model_reloads_total', 'Model hot reload attempts', ['result'])
+
+# Metrik logger asinkron
+LOG_RECORDS_DROPPED = Counter('log_records_dropped_total', 'Log records dropped because the logging queue was full', ['level'])
+
+# Logger terstruktur: log di jalur request masuk antrian berbatas dan ditulis oleh thread latar
+logger = StructuredLogger(
+    level=os.environ.get("LOG_LEVEL", "INFO"),
+    sample_rates={"DEBUG": float(os.environ.get("LOG_DEBUG_SAMPLE_RATE", "1.0"))},
+    max_queue=int(os.environ.get("LOG_QUEUE_SIZE", "10000")),
+    fmt=os.environ.get("LOG_FORMAT", "text"),
+    dropped_counter=LOG_RECORDS_DROPPED,
+)
+
+# Metrik audit log prediksi (hanya terisi jika AUDIT_LOG_DIR di-set)
+AUDIT_ROWS_WRITTEN = Counter('audit_log_rows_written_total', 'Scored rows written to audit log files')
+AUDIT_ROWS_DROPPED = Counter('audit_log_rows_dropped_total', 'Scored rows dropped by the audit log (buffer full or write error)')
+AUDIT_FLUSH_DURATION = Histogram('audit_log_flush_duration_seconds', 'Time to write one audit log file')
+AUDIT_BUFFER_ROWS = Gauge('audit_log_buffer_rows', 'Rows waiting in the audit log buffer', multiprocess_mode='livesum')
+
+# Metrik admission control (saturasi: bandingkan in-flight/antrian dengan admission_limit)
+ADMISSION_IN_FLIGHT = Gauge('admission_in_flight_requests', 'Prediction requests currently being processed', multiprocess_mode='livesum')
+ADMISSION_QUEUE_DEPTH = Gauge('admission_queue_depth', 'Prediction requests waiting for an in-flight slot', multiprocess_mode='livesum')
+ADMISSION_LIMIT = Gauge('admission_limit', 'Configured admission limits', ['kind'], multiprocess_mode='livesum')
+ADMISSION_REJECTIONS = Counter('admission_rejections_total', 'Prediction requests rejected with 429', ['reason'])
+ADMISSION_QUEUE_WAIT = Histogram('admission_queue_wait_seconds', 'Time requests spend waiting for an in-flight slot',
+                                 buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0))
+
+# Metrik per model (model="default" untuk model utama, selain itu nama model di registry)
+MODEL_PREDICTION_LATENCY = Histogram('model_prediction_latency_seconds', 'Latency of prediction requests per model version', ['model', 'version'])
+MODEL_PREDICTIONS = Counter('model_predictions_total', 'Predicted rows per model version and class', ['model', 'version', 'class_name'])
+REGISTRY_MODEL_LOADED = Gauge('registry_model_loaded', 'Registry model version currently loaded (1 = loaded)', ['model', 'version'], multiprocess_mode='livesum')
+REGISTRY_MODEL_LOADS = Counter('registry_model_loads_total', 'Registry model load attempts', ['model', 'result'])
+REGISTRY_MODEL_UNLOADS = Counter('registry_model_unloads_total', 'Registry models unloaded', ['reason'])
+REGISTRY_MODEL_LOAD_DURATION = Gauge('registry_model_load_duration_seconds', 'Time to load and warm up a registry model', ['model', 'version'], multiprocess_mode='mostrecent')
+
+# Metrik shadow scoring (model challenger di luar jalur request)
+SHADOW_ROWS = Counter('shadow_rows_total', 'Rows scored by the challenger model, by agreement with the primary label', ['result'])
+SHADOW_PROBABILITY_DELTA = Histogram('shadow_probability_delta', 'Challenger minus primary churn probability per row', buckets=DELTA_BUCKETS)
+SHADOW_LATENCY = Histogram('shadow_latency_seconds', 'Challenger model scoring time per batch', buckets=STAGE_BUCKETS)
+SHADOW_SHED_ROWS = Counter('shadow_shed_rows_total', 'Rows not shadow-scored because the shadow queue was full')
+SHADOW_ERRORS = Counter('shadow_errors_total', 'Shadow scoring batches that failed')
+SHADOW_QUEUE_DEPTH = Gauge('shadow_queue_depth', 'Batches waiting for the challenger model', multiprocess_mode='livesum')
+
+# Metrik feature store (/predict/by-id)
+FEATURE_STORE_CUSTOMERS = Gauge('feature_store_customers', 'Customers in the feature store', multiprocess_mode='mostrecent')
+FEATURE_STORE_LOOKUPS = Counter('feature_store_lookups_total', 'Customer IDs looked up in the feature store', ['result'])
+
+# Metrik perekaman traffic (TRAFFIC_RECORD_PATH)
+TRAFFIC_RECORDED = Counter('traffic_recorded_requests_total', 'Prediction requests written to the traffic log')
+TRAFFIC_RECORD_DROPPED = Counter('traffic_record_dropped_total', 'Prediction requests not recorded because the traffic log queue was full or the write failed')
 
 # --- 4. Logika Endpoint Prediksi ---
-final_columns = [
-    'tenure', 'MonthlyCharges', 'TotalCharges', 'gender_Male',
-    'SeniorCitizen_Yes', 'Partner_Yes', 'Dependents_Yes',
-    'PhoneService_Yes', 'MultipleLines_No phone service',
-    'MultipleLines_Yes', 'InternetService_Fiber optic', 'InternetService_No',
-    'OnlineSecurity_No internet service', 'OnlineSecurity_Yes',
-    'OnlineBackup_No internet service', 'OnlineBackup_Yes',
-    'DeviceProtection_No internet service', 'DeviceProtection_Yes',
-    'TechSupport_No internet service', 'TechSupport_Yes',
-    'StreamingTV_No internet service', 'StreamingTV_Yes',
-    'StreamingMovies_No internet service', 'StreamingMovies_Yes',
-    'Contract_One year', 'Contract_Two year', 'PaperlessBilling_Yes',
-    'PaymentMethod_Credit card (automatic)', 'PaymentMethod_Electronic check',
-    'PaymentMethod_Mailed check'
-]
+stage_latency = StageLatency(PREDICTION_STAGE_LATENCY)
+
+# Encoder dikompilasi sekali saat startup dari final_columns
+encoder = ChurnFeatureEncoder(final_columns)
+
+# Scoring satu-lintasan: predict_proba sekali, label dari ambang keputusan yang bisa diatur
+DECISION_THRESHOLD = float(os.environ.get("DECISION_THRESHOLD", "0.5"))
+
+def make_scorer(model):
+    return ChurnScorer(model, threshold=DECISION_THRESHOLD, columns=final_columns)
+
+# Load model lewat ModelManager: model aktif bisa ditukar tanpa restart (hot reload, jika MODEL_WATCH_PATH di-set)
+model_manager = ModelManager(
+    make_scorer,
+    warmup_X=encoder.encode(WARMUP_RECORDS),
+    watch_path=MODEL_WATCH_PATH,
+    poll_seconds=float(os.environ.get("MODEL_POLL_SECONDS", "30")),
+    version_gauge=MODEL_VERSION,
+    version_info_gauge=MODEL_VERSION_INFO,
+    load_duration_gauge=MODEL_LOAD_DURATION,
+    reloads_counter=MODEL_RELOADS,
+)
+try:
+    # Periksa apakah path model ada dan bisa diakses
+    if MODEL_WATCH_PATH:
+        initial_version, initial_path = discover_latest(MODEL_WATCH_PATH)
+    elif COMPILED_MODEL_PATH and os.path.exists(COMPILED_MODEL_PATH):
+        initial_version, initial_path = "initial", COMPILED_MODEL_PATH
+    else:
+        initial_version, initial_path = "initial", MODEL_PATH
+    if initial_path and os.path.exists(initial_path):
+        model_manager.load(initial_path, initial_version)
+    else:
+        print(f"[ERROR] Path model tidak ditemukan: {initial_path or MODEL_WATCH_PATH}")
+except Exception as e:
+    print(f"[ERROR] Gagal memuat model: {e}")
+
+# Registry multi-model opsional: /predict/<nama>/<versi> atau header X-Model-Name / X-Model-Version.
+# MODEL_REGISTRY_PATH = folder mlruns (berisi models/<nama>/version-N); MODEL_REGISTRY_MODELS = "nama=path,..."
+model_registry = None
+MODEL_REGISTRY_PATH = os.environ.get("MODEL_REGISTRY_PATH")
+MODEL_REGISTRY_MODELS = parse_extra_models(os.environ.get("MODEL_REGISTRY_MODELS"))
+if MODEL_REGISTRY_PATH or MODEL_REGISTRY_MODELS:
+    model_registry = ModelRegistry(
+        make_scorer,
+        mlruns_dir=MODEL_REGISTRY_PATH,
+        extra_models=MODEL_REGISTRY_MODELS,
+        warmup_X=encoder.encode(WARMUP_RECORDS),
+        idle_seconds=float(os.environ.get("MODEL_IDLE_SECONDS", "900")),
+        max_loaded=int(os.environ.get("MODEL_REGISTRY_MAX_LOADED", "4")),
+        loaded_gauge=REGISTRY_MODEL_LOADED,
+        loads_counter=REGISTRY_MODEL_LOADS,
+        unloads_counter=REGISTRY_MODEL_UNLOADS,
+        load_duration_gauge=REGISTRY_MODEL_LOAD_DURATION,
+    )
+    print(f"[INFO] Registry model aktif: {', '.join(f'{name} {sorted(versions)}' for name, versions in model_registry.available().items()) or '(kosong)'}.")
+
+def registry_bundle(name, version):
+    """Bundle untuk model yang dipilih lewat URL/header; None berarti model utama ("default")."""
+    if not name or name == "default":
+        return None
+    if model_registry is None:
+        raise ModelNotFound("Registry model tidak aktif (set MODEL_REGISTRY_PATH atau MODEL_REGISTRY_MODELS).")
+    return model_registry.get(name, version or "latest")
+
+def current_model():
+    """Model yang sedang aktif (None jika belum ada model yang berhasil dimuat)."""
+    bundle = model_manager.current
+    return bundle.model if bundle is not None else None
+
+def score_matrix(X, bundle=None):
+    """Men-skor matriks fitur dan mengembalikan (predictions, churn_probabilities)."""
+    return (bundle or model_manager.current).scorer.score(X)
+
+# Micro-batching opsional: gabungkan baris dari request yang bersamaan ke satu panggilan model
+batcher = None
+if os.environ.get("BATCHING_ENABLED", "0").lower() in ("1", "true", "yes"):
+    batcher = MicroBatcher(
+        score_matrix,
+        max_batch_size=int(os.environ.get("BATCH_MAX_SIZE", "256")),
+        max_wait_seconds=float(os.environ.get("BATCH_MAX_WAIT_MS", "2")) / 1000.0,
+        queue_depth_gauge=BATCH_QUEUE_DEPTH,
+        batch_size_histogram=BATCH_SIZE,
+        queue_wait_histogram=BATCH_QUEUE_WAIT,
+    )
+    print(f"[INFO] Micro-batching aktif (max_batch_size={batcher.max_batch_size}, max_wait={batcher.max_wait_seconds * 1000:.1f} ms).")
+
+# Cache prediksi opsional (LRU + TTL) untuk profil pelanggan yang berulang
+prediction_cache = None
+if int(os.environ.get("PREDICTION_CACHE_SIZE", "0")) > 0:
+    prediction_cache = PredictionCache(
+        max_entries=int(os.environ["PREDICTION_CACHE_SIZE"]),
+        ttl_seconds=float(os.environ.get("PREDICTION_CACHE_TTL_SECONDS", "300")),
+        hits_counter=PREDICTION_CACHE_HITS,
+        misses_counter=PREDICTION_CACHE_MISSES,
+        evictions_counter=PREDICTION_CACHE_EVICTIONS,
+        size_gauge=PREDICTION_CACHE_SIZE,
+    )
+    print(f"[INFO] Cache prediksi aktif (max_entries={prediction_cache.max_entries}, ttl={prediction_cache.ttl_seconds} s).")
+
+# Deteksi drift: baseline dari drift_detector.py; counter di-update per request, skor dihitung di thread latar
+drift_monitor = None
+DRIFT_BASELINE_PATH = os.environ.get("DRIFT_BASELINE_PATH", "./drift_baseline.json")
+if os.path.exists(DRIFT_BASELINE_PATH):
+    drift_monitor = DriftMonitor(
+        load_baseline(DRIFT_BASELINE_PATH),
+        columns=final_columns,
+        interval_seconds=float(os.environ.get("DRIFT_INTERVAL_SECONDS", "60")),
+        min_rows=int(os.environ.get("DRIFT_MIN_ROWS", "200")),
+        psi_gauge=FEATURE_DRIFT_PSI,
+        ks_gauge=FEATURE_DRIFT_KS,
+        window_rows_gauge=FEATURE_DRIFT_WINDOW_ROWS,
+        last_evaluation_gauge=FEATURE_DRIFT_LAST_EVALUATION,
+    )
+    print(f"[INFO] Deteksi drift aktif (baseline {DRIFT_BASELINE_PATH}, interval {drift_monitor.interval_seconds} s).")
+
+# Audit log opsional: baris yang di-skor disimpan ke file Parquet/Arrow berotasi untuk retraining dan audit
+audit_sink = None
+AUDIT_LOG_DIR = os.environ.get("AUDIT_LOG_DIR")
+if AUDIT_LOG_DIR:
+    audit_sink = AuditLogSink(
+        AUDIT_LOG_DIR,
+        file_format=os.environ.get("AUDIT_LOG_FORMAT", "parquet"),
+        flush_rows=int(os.environ.get("AUDIT_FLUSH_ROWS", "50000")),
+        flush_seconds=float(os.environ.get("AUDIT_FLUSH_SECONDS", "60")),
+        rows_written_counter=AUDIT_ROWS_WRITTEN,
+        rows_dropped_counter=AUDIT_ROWS_DROPPED,
+        flush_duration_histogram=AUDIT_FLUSH_DURATION,
+        buffer_rows_gauge=AUDIT_BUFFER_ROWS,
+    )
+    print(f"[INFO] Audit log aktif ({audit_sink.file_format} di {AUDIT_LOG_DIR}, flush {audit_sink.flush_rows} baris / {audit_sink.flush_seconds} s).")
+
+# Feature store opsional: baris pelanggan yang sudah di-encode (dibangun dengan feature_store.py build)
+feature_store = None
+FEATURE_STORE_PATH = os.environ.get("FEATURE_STORE_PATH")
+if FEATURE_STORE_PATH:
+    try:
+        feature_store = FeatureStore(FEATURE_STORE_PATH, refresh_seconds=float(os.environ.get("FEATURE_STORE_REFRESH_SECONDS", "5")),
+                                     encoder=encoder)
+        FEATURE_STORE_CUSTOMERS.set(len(feature_store))
+        print(f"[INFO] Feature store aktif ({FEATURE_STORE_PATH}, {len(feature_store)} pelanggan).")
+    except Exception as e:
+        print(f"[ERROR] Gagal membuka feature store {FEATURE_STORE_PATH}: {e}")
+
+# Shadow scoring opsional: challenger dari SHADOW_MODEL_PATH men-skor ulang traffic model utama di thread latar
+shadow_scorer = None
+SHADOW_MODEL_PATH = os.environ.get("SHADOW_MODEL_PATH")
+if SHADOW_MODEL_PATH:
+    try:
+        challenger_scorer = make_scorer(load_model_from_path(SHADOW_MODEL_PATH))
+        warm_up(challenger_scorer, encoder.encode(WARMUP_RECORDS))
+        shadow_scorer = ShadowScorer(
+            challenger_scorer,
+            max_queue=int(os.environ.get("SHADOW_QUEUE_SIZE", "64")),
+            rows_counter=SHADOW_ROWS,
+            delta_histogram=SHADOW_PROBABILITY_DELTA,
+            latency_histogram=SHADOW_LATENCY,
+            shed_counter=SHADOW_SHED_ROWS,
+            errors_counter=SHADOW_ERRORS,
+            queue_depth_gauge=SHADOW_QUEUE_DEPTH,
+        )
+        print(f"[INFO] Shadow scoring aktif (challenger {SHADOW_MODEL_PATH}, antrian {shadow_scorer.max_queue} batch).")
+    except Exception as e:
+        print(f"[ERROR] Gagal memuat model challenger {SHADOW_MODEL_PATH}: {e}")
+
+def score_encoded(X, bundle=None, use_batcher=True):
+    """Men-skor baris yang sudah di-encode lewat micro-batcher (jika aktif) atau langsung."""
+    # Micro-batcher selalu men-skor dengan model utama, jadi model dari registry tidak lewat batcher
+    if batcher is not None and use_batcher:
+        return batcher.submit(X)
+    return score_matrix(X, bundle)
+
+def log_input_telemetry(records):
+    """Logging metrik distribusi fitur input per batch (vektor NumPy, satu update per bucket)."""
+    for feature, metric_hist in [
+        ('tenure', TENURE_DISTRIBUTION),
+        ('MonthlyCharges', MONTHLY_CHARGES_DISTRIBUTION),
+        ('TotalCharges', TOTAL_CHARGES_DISTRIBUTION)
+    ]:
+        values = numeric_column(records, feature)
+        if len(values) < len(records):
+            logger.warning("nilai_fitur_dilewati", feature=feature, skipped=len(records) - len(values))
+        observe_histogram_batch(metric_hist, values)
+
+    # Kontrak di luar KNOWN_CONTRACTS dicatat sebagai 'other' agar kardinalitas label tetap kecil
+    inc_counter_batch(CONTRACT_TYPE_COUNT, 'contract', count_categories(records, 'Contract', KNOWN_CONTRACTS))
+
+# Reason codes (explain=true): explainer dibuat sekali per scorer (per model/versi) lalu di-cache
+_explainers = weakref.WeakKeyDictionary()
+
+def explainer_for(bundle):
+    scorer = bundle.scorer
+    if scorer not in _explainers:
+        _explainers[scorer] = make_explainer(scorer, final_columns)
+    return _explainers[scorer]
+
+EXPLAIN_NOT_ACCEPTABLE = "Reason codes (explain=true) tidak tersedia dalam format float32; gunakan JSON, msgpack, atau Arrow."
+
+def explain_requested(args):
+    return args.get("explain", "").lower() in ("1", "true", "yes")
+
+def explain_top_k(args):
+    """Membaca query `explain` dan `top_k`; 0 berarti tanpa reason codes."""
+    if not explain_requested(args):
+        return 0
+    top_k = int(args.get("top_k", DEFAULT_TOP_K))
+    if not 1 <= top_k <= len(final_columns):
+        raise ValueError(f"top_k harus antara 1 dan {len(final_columns)}.")
+    return top_k
+
+def predict_records(raw_data, start_time, bundle=None, top_k=0):
+    """
+    Logika inti prediksi: encoding, scoring, dan pencatatan metrik.
+    Dipakai bersama oleh endpoint Flask (/predict) dan front-end ASGI (asgi_app.py).
+    `bundle` memilih model dari registry; None berarti model utama. Jika `top_k` > 0, response
+    berisi reason codes (top_k kontribusi fitur per baris).
+    Mengembalikan dict response; exception diteruskan ke pemanggil.
+    """
+    stage_start = time.perf_counter()
+    records = normalize_records(raw_data)
+    stage_end = time.perf_counter()
+    stage_latency.observe('validate', stage_end - stage_start)
+    
+    # Log debug (LOG_LEVEL=DEBUG): diformat di thread latar, bukan di jalur request
+    logger.debug("request_diterima", n_records=len(records), first_record=records[0] if records else None)
+
+    stage_start = time.perf_counter()
+    log_input_telemetry(records)
+    telemetry_seconds = time.perf_counter() - stage_start
+
+    # Preprocessing data untuk prediksi (encoder skema tetap, tanpa get_dummies)
+    with stage_latency.time('encode'):
+        X_final = encoder.encode(records)
+
+    return score_features(X_final, records, start_time, telemetry_seconds, bundle, top_k)
+
+def score_features(X_final, records, start_time, telemetry_seconds=0.0, bundle=None, top_k=0):
+    """
+    Bagian prediksi setelah encoding (drift, scoring, metrik, audit log); dipakai oleh
+    predict_records dan /predict/by-id (baris dari feature store).
+    """
+    stage_start = time.perf_counter()
+    if drift_monitor is not None:
+        drift_monitor.update(X_final)
+    telemetry_seconds += time.perf_counter() - stage_start
+    
+    # Bundle model diambil sekali: jika terjadi hot reload di tengah request, request ini tetap memakai model lama
+    use_batcher = bundle is None
+    if bundle is None:
+        bundle = model_manager.current
+
+    # Prediksi dan probabilitas churn (cache dulu, sisanya lewat micro-batcher jika aktif)
+    with stage_latency.time('score'):
+        if prediction_cache is not None:
+            predictions, churn_probabilities = prediction_cache.score(
+                X_final, lambda X: score_encoded(X, bundle, use_batcher), model_token=bundle.scorer)
+        else:
+            predictions, churn_probabilities = score_encoded(X_final, bundle, use_batcher)
+
+    stage_start = time.perf_counter()
+    # Hanya traffic model utama yang dibandingkan dengan challenger; submit tidak pernah menunggu
+    if shadow_scorer is not None and use_batcher:
+        shadow_scorer.submit(X_final, predictions, churn_probabilities)
+
+    # Set rata-rata probabilitas churn untuk semua prediksi dalam batch
+    AVG_CHURN_PROBABILITY.set(np.mean(churn_probabilities))
+
+    # Increment PREDICTION_COUNT per class (satu inc() per kelas, bukan per baris)
+    model_version = str(bundle.version)
+    for class_name, count in count_classes(predictions).items():
+        if count:
+            PREDICTION_COUNT.labels(class_name=class_name).inc(count)
+            MODEL_PREDICTIONS.labels(model=bundle.name, version=model_version, class_name=class_name).inc(count)
+    stage_latency.observe('telemetry', telemetry_seconds + time.perf_counter() - stage_start)
+    
+    latency = time.time() - start_time
+    PREDICTION_LATENCY.observe(latency)
+    MODEL_PREDICTION_LATENCY.labels(model=bundle.name, version=model_version).observe(latency)
+
+    if audit_sink is not None:
+        audit_version = model_version if bundle.name == "default" else f"{bundle.name}/{model_version}"
+        audit_sink.append(records, predictions, churn_probabilities, audit_version, latency)
+    
+    LAST_SUCCESSFUL_PREDICTION_TIME.set(time.time()) # Set timestamp saat ini
+
+    # Konversi ke list ikut dihitung di tahap serialize oleh pemanggil
+    response = {
+        'predictions': predictions,
+        'probabilities_churn': churn_probabilities
+    }
+    if top_k:
+        with stage_latency.time('explain'):
+            explainer = explainer_for(bundle)
+            if explainer is None:
+                raise ValueError(f"Model {type(bundle.model).__name__} tidak mendukung explain (reason codes).")
+            response['reasons'] = explainer.top_k(X_final, top_k)
+            response['reason_unit'] = explainer.unit
+    return response
+
+def to_json_ready(response):
+    """Mengubah array NumPy di response menjadi list agar bisa di-serialize ke JSON."""
+    return {key: value.tolist() if isinstance(value, np.ndarray) else value for key, value in response.items()}
 
 @app.route('/predict', methods=['POST'])
 def predict():
-    if model is None:
+    # Tanpa header X-Model-Name request dilayani model utama
+    return predict_with_model(request.headers.get("X-Model-Name"), request.headers.get("X-Model-Version"))
+
+@app.route('/predict/<name>/<version>', methods=['POST'])
+def predict_named(name, version):
+    return predict_with_model(name, version)
+
+def available_models():
+    """Model dan versi yang bisa dipanggil (true = sedang termuat di proses ini)."""
+    bundle = model_manager.current
+    models = {"default": {str(bundle.version): True} if bundle is not None else {}}
+    if model_registry is not None:
+        models.update(model_registry.available())
+    return models
+
+@app.route('/models', methods=['GET'])
+def list_models():
+    return jsonify(available_models())
+
+def predict_with_model(name, version):
+    start_time = time.time()
+    try:
+        bundle = registry_bundle(name, version)
+    except ModelNotFound as e:
         PREDICTION_FAILURES.inc()
-        print("[ERROR] Predict request received but model is not loaded.")
+        return jsonify({"error": str(e.args[0])}), 404
+    except Exception as e:
+        PREDICTION_FAILURES.inc()
+        logger.error("model_registry_gagal_dimuat", model=name, version=version, error=str(e))
+        return jsonify({"error": f"Gagal memuat model {name!r} versi {version!r}: {e}"}), 503
+    if bundle is None and current_model() is None:
+        PREDICTION_FAILURES.inc()
+        logger.error("model_belum_dimuat", endpoint="/predict")
         return jsonify({"error": "Model not loaded"}), 500
 
-    start_time = time.time()
     PREDICTION_REQUESTS.inc() # Increment total requests saat request diterima
 
+    # Format response dari header Accept (default JSON); format request dari Content-Type
+    response_mimetype = negotiate(request.headers.get("Accept"))
+    if response_mimetype is None:
+        PREDICTION_FAILURES.inc()
+        return jsonify({"error": "Format pada header Accept tidak didukung."}), 406
+    if explain_requested(request.args) and response_mimetype not in EXPLAIN_MIMETYPES:
+        PREDICTION_FAILURES.inc()
+        return jsonify({"error": EXPLAIN_NOT_ACCEPTABLE}), 406
     try:
-        raw_data = request.json
-        
-        # --- PERBAIKAN PENTING DI SINI UNTUK PENANGANAN DATAFRAME PANDAS ---
-        if isinstance(raw_data, dict):
-            # Jika input adalah single dictionary (misal: {"feature1": val}), bungkus dengan list
-            df_raw = pd.DataFrame([raw_data])
-        elif isinstance(raw_data, list):
-            # Jika input sudah berupa list of dictionaries (misal: [{"feature1": val}]), gunakan langsung
-            df_raw = pd.DataFrame(raw_data)
-        else:
-            # Jika format tidak dikenali
-            raise ValueError("Input data must be a dictionary or a list of dictionaries.")
-        
-        # --- DEBUGGING PRINTS (HAPUS SETELAH BERHASIL) ---
-        print(f"DEBUG IN SERVER: Tipe raw_data setelah konversi: {type(df_raw)}")
-        print(f"DEBUG IN SERVER: df_raw.head():\n{df_raw.head()}")
-        print(f"DEBUG IN SERVER: df_raw.shape: {df_raw.shape}")
-        # --- END DEBUGGING PRINTS ---
-
-        # Logging metrik distribusi fitur input
-        for feature, metric_hist in [
-            ('tenure', TENURE_DISTRIBUTION),
-            ('MonthlyCharges', MONTHLY_CHARGES_DISTRIBUTION)
-        ]:
-            if feature in df_raw and not df_raw[feature].empty:
-                for val in df_raw[feature]:
-                    try:
-                        metric_hist.observe(float(val))
-                    except (ValueError, TypeError):
-                        print(f"[WARNING] Skipping non-numeric value for {feature}: {val}")
-
-        if 'TotalCharges' in df_raw and not df_raw['TotalCharges'].empty:
-            total_charges_numeric = pd.to_numeric(df_raw['TotalCharges'], errors='coerce').dropna()
-            if not total_charges_numeric.empty:
-                for tc in total_charges_numeric: TOTAL_CHARGES_DISTRIBUTION.observe(tc)
+        request_mimetype = request_format(request.mimetype)
+    except UnsupportedFormat as e:
+        PREDICTION_FAILURES.inc()
+        return jsonify({"error": str(e)}), 415
+
+    try:
+        with stage_latency.time('parse'):
+            if request_mimetype != JSON:
+                raw_data = decode_request(request_mimetype, request.get_data())
             else:
-                print("[WARNING] 'TotalCharges' column is empty after conversion.")
-
-        if 'Contract' in df_raw and not df_raw['Contract'].empty:
-            for c in df_raw['Contract']:
-                # Pastikan label contract diinc() jika ada nilainya
-                CONTRACT_TYPE_COUNT.labels(contract=c).inc()
-
-        # Preprocessing data untuk prediksi
-        df_encoded = pd.get_dummies(df_raw).astype(float)
-        df_final = df_encoded.reindex(columns=final_columns, fill_value=0)
-        
-        # Prediksi
-        predictions = model.predict(df_final)
-        
-        # Probabilitas Churn
-        try:
-            probabilities = model.predict_proba(df_final)
-            # Ambil probabilitas untuk kelas '1' (Churn)
-            churn_probabilities = probabilities[:, 1] 
-            # Set rata-rata probabilitas churn untuk semua prediksi dalam batch
-            AVG_CHURN_PROBABILITY.set(np.mean(churn_probabilities)) 
-        except Exception as prob_e:
-            print(f"[WARNING] Gagal menghitung probabilitas: {prob_e}. Menggunakan default 0.")
-            churn_probabilities = [0.0] * len(predictions)
-            AVG_CHURN_PROBABILITY.set(0)
-
-        # Increment PREDICTION_COUNT per class
-        for pred_val in predictions:
-            class_name = 'Churn' if int(pred_val) == 1 else 'No_Churn'
-            PREDICTION_COUNT.labels(class_name=class_name).inc()
-        
-        latency = time.time() - start_time
-        PREDICTION_LATENCY.observe(latency)
-        
-        LAST_SUCCESSFUL_PREDICTION_TIME.set(time.time()) # Set timestamp saat ini
-
-        response = {
-            'predictions': predictions.tolist(),
-            'probabilities_churn': churn_probabilities.tolist()
-        }
-        
-        return jsonify(response)
+                raw_data = request.json
+        response = predict_records(raw_data, start_time, bundle, explain_top_k(request.args))
+        with stage_latency.time('serialize'):
+            if response_mimetype == JSON:
+                return jsonify(to_json_ready(response))
+            binary_response = Response(encode_response(response, response_mimetype), mimetype=response_mimetype)
+            if response_mimetype == FLOAT32:
+                binary_response.headers["X-Columns"] = FLOAT32_COLUMNS
+            return binary_response
 
     except Exception as e:
         PREDICTION_FAILURES.inc() # Increment kegagalan
-        print(f"[ERROR] Prediksi gagal karena: {e}")
+        logger.error("prediksi_gagal", error=str(e))
+        return jsonify({"error": str(e)}), 400
+
+# Profiling on-demand: aktif hanya jika ADMIN_TOKEN di-set, dan request wajib membawa header X-Admin-Token
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN")
+profiler = SamplingProfiler()
+
+def check_admin_token():
+    """Mengembalikan response error jika endpoint admin tidak aktif atau token salah, None jika diizinkan."""
+    if not ADMIN_TOKEN:
+        return jsonify({"error": "Not found"}), 404
+    if not hmac.compare_digest(request.headers.get("X-Admin-Token", ""), ADMIN_TOKEN):
+        return jsonify({"error": "Forbidden"}), 403
+    return None
+
+@app.route('/admin/profile', methods=['POST'])
+def admin_profile():
+    """
+    Sampling profiler selama `seconds` detik terhadap traffic live; hasilnya collapsed stacks (flamegraph).
+    `interval_ms` minimal 1; `idle=1` ikut menyertakan thread yang sedang menunggu.
+    """
+    denied = check_admin_token()
+    if denied is not None:
+        return denied
+    try:
+        seconds = float(request.args.get("seconds", "10"))
+        interval_seconds = float(request.args.get("interval_ms", "5")) / 1000.0
+        include_idle = request.args.get("idle", "0").lower() in ("1", "true", "yes")
+        stacks, n_samples = profiler.profile(seconds, interval_seconds, include_idle=include_idle)
+    except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except RuntimeError as e:
+        return jsonify({"error": str(e)}), 409
+    logger.info("profiling_selesai", samples=n_samples, unique_stacks=len(stacks))
+    return Response(format_collapsed(stacks), mimetype="text/plain")
+
+# Ukuran chunk untuk /predict/bulk: jumlah baris yang di-parse, di-encode, dan di-skor sekaligus
+BULK_CHUNK_SIZE = int(os.environ.get("BULK_CHUNK_SIZE", "1000"))
+
+@app.route('/predict/by-id', methods=['POST'])
+def predict_by_id():
+    """Scoring pelanggan berdasarkan customerID dari feature store, tanpa parsing dan encoding atribut."""
+    if current_model() is None:
+        PREDICTION_FAILURES.inc()
+        logger.error("model_belum_dimuat", endpoint="/predict/by-id")
+        return jsonify({"error": "Model not loaded"}), 500
+    if feature_store is None:
+        return jsonify({"error": "Feature store tidak aktif (set FEATURE_STORE_PATH)."}), 404
+
+    start_time = time.time()
+    PREDICTION_REQUESTS.inc()
+    try:
+        with stage_latency.time('parse'):
+            payload = request.json
+        customer_ids = payload.get("customerIDs", payload.get("customerID")) if isinstance(payload, dict) else payload
+        if isinstance(customer_ids, str):
+            customer_ids = [customer_ids]
+        if not isinstance(customer_ids, list) or not customer_ids:
+            raise ValueError("Payload harus berisi 'customerID' atau list 'customerIDs'.")
+
+        with stage_latency.time('encode'):
+            X_final, found_ids, missing_ids = feature_store.lookup([str(customer_id) for customer_id in customer_ids])
+        FEATURE_STORE_LOOKUPS.labels(result='hit').inc(len(found_ids))
+        if missing_ids:
+            FEATURE_STORE_LOOKUPS.labels(result='miss').inc(len(missing_ids))
+        FEATURE_STORE_CUSTOMERS.set(len(feature_store))
+        if not found_ids:
+            return jsonify({"error": "customerID tidak ditemukan di feature store.", "missing": missing_ids}), 404
+
+        # Telemetri numerik diambil langsung dari kolom matriks (tidak ada record mentah)
+        stage_start = time.perf_counter()
+        for feature, metric_hist in [('tenure', TENURE_DISTRIBUTION), ('MonthlyCharges', MONTHLY_CHARGES_DISTRIBUTION),
+                                     ('TotalCharges', TOTAL_CHARGES_DISTRIBUTION)]:
+            observe_histogram_batch(metric_hist, X_final[:, encoder.numeric_index[feature]])
+        telemetry_seconds = time.perf_counter() - stage_start
+
+        # Audit log hanya menyimpan customerID; atribut lengkapnya ada di feature store
+        records = [{'customerID': customer_id} for customer_id in found_ids]
+        response = score_features(X_final, records, start_time, telemetry_seconds, top_k=explain_top_k(request.args))
+        with stage_latency.time('serialize'):
+            return jsonify({'customerIDs': found_ids, 'missing': missing_ids, **to_json_ready(response)})
+    except Exception as e:
+        PREDICTION_FAILURES.inc()
+        logger.error("prediksi_by_id_gagal", error=str(e))
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/admin/features', methods=['POST'])
+def admin_features():
+    """Upsert pelanggan yang berubah/baru ke feature store: list record format /predict + customerID."""
+    denied = check_admin_token()
+    if denied is not None:
+        return denied
+    if feature_store is None:
+        return jsonify({"error": "Feature store tidak aktif (set FEATURE_STORE_PATH)."}), 404
+    try:
+        records = normalize_records(request.json)
+        customer_ids = [record.pop('customerID') for record in records]
+        n_updated, n_added = feature_store.upsert(customer_ids, records)
+    except (KeyError, AttributeError):
+        return jsonify({"error": "Setiap record wajib berupa object dengan 'customerID'."}), 400
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    FEATURE_STORE_CUSTOMERS.set(len(feature_store))
+    logger.info("feature_store_diperbarui", updated=n_updated, added=n_added)
+    return jsonify({"updated": n_updated, "added": n_added, "customers": len(feature_store)})
+
+@app.route('/predict/bulk', methods=['POST'])
+def predict_bulk():
+    """Scoring file besar (CSV / NDJSON, boleh chunked) secara streaming, chunk demi chunk."""
+    if current_model() is None:
+        PREDICTION_FAILURES.inc()
+        logger.error("model_belum_dimuat", endpoint="/predict/bulk")
+        return jsonify({"error": "Model not loaded"}), 500
+
+    PREDICTION_REQUESTS.inc()
+    mimetype = request.mimetype
+    if mimetype not in CSV_MIMETYPES + NDJSON_MIMETYPES:
+        PREDICTION_FAILURES.inc()
+        return jsonify({"error": f"Content-Type tidak didukung: {mimetype!r}. Gunakan text/csv atau application/x-ndjson."}), 415
+
+    bundle = model_manager.current
+    start_time = time.time()
+
+    def on_chunk(records, predictions, churn_probabilities):
+        for class_name, count in count_classes(predictions).items():
+            if count:
+                PREDICTION_COUNT.labels(class_name=class_name).inc(count)
+        if audit_sink is not None:
+            audit_sink.append(records, predictions, churn_probabilities, bundle.version, time.time() - start_time)
+
+    def generate():
+        rows_done, error = yield from stream_bulk_predictions(
+            request.stream, mimetype, BULK_CHUNK_SIZE, encoder, lambda X: score_matrix(X, bundle), on_chunk=on_chunk)
+        if error is not None:
+            PREDICTION_FAILURES.inc()
+            logger.error("prediksi_bulk_gagal", rows_done=rows_done, error=str(error))
+        else:
+            LAST_SUCCESSFUL_PREDICTION_TIME.set(time.time())
+
+    return Response(stream_with_context(generate()), mimetype=mimetype)
 
 @app.route('/')
 def home():
     return "Churn Prediction Model Serving App. Gunakan endpoint /predict untuk prediksi."
 
 # --- 5. Sajikan Aplikasi dan Metrik dengan cara paling sederhana ---
+def metrics_registry():
+    """Registry untuk /metrics; pada mode multi-proses metrik dari semua worker digabung lewat MultiProcessCollector."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+def make_metrics_app():
+    return make_wsgi_app(metrics_registry())
+
+# Admission control di depan semua endpoint /predict*. Agar antrian terlihat oleh aplikasi (dan bisa
+# ditolak cepat), jumlah thread server harus > ADMISSION_MAX_IN_FLIGHT + ADMISSION_MAX_QUEUE, mis.
+# waitress --threads=41 (default gunicorn.conf.py juga mengikuti rumus ini).
+# Request yang melebihi jumlah thread server tetap mengantri di server sebelum sampai ke sini.
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get("ADMISSION_MAX_IN_FLIGHT", "8"))
+ADMISSION_MAX_QUEUE = int(os.environ.get("ADMISSION_MAX_QUEUE", "32"))
+admission = AdmissionController(
+    max_in_flight=ADMISSION_MAX_IN_FLIGHT,
+    max_queue=ADMISSION_MAX_QUEUE,
+    queue_timeout=float(os.environ.get("ADMISSION_QUEUE_TIMEOUT_SECONDS", "1.0")),
+    retry_after=float(os.environ.get("ADMISSION_RETRY_AFTER_SECONDS", "1.0")),
+    # Token bucket per klien: CLIENT_RATE_LIMIT request/detik (0 = tidak dibatasi), override per
+    # klien lewat CLIENT_RATE_LIMITS="batch-job=50:100,dashboard=5"
+    rate_limiter=TokenBucketLimiter(
+        rate=float(os.environ.get("CLIENT_RATE_LIMIT", "0")),
+        burst=float(os.environ.get("CLIENT_RATE_BURST", "0")) or None,
+        overrides=parse_client_limits(os.environ.get("CLIENT_RATE_LIMITS")),
+    ),
+    in_flight_gauge=ADMISSION_IN_FLIGHT,
+    queue_depth_gauge=ADMISSION_QUEUE_DEPTH,
+    rejections_counter=ADMISSION_REJECTIONS,
+    queue_wait_histogram=ADMISSION_QUEUE_WAIT,
+    limit_gauge=ADMISSION_LIMIT,
+)
+# Token bucket dikunci per alamat IP peer. Header ADMISSION_CLIENT_HEADER baru dipakai sebagai
+# identitas klien jika ADMISSION_TRUST_CLIENT_HEADER=1, yaitu saat header itu dipasang (dan
+# ditimpa) oleh proxy/gateway tepercaya; kunci override CLIENT_RATE_LIMITS mengikuti pilihan ini
+ADMISSION_CLIENT_HEADER = os.environ.get("ADMISSION_CLIENT_HEADER", "X-Client-Id")
+ADMISSION_TRUST_CLIENT_HEADER = os.environ.get("ADMISSION_TRUST_CLIENT_HEADER", "0").lower() in ("1", "true", "yes")
+app.wsgi_app = AdmissionMiddleware(app.wsgi_app, admission, path_prefixes=('/predict',),
+                                   client_header=ADMISSION_CLIENT_HEADER,
+                                   trust_client_header=ADMISSION_TRUST_CLIENT_HEADER)
+
+# Perekaman traffic opsional untuk replay_traffic.py: dipasang paling luar agar request yang
+# ditolak admission control juga terekam (replay mereproduksi beban yang ditawarkan klien)
+traffic_recorder = None
+TRAFFIC_RECORD_PATH = os.environ.get("TRAFFIC_RECORD_PATH")
+if TRAFFIC_RECORD_PATH:
+    traffic_recorder = TrafficRecorder(
+        TRAFFIC_RECORD_PATH,
+        sample_rate=float(os.environ.get("TRAFFIC_RECORD_SAMPLE_RATE", "1.0")),
+        max_queue=int(os.environ.get("TRAFFIC_RECORD_MAX_QUEUE", "10000")),
+        max_file_bytes=int(os.environ.get("TRAFFIC_RECORD_MAX_FILE_MB", "256")) * 1024 * 1024,
+        recorded_counter=TRAFFIC_RECORDED,
+        dropped_counter=TRAFFIC_RECORD_DROPPED,
+    )
+    app.wsgi_app = TrafficRecordingMiddleware(app.wsgi_app, traffic_recorder, path_prefixes=('/predict',))
+    print(f"[INFO] Perekaman traffic aktif ({TRAFFIC_RECORD_PATH}, sample rate {traffic_recorder.sample_rate}).")
+
 dispatcher = DispatcherMiddleware(app.wsgi_app, {
-    '/metrics': make_wsgi_app() 
+    '/metrics': make_metrics_app()
 })
\ No newline at end of file
@@ -0,0 +1,55 @@
+import numpy as np
+from compiled_model import CompiledForest, CompiledLogisticRegression, compile_model
+
+# Reason codes murah per prediksi: kontribusi aditif per fitur dari tabel yang dihitung sekali
+# per model, bukan SHAP per request.
+# - LogisticRegression: kontribusi = coef * x (one-hot -> coef, numerik -> coef * nilai), dalam log-odds.
+# - RandomForest: jumlah delta nilai node di sepanjang jalur keputusan (node_delta dari export
+#   compiled_model), dalam satuan probabilitas churn.
+
+DEFAULT_TOP_K = 3
+
+
+class ReasonCodeExplainer:
+    """
+    Membungkus model yang punya `contributions(X, class_index)`. Estimator sklearn
+    (LogisticRegression / RandomForestClassifier) dikompilasi sekali saat explainer dibuat.
+    """
+
+    def __init__(self, model, columns, positive_index=1):
+        if not isinstance(model, (CompiledLogisticRegression, CompiledForest)):
+            model = compile_model(model)
+        self.model = model
+        self.columns = np.asarray(columns, dtype=object)
+        self.positive_index = positive_index
+        self.unit = "log_odds" if isinstance(model, CompiledLogisticRegression) else "probability"
+
+    def contributions(self, X):
+        return self.model.contributions(X, self.positive_index)
+
+    def top_k(self, X, k=DEFAULT_TOP_K):
+        """
+        k kontribusi dengan |nilai| terbesar per baris, bertanda (positif = mendorong ke churn):
+        [[{"feature": ..., "contribution": ...}, ...], ...]. Kontribusi nol tidak ikut.
+        """
+        contributions, _ = self.contributions(X)
+        n_rows, n_features = contributions.shape
+        k = max(0, min(int(k), n_features))
+        if n_rows == 0 or k == 0:
+            return [[] for _ in range(n_rows)]
+        magnitude = np.abs(contributions)
+        top = np.argpartition(-magnitude, k - 1, axis=1)[:, :k] if k < n_features else np.tile(np.arange(n_features), (n_rows, 1))
+        order = np.argsort(-np.take_along_axis(magnitude, top, axis=1), axis=1, kind='stable')
+        top = np.take_along_axis(top, order, axis=1)
+        values = np.take_along_axis(contributions, top, axis=1).tolist()
+        names = self.columns[top].tolist()
+        return [[{"feature": name, "contribution": value} for name, value in zip(row_names, row_values) if value != 0.0]
+                for row_names, row_values in zip(names, values)]
+
+
+def make_explainer(scorer, columns):
+    """Explainer untuk model di `scorer` (ChurnScorer), atau None jika jenis modelnya tidak didukung."""
+    try:
+        return ReasonCodeExplainer(scorer.model, columns, scorer.positive_index)
+    except TypeError:
+        return None
@@ -0,0 +1,47 @@
+import os
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.model_selection import train_test_split
+
+# --- KONFIGURASI ---
+# Artefak RandomForest hasil tuning tidak ikut tersimpan di mlruns lokal (hanya parameternya),
+# jadi benchmark melatih ulang model dengan parameter terbaik dari run tersebut.
+MEMBANGUN_MODEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "membangun_model")
+PROCESSED_DATA_PATH = os.path.join(MEMBANGUN_MODEL_DIR, "telco-dataset_preprocessing", "dataset_processed.csv")
+RF_RUN_DIR = os.path.join(MEMBANGUN_MODEL_DIR, "mlruns", "254407420964266969", "513ff8b1c0c74c3d9e3df89913d6b9b9")
+
+
+# --- 1. Membaca Parameter yang Di-log MLflow ---
+def load_logged_params(run_dir):
+    """Membaca folder params/ dari run MLflow lokal menjadi dict {nama: nilai string}."""
+    params_dir = os.path.join(run_dir, "params")
+    params = {}
+    for name in os.listdir(params_dir):
+        with open(os.path.join(params_dir, name)) as f:
+            params[name] = f.read().strip()
+    return params
+
+
+# --- 2. Memuat Data Training dengan Split yang Sama seperti modeling_tuning.py ---
+def load_training_split(data_path=PROCESSED_DATA_PATH, target_col='Churn'):
+    df = pd.read_csv(data_path)
+    X = df.drop(target_col, axis=1)
+    y = df[target_col]
+    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+
+# --- 3. Melatih Ulang RandomForest Hasil Tuning ---
+def train_reference_random_forest(run_dir=RF_RUN_DIR, data_path=PROCESSED_DATA_PATH):
+    """Melatih RandomForest dengan parameter terbaik dari run tuning RF (train_model_with_tuning_dagshub)."""
+    params = load_logged_params(run_dir)
+    class_weight = params.get('class_weight', 'None')
+    rf_model = RandomForestClassifier(
+        n_estimators=int(params['n_estimators']),
+        max_depth=None if params['max_depth'] == 'None' else int(params['max_depth']),
+        min_samples_split=int(params['min_samples_split']),
+        class_weight=None if class_weight == 'None' else class_weight,
+        random_state=42,
+    )
+    X_train, X_test, y_train, y_test = load_training_split(data_path)
+    rf_model.fit(X_train, y_train)
+    return rf_model, X_test
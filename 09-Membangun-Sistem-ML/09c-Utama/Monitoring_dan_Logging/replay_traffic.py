@@ -0,0 +1,200 @@
+import argparse
+import asyncio
+import glob
+import json
+import os
+import time
+from collections import Counter
+import aiohttp
+from inference import API_URL
+from load_test import new_stats, print_summary, send_one, summarize
+from traffic_recorder import REPLAY_HEADER, read_traffic
+
+# Replay traffic produksi yang direkam server (TRAFFIC_RECORD_PATH) ke build server mana pun.
+# Jarak antar-kedatangan asli dipertahankan (dibagi --speed), sehingga burst dan jeda ikut
+# terulang, tidak seperti load_test.py yang laju request-nya rata. --speed 0 mengirim secepat
+# mungkin dengan --concurrency klien. Hasil per run ditulis ke JSON berformat sama dengan
+# load_test.py dan bisa dibandingkan dengan --compare.
+
+# --- KONFIGURASI ---
+DEFAULT_TARGET = API_URL.rsplit("/predict", 1)[0]
+COMPARED_LATENCIES = ("p50", "p90", "p99", "p999", "max")
+
+
+# --- 1. Membaca Log ---
+def find_logs(paths):
+    """File log dari argumen; folder diperluas menjadi semua traffic-*.msgpack di dalamnya."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(sorted(glob.glob(os.path.join(path, "traffic-*.msgpack"))))
+        else:
+            files.append(path)
+    return files
+
+
+def count_rows(record):
+    """Jumlah pelanggan dalam body JSON (list = banyak baris); body biner dihitung satu request = satu baris."""
+    if not record["headers"].get("Content-Type", "application/json").startswith("application/json"):
+        return 1
+    try:
+        data = json.loads(record["body"])
+    except ValueError:
+        return 1
+    if isinstance(data, dict) and isinstance(data.get("customerIDs"), list):
+        return len(data["customerIDs"])
+    return len(data) if isinstance(data, list) else 1
+
+
+# --- 2. Replay ---
+async def replay_timed(session, target, records, headers, speed, concurrency, stats_by_path):
+    """Setiap request dijadwalkan pada offset rekamannya / speed; latensi diukur dari jadwal itu."""
+    slots = asyncio.Semaphore(concurrency)
+    tasks = set()
+    lag = [0.0]
+    t0 = records[0]["t"]
+    start = time.perf_counter()
+
+    async def guarded(record, scheduled_at):
+        async with slots:
+            await send_one(session, target + record["path"], record["body"], {**record["headers"], **headers},
+                           scheduled_at, stats_by_path[record["path"].split("?")[0]])
+
+    for record in records:
+        scheduled_at = start + (record["t"] - t0) / speed
+        delay = scheduled_at - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        else:
+            lag[0] = max(lag[0], -delay)
+        task = asyncio.create_task(guarded(record, scheduled_at))
+        tasks.add(task)
+        task.add_done_callback(tasks.discard)
+    if tasks:
+        await asyncio.gather(*tasks)
+    return lag[0]
+
+
+async def replay_unpaced(session, target, records, headers, concurrency, stats_by_path):
+    """`concurrency` klien mengambil record berikutnya segera setelah response diterima."""
+    position = iter(records)
+
+    async def client():
+        for record in position:
+            await send_one(session, target + record["path"], record["body"], {**record["headers"], **headers},
+                           time.perf_counter(), stats_by_path[record["path"].split("?")[0]])
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return 0.0
+
+
+async def run_replay(target, records, speed=1.0, concurrency=256, warmup_requests=0, timeout=10.0, headers=None):
+    """Replay `records` (urut waktu) ke `target`; `warmup_requests` pertama dikirim tanpa diukur."""
+    headers = {REPLAY_HEADER: "1", **(headers or {})}
+    warmup, measured = records[:warmup_requests], records[warmup_requests:]
+    if not measured:
+        raise ValueError("Tidak ada request untuk di-replay setelah warm-up.")
+    connector = aiohttp.TCPConnector(limit=concurrency, keepalive_timeout=60)
+    async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=timeout)) as session:
+        if warmup:
+            unmeasured = {record["path"].split("?")[0]: None for record in warmup}
+            await replay_unpaced(session, target, warmup, headers, concurrency, unmeasured)
+        stats_by_path = {path: new_stats() for path in {record["path"].split("?")[0] for record in measured}}
+        start = time.perf_counter()
+        if speed > 0:
+            max_lag = await replay_timed(session, target, measured, headers, speed, concurrency, stats_by_path)
+        else:
+            max_lag = await replay_unpaced(session, target, measured, headers, concurrency, stats_by_path)
+        elapsed = time.perf_counter() - start
+
+    recorded_seconds = measured[-1]["t"] - measured[0]["t"]
+    recorded_rps = len(measured) / recorded_seconds if recorded_seconds > 0 else 0.0
+    stats = {"latencies": [latency for path_stats in stats_by_path.values() for latency in path_stats["latencies"]],
+             "status": sum((path_stats["status"] for path_stats in stats_by_path.values()), Counter())}
+    result = summarize(stats, elapsed, url=target, rps=recorded_rps * speed, concurrency=concurrency,
+                       batch_size=sum(count_rows(record) for record in measured) / len(measured))
+    result["config"].update(mode=f"replay {speed:g}x" if speed > 0 else "replay maks", speed=speed,
+                            warmup_requests=warmup_requests, recorded_seconds=recorded_seconds,
+                            recorded_rps=recorded_rps)
+    # Jika klien tertinggal dari jadwal, latensi tetap dihitung dari jadwal, tetapi lag besar
+    # berarti mesin klien ikut menjadi bottleneck
+    result["max_schedule_lag_ms"] = max_lag * 1e3
+    result["by_path"] = {path: summarize(path_stats, elapsed, url=target + path, rps=0)
+                         for path, path_stats in sorted(stats_by_path.items())}
+    for path_result in result["by_path"].values():
+        del path_result["config"], path_result["timestamp"], path_result["throughput_rows_per_second"]
+    return result
+
+
+# --- 3. Membandingkan Run ---
+def compare_results(paths):
+    """Tabel latensi/throughput beberapa hasil JSON; selisih dihitung terhadap file pertama."""
+    results = []
+    for path in paths:
+        with open(path) as f:
+            results.append(json.load(f))
+    base = results[0]
+    print(f"{'run':<24}{'req/s':>10}{'err%':>8}" + "".join(f"{name + ' ms':>12}" for name in COMPARED_LATENCIES))
+    for path, result in zip(paths, results):
+        label = result.get("label") or os.path.basename(path)
+        row = f"{label[:23]:<24}{result['throughput_rps']:>10.1f}{result['error_rate'] * 100:>8.2f}"
+        for name in COMPARED_LATENCIES:
+            value = result["latency_ms"].get(name, float("nan"))
+            row += f"{value:>12.2f}"
+        print(row)
+        if result is not base:
+            deltas = []
+            for name in COMPARED_LATENCIES:
+                base_value = base["latency_ms"].get(name)
+                if base_value:
+                    deltas.append(f"{name} {(result['latency_ms'].get(name, base_value) / base_value - 1) * 100:+.1f}%")
+            print(f"{'':<24}vs {base.get('label') or os.path.basename(paths[0])}: " + ", ".join(deltas))
+
+
+# --- Main Execution Block ---
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay log traffic terekam ke server prediksi churn.")
+    parser.add_argument("logs", nargs="*", help="File traffic-*.msgpack atau folder TRAFFIC_RECORD_PATH")
+    parser.add_argument("--target", default=DEFAULT_TARGET, help="Base URL server, mis. http://localhost:5001")
+    parser.add_argument("--speed", type=float, default=1.0, help="Kelipatan kecepatan (1 = waktu asli, 10 = 10x, 0 = secepat mungkin)")
+    parser.add_argument("--concurrency", type=int, default=256, help="Maksimal request bersamaan (= ukuran pool koneksi)")
+    parser.add_argument("--warmup-requests", type=int, default=0, help="Jumlah request awal yang dikirim tanpa diukur")
+    parser.add_argument("--limit", type=int, default=0, help="Hanya replay N request pertama (0 = semua)")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Timeout per request (detik)")
+    parser.add_argument("--header", action="append", default=[], help="Header pengganti, mis. X-Client-Id:replay")
+    parser.add_argument("--label", default=None, help="Label bebas untuk membedakan build yang diuji")
+    parser.add_argument("--output", default="replay_result.json", help="File hasil JSON")
+    parser.add_argument("--compare", nargs="+", metavar="RESULT_JSON", help="Bandingkan hasil replay/load test yang sudah ada")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare_results(args.compare)
+        raise SystemExit(0)
+
+    log_files = find_logs(args.logs)
+    if not log_files:
+        parser.error("Tidak ada file log traffic.")
+    records = read_traffic(log_files)
+    if args.limit:
+        records = records[:args.limit]
+    print(f"[INFO] {len(records)} request dari {len(log_files)} file log.")
+
+    extra_headers = dict(header.split(":", 1) for header in args.header)
+    result = asyncio.run(run_replay(args.target.rstrip("/"), records, speed=args.speed, concurrency=args.concurrency,
+                                    warmup_requests=args.warmup_requests, timeout=args.timeout,
+                                    headers={key.strip(): value.strip() for key, value in extra_headers.items()}))
+    result["label"] = args.label
+    print_summary(result)
+    for path, path_result in result["by_path"].items():
+        latency = path_result["latency_ms"]
+        print(f"  {path:<28} {path_result['requests']:>7} req, p50={latency.get('p50', 0):.2f} ms, "
+              f"p99={latency.get('p99', 0):.2f} ms, error rate {path_result['error_rate'] * 100:.2f}%")
+    if result["max_schedule_lag_ms"] > 100:
+        print(f"[WARNING] Klien tertinggal {result['max_schedule_lag_ms']:.0f} ms dari jadwal replay; "
+              f"hasil ikut dibatasi mesin klien.")
+    output_dir = os.path.dirname(args.output)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(result, f, indent=2)
+    print(f"[INFO] Hasil disimpan di {args.output}")
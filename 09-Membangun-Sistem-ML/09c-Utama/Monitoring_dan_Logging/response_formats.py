@@ -0,0 +1,124 @@
+import numpy as np
+
+# Format biner untuk /predict, dipilih lewat header Accept (response) dan Content-Type (request).
+# JSON tetap default; format biner menghindari biaya jsonify list besar untuk pemanggil bulk.
+# float32 hanya format response: body request selalu berupa record mentah (JSON / msgpack / Arrow)
+# yang masih harus di-encode server, dan float32 tidak bisa membawa reason codes (explain=true
+# dengan Accept float32 ditolak 406). Untuk fitur yang sudah ter-encode gunakan /predict/by-id.
+
+JSON = "application/json"
+MSGPACK = "application/msgpack"
+ARROW = "application/vnd.apache.arrow.stream"
+# Matriks float32 little-endian berbentuk (n, 2): kolom [prediction, probability_churn]
+FLOAT32 = "application/x-churn-float32"
+
+RESPONSE_MIMETYPES = (JSON, MSGPACK, ARROW, FLOAT32)
+# Hanya alias yang benar-benar sama formatnya. Arrow IPC *file* (vnd.apache.arrow.file) berbeda dari
+# stream dan application/octet-stream terlalu umum untuk dianggap float32, jadi keduanya ditolak (406/415).
+MIMETYPE_ALIASES = {"application/x-msgpack": MSGPACK}
+REQUEST_MIMETYPES = (JSON, MSGPACK, ARROW)
+# Format response yang bisa membawa reason codes
+EXPLAIN_MIMETYPES = (JSON, MSGPACK, ARROW)
+FLOAT32_COLUMNS = "prediction,probability_churn"
+
+
+class UnsupportedFormat(ValueError):
+    """Content-Type request atau Accept response tidak didukung."""
+
+
+# --- 1. Negosiasi Accept ---
+def negotiate(accept_header):
+    """
+    Memilih format response dari header Accept (menghormati q-value). Tanpa header, atau jika
+    hanya */* / application/* yang cocok, hasilnya JSON. Mengembalikan None jika tidak ada yang cocok.
+    """
+    if not accept_header:
+        return JSON
+    candidates = []
+    for position, part in enumerate(accept_header.split(",")):
+        mimetype, *params = [piece.strip() for piece in part.split(";")]
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        mimetype = MIMETYPE_ALIASES.get(mimetype.lower(), mimetype.lower())
+        if quality > 0:
+            candidates.append((-quality, position, mimetype))
+    for _, _, mimetype in sorted(candidates):
+        if mimetype in RESPONSE_MIMETYPES:
+            return mimetype
+        if mimetype in ("*/*", "application/*"):
+            return JSON
+    return None
+
+
+# --- 2. Decoder Request ---
+def request_format(content_type):
+    """Content-Type request (tanpa parameter) menjadi format kanonik; kosong berarti JSON."""
+    mimetype = content_type.lower() if content_type else JSON
+    mimetype = MIMETYPE_ALIASES.get(mimetype, mimetype)
+    if mimetype not in REQUEST_MIMETYPES:
+        raise UnsupportedFormat(f"Content-Type tidak didukung: {mimetype!r}. Gunakan salah satu dari {', '.join(REQUEST_MIMETYPES)}.")
+    return mimetype
+
+
+def decode_request(mimetype, body):
+    """Mengubah body request (msgpack / Arrow IPC) menjadi payload seperti JSON: dict atau list of dict."""
+    mimetype = MIMETYPE_ALIASES.get(mimetype, mimetype)
+    if mimetype == MSGPACK:
+        import msgpack
+        return msgpack.unpackb(body, raw=False)
+    if mimetype == ARROW:
+        import pyarrow as pa
+        return pa.ipc.open_stream(body).read_all().to_pylist()
+    if mimetype == FLOAT32:
+        raise UnsupportedFormat("float32 hanya tersedia sebagai format response; kirim request sebagai "
+                                f"{', '.join(REQUEST_MIMETYPES)}.")
+    raise UnsupportedFormat(f"Content-Type tidak didukung: {mimetype!r}. Gunakan salah satu dari {', '.join(REQUEST_MIMETYPES)}.")
+
+
+# --- 3. Encoder Response ---
+def encode_response(response, mimetype):
+    """
+    Meng-encode dict {'predictions': ndarray, 'probabilities_churn': ndarray} ke format biner.
+    JSON ditangani oleh front-end masing-masing (jsonify / orjson). Reason codes (explain=true)
+    ikut di MessagePack dan di kolom `reasons` Arrow (unit di metadata skema `reason_unit`);
+    float32 tidak bisa membawanya sehingga response berisi reasons ditolak.
+    """
+    predictions = np.asarray(response['predictions'])
+    churn_probabilities = np.asarray(response['probabilities_churn'], dtype=np.float64)
+    if mimetype == MSGPACK:
+        import msgpack
+        payload = {'predictions': predictions.tolist(), 'probabilities_churn': churn_probabilities.tolist()}
+        if 'reasons' in response:
+            payload['reasons'] = response['reasons']
+            payload['reason_unit'] = response['reason_unit']
+        return msgpack.packb(payload)
+    if mimetype == ARROW:
+        import pyarrow as pa
+        columns = {'prediction': predictions.astype(np.int8), 'probability_churn': churn_probabilities}
+        metadata = None
+        if 'reasons' in response:
+            reason_type = pa.list_(pa.struct([('feature', pa.string()), ('contribution', pa.float64())]))
+            columns['reasons'] = pa.array(response['reasons'], type=reason_type)
+            metadata = {'reason_unit': response['reason_unit']}
+        table = pa.table(columns, metadata=metadata)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    if mimetype == FLOAT32:
+        if 'reasons' in response:
+            raise UnsupportedFormat("Reason codes tidak bisa di-encode ke float32.")
+        return np.column_stack([predictions, churn_probabilities]).astype('<f4').tobytes()
+    raise UnsupportedFormat(f"Format response tidak didukung: {mimetype!r}")
+
+
+def decode_float32_response(body):
+    """Kebalikan format FLOAT32 (untuk klien): mengembalikan (predictions int, probabilities float32)."""
+    matrix = np.frombuffer(body, dtype='<f4').reshape(-1, 2)
+    return matrix[:, 0].astype(np.int64), matrix[:, 1]
@@ -0,0 +1,100 @@
+import os
+import queue
+import threading
+import time
+import numpy as np
+from batch_telemetry import observe_histogram_batch
+
+# Shadow scoring: batch yang sudah di-encode dan di-skor model utama disalin ke antrian berbatas,
+# lalu thread latar men-skor ulang dengan model challenger dan membandingkan hasilnya.
+# Response ke klien tidak pernah menunggu challenger; jika antrian penuh, pekerjaan shadow dibuang.
+
+# Bucket selisih probabilitas challenger - utama (bertanda, -1..1)
+DELTA_BUCKETS = (-0.5, -0.25, -0.1, -0.05, -0.01, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class ShadowScorer:
+    """
+    Membandingkan model challenger dengan model utama pada traffic live.
+
+    `submit()` dipanggil di jalur request setelah model utama selesai dan hanya melakukan
+    `put_nowait`; batch yang tidak muat di antrian (`max_queue` batch) dihitung di
+    `shed_counter` (per baris). Metrik: baris setuju/tidak setuju (`rows_counter{result}`),
+    distribusi selisih probabilitas, dan latensi scoring challenger per batch.
+    """
+
+    def __init__(self, scorer, max_queue=64, rows_counter=None, delta_histogram=None, latency_histogram=None,
+                 shed_counter=None, errors_counter=None, queue_depth_gauge=None):
+        self.scorer = scorer
+        self.max_queue = max_queue
+        self.rows_counter = rows_counter
+        self.delta_histogram = delta_histogram
+        self.latency_histogram = latency_histogram
+        self.shed_counter = shed_counter
+        self.errors_counter = errors_counter
+        self.queue_depth_gauge = queue_depth_gauge
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+
+    # --- 1. Jalur Request ---
+    def submit(self, X, predictions, churn_probabilities):
+        """
+        Menitipkan batch untuk di-skor challenger. X tidak disalin: matriks hasil encoder
+        dibuat baru per request dan tidak diubah lagi setelah scoring.
+        """
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((X, predictions, churn_probabilities))
+        except queue.Full:
+            if self.shed_counter is not None:
+                self.shed_counter.inc(len(X))
+            return False
+        if self.queue_depth_gauge is not None:
+            self.queue_depth_gauge.inc()
+        return True
+
+    # --- 2. Worker Latar ---
+    def _ensure_worker(self):
+        # Thread tidak ikut tersalin saat fork, jadi worker (dan antriannya) dibuat ulang per proses
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            if self._worker_pid is not None and self._worker_pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_queue)
+            self._worker = threading.Thread(target=self._run, name="shadow-scorer", daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def compare(self, X, predictions, churn_probabilities):
+        """Men-skor X dengan challenger dan mencatat metrik perbandingan. Mengembalikan jumlah baris yang setuju."""
+        start = time.perf_counter()
+        shadow_predictions, shadow_probabilities = self.scorer.score(X)
+        if self.latency_histogram is not None:
+            self.latency_histogram.observe(time.perf_counter() - start)
+
+        n_agree = int(np.count_nonzero(np.asarray(shadow_predictions) == np.asarray(predictions)))
+        if self.rows_counter is not None:
+            if n_agree:
+                self.rows_counter.labels(result='agree').inc(n_agree)
+            if len(X) - n_agree:
+                self.rows_counter.labels(result='disagree').inc(len(X) - n_agree)
+        if self.delta_histogram is not None:
+            deltas = np.asarray(shadow_probabilities, dtype=np.float64) - np.asarray(churn_probabilities, dtype=np.float64)
+            observe_histogram_batch(self.delta_histogram, deltas)
+        return n_agree
+
+    def _run(self):
+        while True:
+            X, predictions, churn_probabilities = self._queue.get()
+            if self.queue_depth_gauge is not None:
+                self.queue_depth_gauge.dec()
+            try:
+                self.compare(X, predictions, churn_probabilities)
+            except Exception as e:
+                if self.errors_counter is not None:
+                    self.errors_counter.inc()
+                print(f"[ERROR] Shadow scoring gagal: {e}")
@@ -0,0 +1,149 @@
+import atexit
+import json
+import os
+import queue
+import random
+import sys
+import threading
+import time
+
+# Logging terstruktur tanpa I/O sinkron di jalur request: record dimasukkan ke antrian berbatas,
+# lalu diformat dan ditulis oleh satu thread latar. Jika antrian penuh, record dibuang dan
+# dihitung di metrik (request tidak pernah menunggu logger).
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40, "CRITICAL": 50}
+# Ejaan lain yang lazim (sama dengan modul logging standar), mis. LOG_LEVEL=WARN
+LEVEL_ALIASES = {"WARN": "WARNING", "FATAL": "CRITICAL"}
+
+
+def level_name(level):
+    """Nama level kanonik dari LOG_LEVEL/argumen (tidak peka huruf besar); ValueError jika tidak dikenal."""
+    name = str(level).strip().upper()
+    name = LEVEL_ALIASES.get(name, name)
+    if name not in LEVELS:
+        raise ValueError(f"Level log tidak dikenal: {level!r}. Gunakan salah satu dari "
+                         f"{', '.join([*LEVELS, *LEVEL_ALIASES])}.")
+    return name
+
+
+class StructuredLogger:
+    """
+    Logger dengan level, sampling per level, dan penulisan asinkron.
+
+    `sample_rates` memetakan level ke peluang record disimpan (mis. {"DEBUG": 0.01} = 1% record
+    DEBUG). Format `text` mengikuti gaya log yang sudah ada ("[INFO] event key=value");
+    format `json` menghasilkan satu objek JSON per baris.
+
+    `event` adalah nama snake_case yang tetap untuk setiap call site (mis. `prediksi_gagal`) agar log
+    bisa difilter/diagregasi per event; detail yang berubah-ubah masuk ke field, bukan ke nama event.
+    """
+
+    def __init__(self, stream=None, level="INFO", sample_rates=None, max_queue=10000, fmt="text",
+                 dropped_counter=None, batch_size=256):
+        self.stream = stream or sys.stdout
+        self.level = LEVELS[level_name(level)]
+        self.sample_rates = {level_name(name): float(rate) for name, rate in (sample_rates or {}).items()}
+        self.fmt = fmt
+        self.dropped_counter = dropped_counter
+        self.batch_size = batch_size
+        self._max_queue = max_queue
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        atexit.register(self.flush)
+
+    # --- 1. API Logging (dipanggil dari jalur request) ---
+    def is_enabled(self, level):
+        severity = LEVELS.get(level)
+        if severity is None:
+            severity = LEVELS[level_name(level)]
+        return severity >= self.level
+
+    def log(self, level, event, **fields):
+        # Jalur cepat untuk nama kanonik dari debug()/info()/...; nama lain dinormalisasi dulu
+        severity = LEVELS.get(level)
+        if severity is None:
+            level = level_name(level)
+            severity = LEVELS[level]
+        if severity < self.level:
+            return
+        rate = self.sample_rates.get(level, 1.0)
+        if rate < 1.0 and random.random() >= rate:
+            return
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait((time.time(), level, event, fields))
+        except queue.Full:
+            if self.dropped_counter is not None:
+                self.dropped_counter.labels(level=level.lower()).inc()
+
+    def debug(self, event, **fields):
+        self.log("DEBUG", event, **fields)
+
+    def info(self, event, **fields):
+        self.log("INFO", event, **fields)
+
+    def warning(self, event, **fields):
+        self.log("WARNING", event, **fields)
+
+    def error(self, event, **fields):
+        self.log("ERROR", event, **fields)
+
+    def critical(self, event, **fields):
+        self.log("CRITICAL", event, **fields)
+
+    # --- 2. Penulis Latar ---
+    def _ensure_worker(self):
+        # Thread tidak ikut tersalin saat fork, jadi writer (dan antriannya) dibuat ulang per proses
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            if self._worker_pid is not None and self._worker_pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self._max_queue)
+            self._worker = threading.Thread(target=self._run, name="structured-logger", daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def _format(self, timestamp, level, event, fields):
+        if self.fmt == "json":
+            return json.dumps({"ts": round(timestamp, 6), "level": level, "event": event, **fields}, default=str)
+        if not fields:
+            return f"[{level}] {event}"
+        return f"[{level}] {event} " + " ".join(f"{key}={value}" for key, value in fields.items())
+
+    def _drain(self, block):
+        """Mengambil hingga `batch_size` record dan menulisnya dengan satu write() + flush()."""
+        records = [self._queue.get()] if block else []
+        while len(records) < self.batch_size:
+            try:
+                records.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not records:
+            return 0
+        lines = []
+        for record in records:
+            try:
+                lines.append(self._format(*record))
+            except Exception as e:
+                lines.append(f"[ERROR] log_gagal_diformat event={record[2]} error={e}")
+        self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+        return len(records)
+
+    def _run(self):
+        while True:
+            try:
+                self._drain(block=True)
+            except Exception as e:
+                # Logger tidak boleh mematikan proses; laporkan langsung ke stderr
+                sys.stderr.write(f"[ERROR] penulis_log_gagal error={e}\n")
+
+    def flush(self, timeout=2.0):
+        """Menulis sisa antrian (dipakai saat shutdown); dibatasi `timeout` detik."""
+        deadline = time.monotonic() + timeout
+        while not self._queue.empty() and time.monotonic() < deadline:
+            self._drain(block=False)
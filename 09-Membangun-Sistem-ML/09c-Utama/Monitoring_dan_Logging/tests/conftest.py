@@ -0,0 +1,66 @@
+import os
+import sys
+import pytest
+
+# Modul serving berupa skrip datar di folder Monitoring_dan_Logging (bukan package), jadi folder
+# itu dimasukkan ke sys.path. Konfigurasi server dibaca dari env saat import, jadi di-set di sini.
+MODULE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MODULE_DIR)
+
+os.environ.setdefault("MODEL_PATH", os.path.join(MODULE_DIR, "tuned-churn-model-dagshub", "tuned-churn-model-dagshub"))
+os.environ.setdefault("DRIFT_BASELINE_PATH", os.path.join(MODULE_DIR, "drift_baseline.json"))
+os.environ.setdefault("ADMIN_TOKEN", "test-token")
+os.environ.setdefault("MLFLOW_DISABLE_AGENT_HINT", "1")
+
+ADMIN_HEADERS = {"X-Admin-Token": os.environ["ADMIN_TOKEN"]}
+
+SAMPLE_RECORD = {
+    "gender": "Female", "SeniorCitizen": "No", "Partner": "Yes", "Dependents": "No", "tenure": 12,
+    "PhoneService": "Yes", "MultipleLines": "No", "InternetService": "Fiber optic", "OnlineSecurity": "No",
+    "OnlineBackup": "Yes", "DeviceProtection": "No", "TechSupport": "No", "StreamingTV": "Yes",
+    "StreamingMovies": "No", "Contract": "Month-to-month", "PaperlessBilling": "Yes",
+    "PaymentMethod": "Electronic check", "MonthlyCharges": 70.35, "TotalCharges": 845.5,
+}
+
+
+async def call_asgi(app, method, path, body=b"", headers=()):
+    """Memanggil aplikasi ASGI langsung (tanpa httpx/TestClient); mengembalikan (status, body)."""
+    path, _, query = path.partition("?")
+    headers = [(k.lower().encode(), v.encode()) for k, v in headers]
+    if not any(k == b"content-type" for k, _ in headers):
+        headers.append((b"content-type", b"application/json"))
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": method, "scheme": "http",
+             "path": path, "raw_path": path.encode(), "query_string": query.encode(), "root_path": "",
+             "headers": headers, "client": ("127.0.0.1", 1234), "server": ("testserver", 80)}
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    status = next(message["status"] for message in sent if message["type"] == "http.response.start")
+    return status, b"".join(message.get("body", b"") for message in sent if message["type"] == "http.response.body")
+
+
+@pytest.fixture(scope="session")
+def exporter():
+    """Aplikasi Flask lengkap dengan model artefak di repo (diimpor sekali per sesi)."""
+    import prometheus_exporter
+    return prometheus_exporter
+
+
+@pytest.fixture
+def client(exporter):
+    # buffered=True menutup iterator response, sehingga slot AdmissionMiddleware dilepas seperti di server
+    from flask.testing import FlaskClient
+
+    class BufferedClient(FlaskClient):
+        def open(self, *args, **kwargs):
+            kwargs.setdefault("buffered", True)
+            return super().open(*args, **kwargs)
+
+    return BufferedClient(exporter.app, exporter.app.response_class, use_cookies=True)
@@ -0,0 +1,107 @@
+import threading
+import time
+import pytest
+from prometheus_client import CollectorRegistry, Counter, Gauge
+from admission_control import AdmissionController, AdmissionMiddleware, TokenBucketLimiter, parse_client_limits
+
+
+def make_controller(max_in_flight=1, max_queue=0, **kwargs):
+    registry = CollectorRegistry()
+    return AdmissionController(
+        max_in_flight=max_in_flight, max_queue=max_queue, queue_timeout=kwargs.pop("queue_timeout", 0.05),
+        rejections_counter=Counter('rejections', 'r', ['reason'], registry=registry),
+        limit_gauge=Gauge('limit', 'l', ['kind'], registry=registry), **kwargs), registry
+
+
+def ok_app(environ, start_response):
+    start_response('200 OK', [('Content-Type', 'text/plain')])
+    return [b'ok']
+
+
+def call(app, path='/predict', **environ):
+    status = []
+    body = app({'PATH_INFO': path, 'REMOTE_ADDR': '10.0.0.1', **environ},
+               lambda s, headers: status.append((s, dict(headers))))
+    return status[0], body
+
+
+def test_parse_client_limits():
+    assert parse_client_limits("batch=50:100, dash=5") == {"batch": (50.0, 100.0), "dash": (5.0, 5.0)}
+
+
+def test_token_bucket_refills_over_time():
+    limiter = TokenBucketLimiter(rate=100, burst=2)
+    assert limiter.consume("a") == 0.0 and limiter.consume("a") == 0.0
+    assert limiter.consume("a") > 0
+    assert limiter.consume("b") == 0.0
+    time.sleep(0.02)
+    assert limiter.consume("a") == 0.0
+
+
+def test_slot_released_only_when_response_is_closed():
+    controller, _ = make_controller()
+    app = AdmissionMiddleware(ok_app, controller)
+    (status, _), body = call(app)
+    assert status == '200 OK'
+    # Body belum selesai dikirim: slot masih dipegang, request berikutnya ditolak
+    (status, headers), _ = call(app)
+    assert status.startswith('429') and headers['Retry-After'] == '1'
+    body.close()
+    (status, _), second = call(app)
+    assert status == '200 OK'
+    second.close()
+    assert controller._in_flight == 0
+
+
+def test_slot_released_when_app_raises():
+    controller, _ = make_controller()
+
+    def failing_app(environ, start_response):
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        call(AdmissionMiddleware(failing_app, controller))
+    assert controller._in_flight == 0
+
+
+def test_queued_request_admitted_when_slot_frees():
+    controller, _ = make_controller(max_queue=1, queue_timeout=2.0)
+    assert controller.acquire_slot() is None
+    result = []
+    waiter = threading.Thread(target=lambda: result.append(controller.acquire_slot()))
+    waiter.start()
+    time.sleep(0.05)
+    assert controller.acquire_slot().reason == 'queue_full'
+    controller.release()
+    waiter.join()
+    assert result == [None] and controller._in_flight == 1
+
+
+def test_paths_outside_prefix_are_not_limited():
+    controller, _ = make_controller(max_in_flight=0)
+    (status, _), _ = call(AdmissionMiddleware(ok_app, controller), path='/metrics')
+    assert status == '200 OK'
+
+
+def test_limits_published_by_serving_process_not_at_construction():
+    controller, registry = make_controller(max_in_flight=3, max_queue=7)
+    assert registry.get_sample_value('limit', {'kind': 'in_flight'}) is None
+    controller.try_acquire_slot()
+    assert registry.get_sample_value('limit', {'kind': 'in_flight'}) == 3
+    assert registry.get_sample_value('limit', {'kind': 'queue'}) == 7
+
+
+def test_rotating_client_header_does_not_escape_rate_limit():
+    controller, _ = make_controller(max_in_flight=4, rate_limiter=TokenBucketLimiter(rate=0.001, burst=1))
+    app = AdmissionMiddleware(ok_app, controller)
+    assert call(app, HTTP_X_CLIENT_ID='a')[0][0].startswith('200')
+    (status, _), _ = call(app, HTTP_X_CLIENT_ID='b')
+    assert status.startswith('429')
+
+
+def test_trusted_client_header_keys_buckets_per_client():
+    controller, _ = make_controller(max_in_flight=4, rate_limiter=TokenBucketLimiter(rate=0.001, burst=1))
+    app = AdmissionMiddleware(ok_app, controller, trust_client_header=True)
+    assert call(app, HTTP_X_CLIENT_ID='a')[0][0].startswith('200')
+    assert call(app, HTTP_X_CLIENT_ID='b')[0][0].startswith('200')
+    assert call(app, HTTP_X_CLIENT_ID='a')[0][0].startswith('429')
@@ -0,0 +1,32 @@
+import asyncio
+import json
+from conftest import SAMPLE_RECORD, call_asgi
+
+
+def test_asgi_predict_matches_flask_and_releases_slots(client, exporter):
+    import asgi_app
+    records = [SAMPLE_RECORD, {**SAMPLE_RECORD, "Contract": "Two year", "tenure": 60}]
+    flask_response = client.post("/predict", json=records)
+
+    async def run():
+        return [await call_asgi(asgi_app.app, "POST", "/predict", json.dumps(records).encode()) for _ in range(20)]
+
+    responses = asyncio.run(run())
+    assert all(status == 200 for status, _ in responses)
+    assert json.loads(responses[0][1]) == flask_response.json
+    assert exporter.admission._in_flight == 0
+
+
+def test_asgi_rejects_bad_payload_and_serves_metrics(exporter):
+    import asgi_app
+
+    async def run():
+        return (await call_asgi(asgi_app.app, "POST", "/predict", b'"bukan record"'),
+                await call_asgi(asgi_app.app, "GET", "/metrics"),
+                await call_asgi(asgi_app.app, "POST", "/predict/bulk", b""))
+
+    bad, metrics, bulk = asyncio.run(run())
+    assert bad[0] == 400 and "error" in json.loads(bad[1])
+    assert metrics[0] == 200 and b"prediction_requests_total" in metrics[1]
+    # /predict/bulk hanya tersedia di front-end WSGI
+    assert bulk[0] == 404
@@ -0,0 +1,76 @@
+import contextlib
+import io
+import time
+import numpy as np
+import pytest
+from prometheus_client import CollectorRegistry, Counter
+from conftest import SAMPLE_RECORD
+from audit_log import RAW_COLUMNS, AuditLogSink, load_audit_log
+from batch_score import load_initial_cleaning
+
+RECORDS = [{**SAMPLE_RECORD, "customerID": "a-1", "TotalCharges": " "},
+           {**SAMPLE_RECORD, "customerID": "b-2", "tenure": "40"}]
+
+
+def append(sink, records=RECORDS, version="7", predictions=(1, 0)):
+    sink.append(records, np.array(predictions), np.array([0.9, 0.2]), version, 0.003)
+
+
+@pytest.mark.parametrize("file_format", ["parquet", "arrow"])
+def test_flushed_file_round_trips_to_raw_format(tmp_path, file_format):
+    sink = AuditLogSink(str(tmp_path), file_format=file_format, flush_seconds=3600)
+    append(sink)
+    append(sink, version="8")
+    path = sink.flush()
+    assert path.endswith("." + file_format) and sink.flush() is None
+
+    df = load_audit_log(str(tmp_path), raw_only=False)
+    assert df["customerID"].tolist() == ["a-1", "b-2"] * 2
+    assert df["model_version"].tolist() == ["7", "7", "8", "8"]
+    assert df["prediction"].tolist() == [1, 0, 1, 0]
+    assert np.isnan(df["TotalCharges"][0]) and df["tenure"][1] == 40.0
+    # Kolom mentah siap diproses initial_cleaning seperti telco-dataset.csv
+    raw = load_audit_log(str(tmp_path))
+    assert list(raw.columns) == RAW_COLUMNS
+    with contextlib.redirect_stdout(io.StringIO()):
+        cleaned = load_initial_cleaning()(raw.copy())
+    assert len(cleaned) > 0
+
+
+def test_buffer_limit_drops_and_counts(tmp_path):
+    dropped = Counter("dropped", "d", registry=CollectorRegistry())
+    sink = AuditLogSink(str(tmp_path), max_buffer_rows=3, flush_rows=100, flush_seconds=3600,
+                        rows_dropped_counter=dropped)
+    append(sink)
+    append(sink)
+    assert sink._rows == 2 and dropped._value.get() == 2
+
+
+def test_background_flush_when_flush_rows_reached(tmp_path):
+    written = Counter("written", "w", registry=CollectorRegistry())
+    sink = AuditLogSink(str(tmp_path), flush_rows=4, flush_seconds=3600, rows_written_counter=written)
+    append(sink)
+    append(sink)
+    for _ in range(200):
+        if written._value.get() == 4:
+            break
+        time.sleep(0.01)
+    assert written._value.get() == 4 and len(load_audit_log(str(tmp_path))) == 4
+
+
+@pytest.mark.parametrize("predictions", [("Yes", "No"), (200, 3)])
+def test_non_int8_class_labels_are_written(tmp_path, predictions):
+    dropped = Counter("dropped", "d", registry=CollectorRegistry())
+    sink = AuditLogSink(str(tmp_path), flush_seconds=3600, rows_dropped_counter=dropped)
+    append(sink, predictions=predictions)
+    assert sink.flush() is not None and dropped._value.get() == 0
+    assert load_audit_log(str(tmp_path), raw_only=False)["prediction"].tolist() == list(predictions)
+
+
+def test_files_with_integer_and_string_labels_load_together(tmp_path):
+    sink = AuditLogSink(str(tmp_path), flush_seconds=3600)
+    append(sink)
+    sink.flush()
+    append(sink, version="8", predictions=("Yes", "No"))
+    sink.flush()
+    assert load_audit_log(str(tmp_path), raw_only=False)["prediction"].tolist() == ["1", "0", "Yes", "No"]
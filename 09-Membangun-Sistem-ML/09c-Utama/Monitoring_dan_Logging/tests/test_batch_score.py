@@ -0,0 +1,33 @@
+import os
+import pandas as pd
+import pytest
+from conftest import MODULE_DIR
+import batch_score
+
+RAW_CSV = os.path.join(MODULE_DIR, "..", "..", "09a-Eksperimen", "telco-dataset_raw", "telco-dataset.csv")
+
+
+@pytest.fixture(scope="module")
+def raw_sample(tmp_path_factory):
+    path = tmp_path_factory.mktemp("batch") / "raw.csv"
+    pd.read_csv(RAW_CSV, nrows=45).to_csv(path, index=False)
+    return path
+
+
+@pytest.fixture(scope="module")
+def expected(raw_sample):
+    # Skor referensi: satu chunk di proses ini, tanpa pool
+    batch_score.init_worker(os.environ["MODEL_PATH"], None, 0.5)
+    return batch_score.score_chunk(pd.read_csv(raw_sample))
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_chunked_pool_output_matches_single_pass_in_order(raw_sample, expected, tmp_path, suffix):
+    output = str(tmp_path / f"scores{suffix}")
+    n_rows, _ = batch_score.run_batch(str(raw_sample), output, workers=2, chunk_size=10,
+                                      model_path=os.environ["MODEL_PATH"])
+    result = pd.read_parquet(output) if suffix == ".parquet" else pd.read_csv(output)
+    assert n_rows == 45
+    assert result["customerID"].tolist() == expected["customerID"].tolist()
+    assert result["prediction"].tolist() == expected["prediction"].tolist()
+    assert result["probability_churn"].tolist() == pytest.approx(expected["probability_churn"].tolist())
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from prometheus_client import CollectorRegistry, Histogram
+from batch_telemetry import (KNOWN_CONTRACTS, SMALL_BATCH_ROWS, check_histogram_internals, count_categories,
+                             numeric_column, observe_histogram_batch)
+
+BUCKETS = (1.0, 5.0, 10.0, 50.0)
+
+
+def histogram_samples(histogram):
+    return {(sample.name, tuple(sample.labels.items())): sample.value
+            for metric in histogram.collect() for sample in metric.samples if not sample.name.endswith("_created")}
+
+
+def test_batch_observe_matches_per_value_observe():
+    values = np.array([0.5, 1.0, 1.0000001, 5.0, 7.5, 10.0, 49.9, 50.0, 51.0, 1e6] * 4)
+    batched = Histogram('batched', 'b', buckets=BUCKETS, registry=CollectorRegistry())
+    reference = Histogram('batched', 'b', buckets=BUCKETS, registry=CollectorRegistry())
+    observe_histogram_batch(batched, values)
+    for value in values:
+        reference.observe(value)
+    assert len(values) >= SMALL_BATCH_ROWS
+    assert histogram_samples(batched) == pytest.approx(histogram_samples(reference))
+
+
+def test_missing_internals_fail_loudly():
+    histogram = Histogram('checked', 'c', buckets=BUCKETS, registry=CollectorRegistry())
+    check_histogram_internals(histogram)
+    del histogram._buckets
+    with pytest.raises(RuntimeError, match="prometheus-client"):
+        check_histogram_internals(histogram)
+
+
+@pytest.mark.parametrize("n_values", [1, SMALL_BATCH_ROWS * 2])
+def test_batch_observe_checks_each_histogram_on_first_use(n_values):
+    # Mis. histogram selisih shadow scoring, yang tidak ikut diperiksa exporter saat start
+    histogram = Histogram('unchecked', 'u', buckets=BUCKETS, registry=CollectorRegistry())
+    del histogram._sum
+    with pytest.raises(RuntimeError, match="prometheus-client"):
+        observe_histogram_batch(histogram, np.ones(n_values))
+    labeled = Histogram('labeled', 'l', ['model'], buckets=BUCKETS, registry=CollectorRegistry())
+    with pytest.raises(RuntimeError):
+        observe_histogram_batch(labeled, np.ones(n_values))
+    observe_histogram_batch(labeled.labels(model='a'), np.ones(n_values))
+
+
+@pytest.mark.parametrize("n_rows", [4, SMALL_BATCH_ROWS * 2])
+def test_count_categories_maps_odd_values_to_other(n_rows):
+    odd_values = ['Month-to-month', 'One year', 'Weekly', ['Two year'], {'a': 1}, 3, None]
+    records = [{'Contract': odd_values[i % len(odd_values)]} for i in range(n_rows)] + [{}]
+    expected = {}
+    for record in records:
+        value = record.get('Contract')
+        if value is not None:
+            label = value if isinstance(value, str) and value in KNOWN_CONTRACTS else 'other'
+            expected[label] = expected.get(label, 0) + 1
+    assert count_categories(records, 'Contract', KNOWN_CONTRACTS) == expected
+
+
+def test_numeric_column_drops_non_numeric():
+    records = [{'tenure': 1}, {'tenure': '2.5'}, {'tenure': 'x'}, {'tenure': None}, {}]
+    assert numeric_column(records, 'tenure').tolist() == [1.0, 2.5]
@@ -0,0 +1,57 @@
+import csv
+import io
+import json
+import numpy as np
+from conftest import SAMPLE_RECORD
+from bulk_scoring import stream_bulk_predictions
+from feature_encoder import ChurnFeatureEncoder
+
+RECORDS = [{**SAMPLE_RECORD, "customerID": f"c{i}", "tenure": i + 1, "Contract": ("Month-to-month", "Two year")[i % 2]}
+           for i in range(5)]
+
+
+def as_csv(records):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(records[0]))
+    writer.writeheader()
+    writer.writerows(records)
+    return buffer.getvalue().encode()
+
+
+def test_stream_scores_in_fixed_chunks():
+    chunks = []
+    body = "\n".join(json.dumps(record) for record in RECORDS).encode()
+    generator = stream_bulk_predictions(io.BytesIO(body), "application/x-ndjson", 2, ChurnFeatureEncoder(),
+                                        lambda X: (np.zeros(len(X), dtype=int), X[:, 0] / 100),
+                                        on_chunk=lambda records, *_: chunks.append(len(records)))
+    lines = list(generator)
+    assert chunks == [2, 2, 1] and len(lines) == 3
+    results = [json.loads(line) for chunk in lines for line in chunk.splitlines()]
+    assert [result["customerID"] for result in results] == [f"c{i}" for i in range(5)]
+    assert [result["probability_churn"] for result in results] == [(i + 1) / 100 for i in range(5)]
+
+
+def test_bulk_csv_and_ndjson_match_predict(client, exporter, monkeypatch):
+    monkeypatch.setattr(exporter, "BULK_CHUNK_SIZE", 2)
+    expected = client.post("/predict", json=[{k: v for k, v in r.items() if k != "customerID"} for r in RECORDS]).json
+
+    csv_response = client.post("/predict/bulk", data=as_csv(RECORDS), content_type="text/csv")
+    rows = list(csv.DictReader(io.StringIO(csv_response.get_data(as_text=True))))
+    assert [row["customerID"] for row in rows] == [record["customerID"] for record in RECORDS]
+    assert [int(row["prediction"]) for row in rows] == expected["predictions"]
+    np.testing.assert_allclose([float(row["probability_churn"]) for row in rows], expected["probabilities_churn"])
+
+    body = "\n".join(json.dumps(record) for record in RECORDS).encode()
+    ndjson_response = client.post("/predict/bulk", data=body, content_type="application/x-ndjson")
+    results = [json.loads(line) for line in ndjson_response.get_data(as_text=True).splitlines()]
+    np.testing.assert_allclose([result["probability_churn"] for result in results], expected["probabilities_churn"])
+
+
+def test_bulk_reports_error_after_scored_rows(client, exporter, monkeypatch):
+    monkeypatch.setattr(exporter, "BULK_CHUNK_SIZE", 2)
+    bad = [*RECORDS[:2], {**RECORDS[2], "TotalCharges": "abc"}]
+    response = client.post("/predict/bulk", data="\n".join(json.dumps(record) for record in bad).encode(),
+                           content_type="application/x-ndjson")
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert len(lines) == 3 and lines[-1]["rows_scored"] == 2 and "TotalCharges" in lines[-1]["error"]
+    assert client.post("/predict/bulk", data=b"{}", content_type="application/json").status_code == 415
@@ -0,0 +1,144 @@
+import asyncio
+import json
+import subprocess
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from conftest import MODULE_DIR
+from churn_client import AsyncChurnClient, ChurnClient, retry_delay
+from response_formats import JSON, MSGPACK
+
+
+class FakeService:
+    """Server /predict palsu: prediksi = tenure % 2, probabilitas = tenure / 100; perilaku bisa diatur per test."""
+
+    def __init__(self):
+        self.batches = []
+        self.content_types = []
+        self.fail_first = 0
+        self.drop_last_row = False
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = self.rfile.read(int(self.headers["Content-Length"]))
+                service.content_types.append(self.headers["Content-Type"])
+                if self.path.startswith("/predict/by-id"):
+                    # Server asli menolak body yang Content-Type-nya tidak cocok
+                    if self.headers["Content-Type"] != JSON:
+                        self.reply(400, {"error": "body tidak bisa di-decode"})
+                        return
+                    ids = json.loads(payload)["customerIDs"]
+                    self.reply(200, {"customerIDs": ids, "predictions": [0] * len(ids),
+                                     "probabilities_churn": [0.25] * len(ids)})
+                    return
+                records = json.loads(payload)
+                service.batches.append(len(records))
+                if service.fail_first > 0:
+                    service.fail_first -= 1
+                    self.reply(429, {"error": "sibuk"}, {"Retry-After": "100"})
+                    return
+                if service.drop_last_row:
+                    records = records[:-1]
+                self.reply(200, {"predictions": [record["tenure"] % 2 for record in records],
+                                 "probabilities_churn": [record["tenure"] / 100 for record in records]})
+
+            def reply(self, status, payload, headers=None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                for key, value in {"Content-Type": JSON, "Content-Length": str(len(body)), **(headers or {})}.items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+
+@pytest.fixture
+def service():
+    service = FakeService()
+    yield service
+    service.server.shutdown()
+
+
+def make_client(service, **kwargs):
+    return ChurnClient(service.url, response_format=JSON, batch_window=0.05, timeout=2.0, **kwargs)
+
+
+def test_concurrent_predicts_are_batched_in_order(service):
+    with make_client(service) as client:
+        futures = [client.submit({"tenure": tenure}) for tenure in range(10)]
+        results = [future.result(timeout=5) for future in futures]
+    assert service.batches == [10]
+    assert [result.prediction for result in results] == [tenure % 2 for tenure in range(10)]
+    assert [result.probability_churn for result in results] == [tenure / 100 for tenure in range(10)]
+
+
+def test_row_count_mismatch_fails_every_future(service):
+    service.drop_last_row = True
+    with make_client(service) as client:
+        futures = [client.submit({"tenure": tenure}) for tenure in range(3)]
+        for future in futures:
+            with pytest.raises(ValueError, match="2 prediksi untuk 3"):
+                future.result(timeout=5)
+
+
+def test_retry_after_is_capped_by_backoff_cap(service):
+    service.fail_first = 2
+    with make_client(service, backoff_cap=0.01) as client:
+        start = time.perf_counter()
+        result = client.predict({"tenure": 3})
+    assert result.prediction == 1 and service.batches == [1, 1, 1]
+    assert time.perf_counter() - start < 2
+    assert retry_delay(0, retry_after=3600, backoff_base=0.1, backoff_cap=5.0) <= 5.1
+
+
+def test_close_stops_batcher_thread(service):
+    client = make_client(service)
+    client.predict({"tenure": 1})
+    worker = client._worker
+    client.close()
+    assert not worker.is_alive()
+    with pytest.raises(RuntimeError):
+        client.submit({"tenure": 1})
+
+
+def test_async_client_batches_and_checks_row_count(service):
+    async def run():
+        async with AsyncChurnClient(service.url, response_format=JSON, batch_window=0.05, timeout=2.0) as client:
+            results = await asyncio.gather(*(client.predict({"tenure": tenure}) for tenure in range(5)))
+            service.drop_last_row = True
+            with pytest.raises(ValueError):
+                await client.predict({"tenure": 1})
+        return results
+
+    results = asyncio.run(run())
+    assert service.batches == [5, 1]
+    assert [result.prediction for result in results] == [0, 1, 0, 1, 0]
+
+
+def test_predict_by_id_sends_json_whatever_the_request_format(service):
+    with ChurnClient(service.url, response_format=JSON, request_format=MSGPACK, timeout=2.0) as client:
+        response = client.predict_by_id(["a", "b"])
+    assert response["probabilities_churn"].tolist() == [0.25, 0.25]
+
+    async def run():
+        async with AsyncChurnClient(service.url, response_format=JSON, request_format=MSGPACK, timeout=2.0) as client:
+            return await client.predict_by_id(["c"])
+
+    assert asyncio.run(run())["predictions"].tolist() == [0]
+    assert service.content_types == [JSON, JSON]
+
+
+def test_import_does_not_pull_aiohttp_or_inference():
+    code = "import sys, churn_client; print(sorted({'aiohttp', 'inference', 'pandas'} & set(sys.modules)))"
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                            cwd=MODULE_DIR).stdout
+    assert output.strip() == "[]"
@@ -0,0 +1,56 @@
+import threading
+import warnings
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+from sklearn.svm import LinearSVC
+from churn_scorer import ChurnScorer
+
+rng = np.random.default_rng(0)
+X = rng.normal(size=(200, 3))
+COLUMNS = ["a", "b", "c"]
+
+
+def test_proba_mode_matches_predict():
+    model = LogisticRegression().fit(X, (X[:, 0] > 0).astype(int))
+    labels, probabilities = ChurnScorer(model).score(X)
+    np.testing.assert_array_equal(labels, model.predict(X))
+    np.testing.assert_allclose(probabilities, model.predict_proba(X)[:, 1])
+
+
+@pytest.mark.parametrize("positive_class", ["churn", "stay"])
+def test_decision_fallback_follows_classes_order(positive_class):
+    y = np.where(X[:, 0] > 0, "stay", "churn")
+    model = LinearSVC().fit(X, y)
+    labels, probabilities = ChurnScorer(model, positive_class=positive_class).score(X)
+    np.testing.assert_array_equal(labels, model.predict(X))
+    assert not probabilities.any()
+
+
+def test_scoring_ndarray_does_not_warn_or_touch_global_filters():
+    model = LogisticRegression().fit(pd.DataFrame(X, columns=COLUMNS), (X[:, 0] > 0).astype(int))
+    scorer = ChurnScorer(model, columns=COLUMNS)
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        filters_before = list(warnings.filters)
+        threads = [threading.Thread(target=lambda: [scorer.score(X) for _ in range(50)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert not caught
+        assert warnings.filters == filters_before
+        # Model asli tidak diubah: pemanggil lain tetap mendapat pemeriksaan nama fitur sklearn
+        model.predict(X)
+        assert any("valid feature names" in str(warning.message) for warning in caught)
+    np.testing.assert_array_equal(scorer.score(X)[0], model.predict(pd.DataFrame(X, columns=COLUMNS)))
+
+
+def test_rejects_mismatched_columns_and_non_binary_models():
+    model = LogisticRegression().fit(pd.DataFrame(X, columns=COLUMNS), (X[:, 0] > 0).astype(int))
+    with pytest.raises(ValueError):
+        ChurnScorer(model, columns=["c", "b", "a"])
+    multiclass = LogisticRegression().fit(X, np.digitize(X[:, 0], [-0.5, 0.5]))
+    with pytest.raises(ValueError):
+        ChurnScorer(multiclass)
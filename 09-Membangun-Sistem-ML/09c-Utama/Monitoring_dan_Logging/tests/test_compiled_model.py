@@ -0,0 +1,48 @@
+import os
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from compiled_model import compile_model, load_compiled_model, save_compiled_model
+
+rng = np.random.default_rng(42)
+# Campuran kolom numerik dan one-hot seperti matriks serving
+X = np.column_stack([rng.uniform(0, 72, 400), rng.uniform(18, 118, 400), rng.integers(0, 2, (400, 4))]).astype(np.float64)
+y = ((X[:, 0] < 20) & (X[:, 2] == 1) | (X[:, 1] > 100)).astype(int)
+
+MODELS = {
+    "logistic_regression": LogisticRegression(max_iter=1000),
+    "random_forest": RandomForestClassifier(n_estimators=15, max_depth=6, random_state=0),
+}
+
+
+@pytest.fixture(params=sorted(MODELS))
+def fitted(request, tmp_path):
+    model = MODELS[request.param].fit(X, y)
+    path = str(tmp_path / "model.npz")
+    save_compiled_model(compile_model(model), path)
+    return model, load_compiled_model(path)
+
+
+@pytest.mark.parametrize("n_rows", [1, 7, 400])
+def test_compiled_matches_sklearn_after_save_load(fitted, n_rows):
+    model, compiled = fitted
+    np.testing.assert_allclose(compiled.predict_proba(X[:n_rows]), model.predict_proba(X[:n_rows]), rtol=0, atol=1e-9)
+    np.testing.assert_array_equal(compiled.predict(X[:n_rows]), model.predict(X[:n_rows]))
+    np.testing.assert_array_equal(compiled.classes_, model.classes_)
+
+
+def test_repo_model_compiles_identically():
+    import mlflow.sklearn
+    model = mlflow.sklearn.load_model(os.environ["MODEL_PATH"])
+    X_serving = np.column_stack([X[:, :2], rng.uniform(20, 8000, 400), rng.integers(0, 2, (400, 27))])
+    compiled = compile_model(model)
+    np.testing.assert_allclose(compiled.predict_proba(X_serving), model.predict_proba(X_serving), atol=1e-9)
+
+
+def test_unsupported_models_are_rejected():
+    with pytest.raises(TypeError):
+        compile_model(DecisionTreeClassifier().fit(X, y))
+    with pytest.raises(ValueError):
+        compile_model(LogisticRegression(max_iter=1000).fit(X, np.digitize(X[:, 0], [20, 50])))
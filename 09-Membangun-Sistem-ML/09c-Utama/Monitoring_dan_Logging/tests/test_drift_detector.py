@@ -0,0 +1,60 @@
+import os
+import numpy as np
+import pytest
+from drift_detector import DriftMonitor, binned_ks_statistic, load_baseline, population_stability_index
+from feature_encoder import ChurnFeatureEncoder, final_columns
+from inference import create_sample_data
+
+COLUMNS = ["x", "c_a", "c_b"]
+# x distandarkan dengan (x - 10) / 2 lalu dibinning pada -1 dan 1; kategori c: baseline, a, b
+BASELINE = {
+    "numeric": {"x": {"edges": [-1.0, 1.0], "expected": [0.25, 0.5, 0.25], "mean": 10.0, "scale": 2.0}},
+    "categorical": {"c": {"columns": ["c_a", "c_b"], "categories": ["(baseline)", "a", "b"], "expected": [0.5, 0.25, 0.25]}},
+}
+
+
+def matching_window(n):
+    # x: 1/4 di bawah 8, 1/2 di 8..12, 1/4 di atas 12; c: 1/2 baseline, 1/4 a, 1/4 b
+    x = np.tile([6.0, 10.0, 10.0, 14.0], n // 4)
+    onehot = np.tile([[0, 0], [0, 0], [1, 0], [0, 1]], (n // 4, 1))
+    return np.column_stack([x, onehot]).astype(np.float64)
+
+
+def test_matching_window_has_no_drift_and_shift_is_detected():
+    monitor = DriftMonitor(BASELINE, columns=COLUMNS, min_rows=1)
+    monitor.update(matching_window(400))
+    scores = monitor.evaluate()
+    assert scores["x"]["psi"] == pytest.approx(0.0, abs=1e-12) and scores["x"]["ks"] == pytest.approx(0.0, abs=1e-12)
+    assert scores["c"]["psi"] == pytest.approx(0.0, abs=1e-12)
+
+    shifted = matching_window(400)
+    shifted[:, 0] += 6.0
+    shifted[:, 1:] = [1, 0]
+    monitor.update(shifted)
+    scores = monitor.evaluate()
+    assert scores["x"]["psi"] > 1.0 and scores["x"]["ks"] == pytest.approx(0.75)
+    assert scores["c"]["psi"] > 1.0
+
+
+def test_window_waits_for_min_rows_and_resets_after_evaluation():
+    monitor = DriftMonitor(BASELINE, columns=COLUMNS, min_rows=100)
+    monitor.update(matching_window(40))
+    assert monitor.evaluate() is None
+    assert monitor.evaluate(force=True) is not None
+    assert monitor.evaluate(force=True) is None
+
+
+def test_score_functions():
+    expected = np.array([0.5, 0.5])
+    counts = np.array([90, 10])
+    assert population_stability_index(expected, counts) == pytest.approx(0.4 * np.log(0.9 / 0.5) - 0.4 * np.log(0.1 / 0.5))
+    assert binned_ks_statistic(expected, counts) == pytest.approx(0.4)
+
+
+def test_repo_baseline_scores_live_requests():
+    baseline = load_baseline(os.environ["DRIFT_BASELINE_PATH"])
+    monitor = DriftMonitor(baseline, columns=final_columns, min_rows=1)
+    monitor.update(ChurnFeatureEncoder().encode(create_sample_data(num_samples=300)))
+    scores = monitor.evaluate()
+    assert set(scores) == set(baseline["numeric"]) | set(baseline["categorical"])
+    assert all(np.isfinite(score["psi"]) and score["psi"] >= 0 for score in scores.values())
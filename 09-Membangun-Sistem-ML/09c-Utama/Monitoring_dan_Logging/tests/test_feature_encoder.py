@@ -0,0 +1,53 @@
+import random
+import numpy as np
+import pytest
+from conftest import SAMPLE_RECORD
+from benchmark_encoder import encode_with_pandas
+from feature_encoder import ChurnFeatureEncoder, final_columns, normalize_records
+from inference import create_sample_data
+
+
+@pytest.fixture
+def encoder():
+    return ChurnFeatureEncoder(final_columns)
+
+
+@pytest.mark.parametrize("n_records", [1, 7, 500])
+def test_matches_get_dummies_reindex(encoder, n_records):
+    random.seed(n_records)
+    records = create_sample_data(num_samples=n_records)
+    np.testing.assert_array_equal(encoder.encode(records), encode_with_pandas(records).to_numpy())
+
+
+def test_unknown_categories_and_missing_fields_encode_as_zero(encoder):
+    record = {**SAMPLE_RECORD, "Contract": "Weekly", "gender": 1}
+    del record["PaymentMethod"]
+    X = encoder.encode([record])
+    for column in ("Contract_One year", "Contract_Two year", "gender_Male",
+                   "PaymentMethod_Electronic check", "PaymentMethod_Mailed check"):
+        assert X[0, final_columns.index(column)] == 0.0
+    assert X[0, final_columns.index("InternetService_Fiber optic")] == 1.0
+
+
+def test_numeric_strings_blanks_and_invalid_values(encoder):
+    X = encoder.encode([{**SAMPLE_RECORD, "TotalCharges": "845.5"}, {**SAMPLE_RECORD, "TotalCharges": " "}])
+    assert X[:, encoder.numeric_index["TotalCharges"]].tolist() == [845.5, 0.0]
+    with pytest.raises(ValueError, match="TotalCharges"):
+        encoder.encode([{**SAMPLE_RECORD, "TotalCharges": "abc"}])
+    with pytest.raises(ValueError):
+        encoder.encode(["bukan dict"])
+
+
+def test_out_buffer_is_reused_and_cleared(encoder):
+    buffer = np.full((4, len(final_columns)), 9.0)
+    X = encoder.encode([SAMPLE_RECORD, SAMPLE_RECORD], out=buffer)
+    assert X.base is buffer and X.shape == (2, len(final_columns))
+    np.testing.assert_array_equal(X[0], encoder.encode_one(SAMPLE_RECORD)[0])
+    np.testing.assert_array_equal(encoder.encode_one(SAMPLE_RECORD, out=buffer[3]), X[:1])
+
+
+def test_normalize_records():
+    assert normalize_records(SAMPLE_RECORD) == [SAMPLE_RECORD]
+    assert normalize_records([SAMPLE_RECORD]) == [SAMPLE_RECORD]
+    with pytest.raises(ValueError):
+        normalize_records("x")
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+from conftest import ADMIN_HEADERS, SAMPLE_RECORD
+from feature_store import FeatureStore, InvalidCustomerID
+
+
+def make_records(n, tenure_start=1):
+    return [{**SAMPLE_RECORD, "tenure": tenure_start + i} for i in range(n)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return FeatureStore.create(str(tmp_path / "store"), capacity=4)
+
+
+def test_upsert_then_lookup_matches_encoder(store):
+    records = make_records(3)
+    assert store.upsert(["a", "b", "c"], records) == (0, 3)
+    X, found, missing = store.lookup(["c", "x", "a"])
+    assert found == ["c", "a"] and missing == ["x"]
+    expected = store.encoder.encode([records[2], records[0]], dtype=np.float32)
+    np.testing.assert_array_equal(X, expected.astype(np.float64))
+
+
+def test_upsert_overwrites_existing_and_grows_capacity(store):
+    store.upsert(["a", "b"], make_records(2))
+    n_updated, n_added = store.upsert(["a", "c", "d", "e", "f"], make_records(5, tenure_start=50))
+    assert (n_updated, n_added) == (1, 4)
+    assert len(store) == 6 and store.manifest["capacity"] >= 6
+    X, found, _ = store.lookup(["a", "b", "f"])
+    tenure = store.encoder.numeric_index["tenure"]
+    assert found == ["a", "b", "f"]
+    assert X[:, tenure].tolist() == [50.0, 2.0, 54.0]
+
+
+@pytest.mark.parametrize("bad_id", ["bad\nid", "bad\rid", ""])
+def test_ids_with_newlines_are_rejected_without_corrupting_index(store, bad_id):
+    store.upsert(["a"], make_records(1))
+    with pytest.raises(InvalidCustomerID):
+        store.upsert([bad_id, "zzz"], make_records(2))
+    store.upsert(["zzz"], make_records(1, tenure_start=7))
+    reader = FeatureStore(store.path)
+    _, found, missing = reader.lookup(["a", "bad", "zzz"])
+    assert found == ["a", "zzz"] and missing == ["bad"]
+
+
+def test_refresh_reads_only_new_ids(store):
+    store.upsert(["a", "b"], make_records(2))
+    reader = FeatureStore(store.path, refresh_seconds=0)
+    index_before, offset_before = reader.index, reader._ids_offset
+    store.upsert(["c"], make_records(1))
+    _, found, _ = reader.lookup(["a", "c"])
+    assert found == ["a", "c"]
+    # Index diperbarui di tempat (tidak dibangun ulang) dan offset maju sebesar id baru saja
+    assert reader.index is index_before
+    assert reader._ids_offset == offset_before + len("c\n")
+
+
+def test_admin_features_rejects_newline_ids(client, exporter, store, monkeypatch):
+    monkeypatch.setattr(exporter, "feature_store", store)
+    response = client.post("/admin/features", headers=ADMIN_HEADERS,
+                           json=[{**SAMPLE_RECORD, "customerID": "bad\nid"}, {**SAMPLE_RECORD, "customerID": "zzz"}])
+    assert response.status_code == 400
+    assert len(store) == 0
+
+    response = client.post("/admin/features", headers=ADMIN_HEADERS, json=[{**SAMPLE_RECORD, "customerID": "zzz"}])
+    assert response.status_code == 200 and response.json["added"] == 1
+    response = client.post("/predict/by-id", json={"customerIDs": ["zzz"]})
+    assert response.status_code == 200 and response.json["customerIDs"] == ["zzz"]
+
+
+def test_module_imports_without_fcntl(monkeypatch):
+    # Windows tidak punya fcntl; server mengimpor feature_store walau feature store tidak aktif
+    import importlib
+    import sys
+    monkeypatch.setitem(sys.modules, "fcntl", None)
+    monkeypatch.delitem(sys.modules, "feature_store")
+    module = importlib.import_module("feature_store")
+    assert hasattr(module, "FeatureStore")
@@ -0,0 +1,55 @@
+import os
+import runpy
+import subprocess
+import sys
+import pytest
+from conftest import MODULE_DIR, SAMPLE_RECORD
+
+
+def load_config(monkeypatch, tmp_path, **env):
+    # Direktori metrik diarahkan ke tmp agar konfigurasi tidak menghapus direktori sungguhan
+    monkeypatch.setenv("PROMETHEUS_MULTIPROC_DIR", str(tmp_path / "metrics"))
+    for name in ("GUNICORN_THREADS", "ADMISSION_MAX_IN_FLIGHT", "ADMISSION_MAX_QUEUE"):
+        monkeypatch.delenv(name, raising=False)
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+    return runpy.run_path(os.path.join(MODULE_DIR, "gunicorn.conf.py"))
+
+
+def test_default_threads_cover_admission_in_flight_and_queue(monkeypatch, tmp_path):
+    assert load_config(monkeypatch, tmp_path)["threads"] == 8 + 32 + 1
+
+
+@pytest.mark.parametrize("in_flight,queue,expected", [("4", "0", 5), ("16", "16", 33)])
+def test_threads_follow_admission_limits(monkeypatch, tmp_path, in_flight, queue, expected):
+    config = load_config(monkeypatch, tmp_path, ADMISSION_MAX_IN_FLIGHT=in_flight, ADMISSION_MAX_QUEUE=queue)
+    assert config["threads"] == expected
+
+
+def test_explicit_thread_count_wins(monkeypatch, tmp_path):
+    assert load_config(monkeypatch, tmp_path, GUNICORN_THREADS="6")["threads"] == 6
+
+
+WORKER_SCRIPT = """
+import json, sys
+sys.path.insert(0, {module_dir!r})
+import prometheus_exporter
+client = prometheus_exporter.app.test_client()
+for _ in range({n_requests}):
+    client.post("/predict", json={record!r}, buffered=True)
+client.post("/predict", json="bukan record", buffered=True)
+from prometheus_client import generate_latest
+print(generate_latest(prometheus_exporter.metrics_registry()).decode())
+"""
+
+
+def test_metrics_are_aggregated_across_worker_processes(tmp_path):
+    # Dua proses "worker" berbagi PROMETHEUS_MULTIPROC_DIR; /metrics proses mana pun menjumlahkan keduanya
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    outputs = [subprocess.run([sys.executable, "-c", WORKER_SCRIPT.format(module_dir=MODULE_DIR, n_requests=n,
+                                                                          record=[SAMPLE_RECORD])],
+                              env=env, capture_output=True, text=True, check=True).stdout
+               for n in (2, 3)]
+    metrics = dict(line.rsplit(" ", 1) for line in outputs[-1].splitlines() if line and not line.startswith("#"))
+    assert float(metrics["prediction_requests_total"]) == 2 + 3 + 2
+    assert float(metrics["prediction_failures_total"]) == 2
@@ -0,0 +1,81 @@
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import aiohttp
+import pytest
+from load_test import new_stats, run_load_test, send_one, summarize
+
+
+@pytest.fixture
+def server():
+    """Server /predict palsu yang mencatat ukuran batch setiap request."""
+    batches = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            batches.append(len(json.loads(self.rfile.read(int(self.headers["Content-Length"])))))
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/predict", batches
+    httpd.shutdown()
+
+
+def test_summarize_counts_errors_and_row_throughput():
+    stats = {"latencies": [i / 1000 for i in range(1, 11)],
+             "status": Counter({"200": 7, "429": 1, "500": 1, "ClientConnectorError": 1})}
+    result = summarize(stats, 2.0, url="http://x", rps=5, concurrency=4, batch_size=10)
+    assert (result["requests"], result["ok"], result["errors"]) == (10, 7, 3)
+    assert result["error_rate"] == pytest.approx(0.3)
+    assert result["throughput_rps"] == pytest.approx(5.0)
+    assert result["throughput_rows_per_second"] == pytest.approx(35.0)
+    assert result["config"]["mode"] == "open_loop"
+    assert result["latency_ms"]["p50"] == pytest.approx(5.5) and result["latency_ms"]["max"] == pytest.approx(10.0)
+
+
+def test_summarize_without_requests():
+    result = summarize(new_stats(), 0.0, url="http://x", rps=0, concurrency=1, batch_size=1)
+    assert result["config"]["mode"] == "closed_loop"
+    assert result["requests"] == 0 and result["error_rate"] == 0.0 and result["latency_ms"] == {}
+    assert result["throughput_rps"] == 0.0
+
+
+def test_latency_is_measured_from_schedule(server):
+    url, _ = server
+    stats = new_stats()
+
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            # Request yang terlambat dikirim 0.5 detik tetap dihitung dari jadwalnya (tanpa coordinated omission)
+            await send_one(session, url, b"[]", {}, time.perf_counter() - 0.5, stats)
+            await send_one(session, "http://127.0.0.1:1/predict", b"[]", {}, time.perf_counter(), stats)
+
+    asyncio.run(run())
+    assert stats["latencies"][0] >= 0.5
+    assert stats["status"]["200"] == 1 and sum(stats["status"].values()) == 2
+
+
+def test_open_loop_sends_target_rate_with_batch_size(server):
+    url, batches = server
+    result = asyncio.run(run_load_test(url, rps=50, concurrency=4, batch_size=3, duration=0.4, warmup=0.1))
+    assert result["requests"] == 20 and result["ok"] == 20
+    assert len(batches) == 25 and set(batches) == {3}
+    assert result["throughput_rows_per_second"] == pytest.approx(3 * result["throughput_rps"])
+
+
+def test_closed_loop_runs_until_duration(server):
+    url, _ = server
+    result = asyncio.run(run_load_test(url, rps=0, concurrency=2, batch_size=1, duration=0.2, warmup=0))
+    assert result["config"]["mode"] == "closed_loop"
+    assert result["requests"] > 0 and result["errors"] == 0
+    assert result["elapsed_seconds"] >= 0.2
@@ -0,0 +1,93 @@
+import os
+import threading
+import numpy as np
+import pytest
+from micro_batcher import MicroBatcher, _PendingRequest
+
+
+class RecordingScorer:
+    """score_fn yang mencatat ukuran setiap batch; hasilnya (jumlah per baris, kolom 0 * 2)."""
+
+    def __init__(self, fail=False):
+        self.batch_sizes = []
+        self.fail = fail
+
+    def __call__(self, X):
+        self.batch_sizes.append(len(X))
+        if self.fail:
+            raise RuntimeError("scoring gagal")
+        return X.sum(axis=1), X[:, 0] * 2
+
+
+def submit_concurrently(batcher, matrices):
+    results = [None] * len(matrices)
+    errors = [None] * len(matrices)
+    start = threading.Barrier(len(matrices))
+
+    def worker(i):
+        start.wait()
+        try:
+            results[i] = batcher.submit(matrices[i])
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(matrices))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_requests_share_a_batch_and_get_their_own_rows():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=1000, max_wait_seconds=0.2)
+    matrices = [np.full((i + 1, 3), float(i)) for i in range(8)]
+    results, errors = submit_concurrently(batcher, matrices)
+    assert errors == [None] * 8
+    assert sum(scorer.batch_sizes) == sum(len(X) for X in matrices) and len(scorer.batch_sizes) < 8
+    for X, (sums, doubled) in zip(matrices, results):
+        np.testing.assert_array_equal(sums, X.sum(axis=1))
+        np.testing.assert_array_equal(doubled, X[:, 0] * 2)
+
+
+def test_batch_closes_at_max_batch_size():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_batch_size=4, max_wait_seconds=0.2)
+    submit_concurrently(batcher, [np.ones((2, 3)) for _ in range(6)])
+    # Setiap request 2 baris, jadi batch ditutup tepat saat mencapai max_batch_size (4 baris)
+    assert sum(scorer.batch_sizes) == 12 and max(scorer.batch_sizes) == batcher.max_batch_size
+
+
+def test_scoring_error_reaches_every_caller():
+    batcher = MicroBatcher(RecordingScorer(fail=True), max_wait_seconds=0.05)
+    _, errors = submit_concurrently(batcher, [np.ones((1, 3)) for _ in range(3)])
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    with pytest.raises(RuntimeError):
+        batcher.submit(np.ones((1, 3)))
+
+
+def test_restarted_worker_keeps_requests_already_queued():
+    scorer = RecordingScorer()
+    batcher = MicroBatcher(scorer, max_wait_seconds=0.01, result_timeout_seconds=5.0)
+    # Worker mati di proses yang sama sementara satu request sudah ada di antrian
+    dead = threading.Thread(target=lambda: None)
+    dead.start()
+    dead.join()
+    batcher._worker, batcher._worker_pid = dead, os.getpid()
+    waiting = _PendingRequest(np.full((1, 3), 7.0))
+    batcher._queue.put(waiting)
+
+    sums, _ = batcher.submit(np.ones((2, 3)))
+    assert sums.tolist() == [3.0, 3.0]
+    assert waiting.done.wait(1) and waiting.result[0].tolist() == [21.0]
+
+
+def test_queue_is_replaced_after_fork():
+    batcher = MicroBatcher(RecordingScorer(), max_wait_seconds=0.01)
+    batcher.submit(np.ones((1, 3)))
+    parent_queue = batcher._queue
+    # Meniru proses anak hasil fork: pid pemilik worker berbeda dari pid sekarang
+    batcher._worker_pid = -1
+    batcher.submit(np.ones((1, 3)))
+    assert batcher._queue is not parent_queue
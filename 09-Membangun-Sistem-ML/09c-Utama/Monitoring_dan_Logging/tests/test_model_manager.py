@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pytest
+from prometheus_client import CollectorRegistry, Counter
+from sklearn.linear_model import LogisticRegression
+from churn_scorer import ChurnScorer
+from compiled_model import compile_model, save_compiled_model
+from feature_encoder import ChurnFeatureEncoder, final_columns
+from model_manager import WARMUP_RECORDS, ModelManager, discover_latest, resolve_registry_source
+
+WARMUP_X = ChurnFeatureEncoder().encode(WARMUP_RECORDS)
+rng = np.random.default_rng(1)
+X_TRAIN = rng.integers(0, 2, (200, len(final_columns))).astype(np.float64)
+
+
+def write_model(path, label_column, mtime):
+    model = LogisticRegression().fit(X_TRAIN, X_TRAIN[:, label_column].astype(int))
+    save_compiled_model(compile_model(model), path)
+    os.utime(path, (mtime, mtime))
+
+
+def write_version(models_dir, number, status, source):
+    version_dir = models_dir / f"version-{number}"
+    version_dir.mkdir(parents=True)
+    (version_dir / "meta.yaml").write_text(f"name: churn\nsource: {source}\nstatus: {status}\nversion: {number}\n")
+
+
+def test_discover_latest_picks_highest_ready_registry_version(tmp_path):
+    models_dir = tmp_path / "mlruns" / "models" / "churn"
+    write_version(models_dir, 1, "READY", "file:///D:/proyek/mlruns/1/aaa/artifacts/model")
+    write_version(models_dir, 2, "READY", "file:///D:/proyek/mlruns/1/bbb/artifacts/model")
+    write_version(models_dir, 3, "PENDING_REGISTRATION", "file:///D:/proyek/mlruns/1/ccc/artifacts/model")
+    version, path = discover_latest(str(models_dir))
+    assert version == "2"
+    assert path == os.path.join(str(tmp_path / "mlruns"), "1", "bbb", "artifacts", "model")
+    assert discover_latest(str(models_dir / "version-1"))[0] == "1"
+    assert discover_latest(str(tmp_path / "tidak-ada")) == (None, None)
+
+
+def test_resolve_registry_source_keeps_existing_paths(tmp_path):
+    assert resolve_registry_source(str(tmp_path), "/mlruns") == str(tmp_path)
+
+
+@pytest.fixture
+def manager(tmp_path):
+    path = str(tmp_path / "model.npz")
+    write_model(path, label_column=0, mtime=1_000_000)
+    reloads = Counter("reloads", "r", ["result"], registry=CollectorRegistry())
+    manager = ModelManager(lambda model: ChurnScorer(model, columns=final_columns), warmup_X=WARMUP_X,
+                           watch_path=path, reloads_counter=reloads)
+    version, model_path = discover_latest(path)
+    manager.load(model_path, version)
+    return manager, path, reloads
+
+
+def test_new_version_is_swapped_in_and_old_bundle_stays_usable(manager):
+    manager, path, reloads = manager
+    old = manager._bundle
+    assert manager.check_for_update() is False
+    write_model(path, label_column=5, mtime=2_000_000)
+    assert manager.check_for_update() is True
+    new = manager._bundle
+    assert new is not old and (old.version, new.version) == ("1000000", "2000000")
+    X = rng.integers(0, 2, (50, len(final_columns))).astype(np.float64)
+    # Request yang masih memegang bundle lama tetap di-skor model lama
+    assert (old.scorer.score(X)[0] == X[:, 0]).mean() > 0.9
+    assert (new.scorer.score(X)[0] == X[:, 5]).mean() > 0.9
+    assert reloads.labels(result="success")._value.get() == 1
+
+
+def test_broken_version_keeps_serving_model(manager):
+    manager, path, reloads = manager
+    old = manager._bundle
+    with open(path, "wb") as f:
+        f.write(b"bukan model")
+    os.utime(path, (3_000_000, 3_000_000))
+    assert manager.check_for_update() is False
+    assert manager._bundle is old
+    assert reloads.labels(result="failure")._value.get() == 1
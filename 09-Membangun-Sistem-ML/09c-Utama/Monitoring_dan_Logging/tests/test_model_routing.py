@@ -0,0 +1,42 @@
+import asyncio
+import json
+import os
+import pytest
+from conftest import SAMPLE_RECORD, call_asgi
+
+
+@pytest.fixture
+def registry(exporter, monkeypatch):
+    from model_registry import ModelRegistry
+    registry = ModelRegistry(exporter.make_scorer, extra_models={"challenger": os.environ["MODEL_PATH"]})
+    monkeypatch.setattr(exporter, "model_registry", registry)
+    return registry
+
+
+def test_flask_routes_by_url_and_header(client, registry):
+    version = next(iter(registry.available()["challenger"]))
+    by_url = client.post(f"/predict/challenger/{version}", json=[SAMPLE_RECORD])
+    by_header = client.post("/predict", json=[SAMPLE_RECORD], headers={"X-Model-Name": "challenger"})
+    assert by_url.status_code == 200 and by_header.status_code == 200
+    assert by_url.json["probabilities_churn"] == by_header.json["probabilities_churn"]
+    assert client.post("/predict/unknown/1", json=[SAMPLE_RECORD]).status_code == 404
+    assert client.get("/models").json["challenger"] == {version: True}
+
+
+def test_asgi_routes_by_url_and_header(exporter, registry):
+    import asgi_app
+    version = next(iter(registry.available()["challenger"]))
+    body = json.dumps([SAMPLE_RECORD]).encode()
+
+    async def run():
+        return (await call_asgi(asgi_app.app, "POST", f"/predict/challenger/{version}", body),
+                await call_asgi(asgi_app.app, "POST", "/predict", body, headers=[("X-Model-Name", "challenger")]),
+                await call_asgi(asgi_app.app, "POST", "/predict/default/latest", body),
+                await call_asgi(asgi_app.app, "POST", "/predict/unknown/1", body),
+                await call_asgi(asgi_app.app, "GET", "/models"))
+
+    by_url, by_header, default, unknown, models = asyncio.run(run())
+    assert by_url[0] == 200 and by_header[0] == 200 and default[0] == 200
+    assert json.loads(by_url[1])["probabilities_churn"] == json.loads(by_header[1])["probabilities_churn"]
+    assert unknown[0] == 404
+    assert version in json.loads(models[1])["challenger"]
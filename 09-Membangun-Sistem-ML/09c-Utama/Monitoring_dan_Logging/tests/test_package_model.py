@@ -0,0 +1,73 @@
+import json
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+from conftest import MODULE_DIR
+from feature_encoder import ChurnFeatureEncoder, final_columns
+from model_manager import WARMUP_RECORDS, load_model_from_path
+from package_model import MANIFEST_FILE, MODEL_FILE, is_packaged_model, load_packaged_model, package_model
+
+
+@pytest.fixture(scope="module")
+def repo_model():
+    import mlflow.sklearn
+    return mlflow.sklearn.load_model(os.environ["MODEL_PATH"])
+
+
+@pytest.fixture
+def packaged(repo_model, tmp_path):
+    package_model(repo_model, str(tmp_path), source="test")
+    return str(tmp_path)
+
+
+def test_packaged_model_predicts_like_mlflow_model(repo_model, packaged):
+    X = ChurnFeatureEncoder().encode(WARMUP_RECORDS)
+    assert is_packaged_model(packaged)
+    loaded = load_model_from_path(packaged)
+    np.testing.assert_array_equal(loaded.predict_proba(X), repo_model.predict_proba(X))
+    assert load_packaged_model(packaged, verify_checksum=True) is not None
+
+
+def test_manifest_mismatches_are_rejected(packaged):
+    with pytest.raises(ValueError, match="Skema"):
+        load_packaged_model(packaged, columns=list(reversed(final_columns)))
+    with open(os.path.join(packaged, MODEL_FILE), "ab") as f:
+        f.write(b"\0")
+    with pytest.raises(ValueError, match="Checksum"):
+        load_packaged_model(packaged, verify_checksum=True)
+    manifest_path = os.path.join(packaged, MANIFEST_FILE)
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    with open(manifest_path, "w") as f:
+        json.dump({**manifest, "format_version": 99}, f)
+    with pytest.raises(ValueError, match="format"):
+        load_packaged_model(packaged)
+
+
+def test_loading_packaged_model_does_not_import_mlflow(packaged):
+    code = ("import sys; from model_manager import load_model_from_path; load_model_from_path(sys.argv[1]); "
+            "print('mlflow' in sys.modules)")
+    output = subprocess.run([sys.executable, "-c", code, packaged], cwd=MODULE_DIR, capture_output=True, text=True,
+                            check=True).stdout
+    assert output.strip() == "False"
+
+
+def test_dockerfile_packaging_step_runs_on_copied_artifact(tmp_path):
+    # Meniru layout image: COPY folder model ke tujuan (isi folder disalin), lalu RUN package_model.py di WORKDIR
+    import shlex
+    import shutil
+    with open(os.path.join(MODULE_DIR, "Dockerfile")) as f:
+        lines = [line.strip() for line in f]
+    source, destination = next(line.split()[1:3] for line in lines
+                               if line.startswith("COPY") and "tuned-churn-model-dagshub" in line)
+    command = next(shlex.split(line[len("RUN "):]) for line in lines if line.startswith("RUN python package_model.py"))
+    model_path = next(line.split("=", 1)[1] for line in lines if line.startswith("ENV MODEL_PATH="))
+
+    shutil.copytree(os.path.join(MODULE_DIR, source), os.path.join(tmp_path, destination))
+    command[:2] = [sys.executable, os.path.join(MODULE_DIR, command[1])]
+    subprocess.run(command, cwd=tmp_path, env={**os.environ, "PYTHONPATH": MODULE_DIR}, capture_output=True,
+                   text=True, check=True)
+    assert is_packaged_model(os.path.join(tmp_path, model_path))
+    assert load_packaged_model(os.path.join(tmp_path, model_path), verify_checksum=True) is not None
@@ -0,0 +1,81 @@
+import gc
+import threading
+import numpy as np
+from prediction_cache import PredictionCache
+
+
+class FakeScorer:
+    """Scorer palsu dengan probabilitas tetap; menghitung baris yang benar-benar di-skor."""
+
+    def __init__(self, probability):
+        self.probability = probability
+        self.rows_scored = 0
+
+    def score(self, X):
+        self.rows_scored += len(X)
+        probabilities = np.full(len(X), self.probability)
+        return (probabilities > 0.5).astype(int), probabilities
+
+
+X = np.arange(12, dtype=np.float64).reshape(4, 3)
+
+
+def test_repeated_rows_are_served_from_cache():
+    cache = PredictionCache(max_entries=100)
+    scorer = FakeScorer(0.9)
+    cache.score(X, scorer.score, model_token=scorer)
+    labels, probabilities = cache.score(X[::-1], scorer.score, model_token=scorer)
+    assert scorer.rows_scored == len(X)
+    assert labels.tolist() == [1, 1, 1, 1] and probabilities.tolist() == [0.9] * 4
+
+
+def test_models_never_answer_for_each_other_and_alternating_does_not_flush():
+    cache = PredictionCache(max_entries=100)
+    model_a, model_b = FakeScorer(0.9), FakeScorer(0.1)
+    for _ in range(3):
+        _, probabilities_a = cache.score(X, model_a.score, model_token=model_a)
+        _, probabilities_b = cache.score(X, model_b.score, model_token=model_b)
+        assert probabilities_a.tolist() == [0.9] * 4
+        assert probabilities_b.tolist() == [0.1] * 4
+    # Setiap model hanya di-skor sekali per baris; bergantian antar model tidak mengosongkan cache
+    assert model_a.rows_scored == len(X) and model_b.rows_scored == len(X)
+
+
+def test_concurrent_models_keep_their_own_results():
+    cache = PredictionCache(max_entries=1000)
+    models = [FakeScorer(p) for p in (0.2, 0.4, 0.6, 0.8)]
+    errors = []
+
+    def worker(model):
+        for _ in range(200):
+            _, probabilities = cache.score(X, model.score, model_token=model)
+            if not np.all(probabilities == model.probability):
+                errors.append(model.probability)
+
+    threads = [threading.Thread(target=worker, args=(model,)) for model in models]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_entries_of_unloaded_model_are_dropped():
+    cache = PredictionCache(max_entries=100)
+    old_model, new_model = FakeScorer(0.9), FakeScorer(0.1)
+    cache.score(X, old_model.score, model_token=old_model)
+    assert len(cache._entries) == len(X)
+    del old_model
+    gc.collect()
+    cache.score(X[:1], new_model.score, model_token=new_model)
+    assert len(cache._entries) == 1
+
+
+def test_ttl_and_lru_limits():
+    cache = PredictionCache(max_entries=2, ttl_seconds=0.0)
+    scorer = FakeScorer(0.9)
+    cache.score(X, scorer.score, model_token=scorer)
+    assert len(cache._entries) == 2
+    # TTL 0: entri langsung kedaluwarsa sehingga baris di-skor ulang
+    cache.score(X[-1:], scorer.score, model_token=scorer)
+    assert scorer.rows_scored == len(X) + 1
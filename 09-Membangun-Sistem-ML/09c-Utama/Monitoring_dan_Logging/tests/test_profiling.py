@@ -0,0 +1,47 @@
+import threading
+from collections import Counter
+import pytest
+from conftest import ADMIN_HEADERS
+from profiling import SamplingProfiler, format_collapsed
+
+
+def busy_loop(stop):
+    while not stop.is_set():
+        sum(range(1000))
+
+
+def test_profile_skips_own_and_idle_threads():
+    stop, idle = threading.Event(), threading.Event()
+    threads = [threading.Thread(target=busy_loop, args=(stop,)), threading.Thread(target=idle.wait)]
+    for thread in threads:
+        thread.start()
+    try:
+        stacks, n_samples = SamplingProfiler().profile(0.1, 0.002)
+        all_stacks, _ = SamplingProfiler().profile(0.05, 0.002, include_idle=True)
+    finally:
+        stop.set()
+        idle.set()
+        for thread in threads:
+            thread.join()
+    assert n_samples > 0
+    assert any("busy_loop" in stack for stack in stacks)
+    assert not any("profile (profiling.py)" in stack for stack in stacks)
+    assert not any(stack.endswith("(threading.py)") for stack in stacks)
+    assert any(stack.endswith("(threading.py)") for stack in all_stacks)
+
+
+@pytest.mark.parametrize("interval", [0.0, 0.0005, -1.0, float("nan")])
+def test_profile_rejects_interval_below_one_millisecond(interval):
+    with pytest.raises(ValueError):
+        SamplingProfiler().profile(0.01, interval)
+
+
+def test_admin_profile_endpoint(client):
+    assert client.post("/admin/profile?seconds=0.01&interval_ms=0.1", headers=ADMIN_HEADERS).status_code == 400
+    assert client.post("/admin/profile?seconds=0.01").status_code == 403
+    response = client.post("/admin/profile?seconds=0.05&interval_ms=1&idle=1", headers=ADMIN_HEADERS)
+    assert response.status_code == 200 and response.mimetype == "text/plain"
+
+
+def test_format_collapsed_orders_by_count():
+    assert format_collapsed(Counter({"a;b": 1, "a;c": 3})) == "a;c 3\na;b 1\n"
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.tree import DecisionTreeClassifier
+from conftest import SAMPLE_RECORD
+from reason_codes import ReasonCodeExplainer, make_explainer
+
+rng = np.random.default_rng(7)
+X = np.column_stack([rng.uniform(0, 72, 300), rng.uniform(18, 118, 300), rng.integers(0, 2, (300, 3))]).astype(np.float64)
+y = ((X[:, 0] < 20) & (X[:, 2] == 1) | (X[:, 1] > 100)).astype(int)
+COLUMNS = ["tenure", "MonthlyCharges", "Contract_Two year", "TechSupport_Yes", "PaperlessBilling_Yes"]
+
+
+def test_logistic_contributions_sum_to_decision_function():
+    model = LogisticRegression(max_iter=1000).fit(X, y)
+    explainer = ReasonCodeExplainer(model, COLUMNS)
+    contributions, bias = explainer.contributions(X)
+    assert explainer.unit == "log_odds"
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), model.decision_function(X), rtol=0, atol=1e-9)
+
+
+def test_forest_contributions_sum_to_churn_probability():
+    model = RandomForestClassifier(n_estimators=10, max_depth=5, random_state=0).fit(X, y)
+    explainer = ReasonCodeExplainer(model, COLUMNS)
+    contributions, bias = explainer.contributions(X)
+    assert explainer.unit == "probability"
+    np.testing.assert_allclose(bias + contributions.sum(axis=1), model.predict_proba(X)[:, 1], rtol=0, atol=1e-9)
+
+
+def test_top_k_is_ordered_by_magnitude_and_skips_zeros():
+    model = LogisticRegression(max_iter=1000).fit(X, y)
+    explainer = ReasonCodeExplainer(model, COLUMNS)
+    rows = X[:20].copy()
+    rows[:, 2:] = 0.0  # kolom one-hot nol -> kontribusi nol, tidak boleh muncul
+    reasons = explainer.top_k(rows, k=len(COLUMNS))
+    contributions, _ = explainer.contributions(rows)
+    for row_reasons, row_contributions in zip(reasons, contributions):
+        assert {reason["feature"] for reason in row_reasons} == {"tenure", "MonthlyCharges"}
+        magnitudes = [abs(reason["contribution"]) for reason in row_reasons]
+        assert magnitudes == sorted(magnitudes, reverse=True)
+        for reason in row_reasons:
+            assert reason["contribution"] == row_contributions[COLUMNS.index(reason["feature"])]
+
+    top_one = explainer.top_k(X[:5], k=1)
+    expected = np.abs(explainer.contributions(X[:5])[0]).argmax(axis=1)
+    assert [row[0]["feature"] for row in top_one] == [COLUMNS[index] for index in expected]
+    assert explainer.top_k(X[:0], k=3) == [] and explainer.top_k(X[:2], k=0) == [[], []]
+
+
+def test_unsupported_model_has_no_explainer():
+    class Scorer:
+        model = DecisionTreeClassifier(max_depth=3).fit(X, y)
+        positive_index = 1
+
+    assert make_explainer(Scorer(), COLUMNS) is None
+
+
+def test_predict_explain_returns_reasons(client, exporter):
+    response = client.post("/predict?explain=true&top_k=2", json=[SAMPLE_RECORD, SAMPLE_RECORD])
+    assert response.status_code == 200
+    assert response.json["reason_unit"] == "log_odds"
+    assert len(response.json["reasons"]) == 2 and all(len(row) <= 2 for row in response.json["reasons"])
+    assert all(reason["feature"] in exporter.final_columns for reason in response.json["reasons"][0])
+    assert client.post("/predict?explain=true&top_k=0", json=[SAMPLE_RECORD]).status_code == 400
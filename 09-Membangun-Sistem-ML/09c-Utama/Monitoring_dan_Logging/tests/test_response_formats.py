@@ -0,0 +1,80 @@
+import asyncio
+import json
+import numpy as np
+import pytest
+from conftest import SAMPLE_RECORD, call_asgi
+from response_formats import (ARROW, FLOAT32, JSON, MSGPACK, UnsupportedFormat, decode_float32_response, decode_request,
+                              encode_response, negotiate, request_format)
+
+RESPONSE = {'predictions': np.array([1, 0]), 'probabilities_churn': np.array([0.75, 0.125]),
+            'reasons': [[{'feature': 'tenure', 'contribution': 0.5}], []], 'reason_unit': 'log_odds'}
+
+
+@pytest.mark.parametrize("accept, expected", [
+    (None, JSON), ("*/*", JSON), ("application/x-msgpack", MSGPACK),
+    (FLOAT32, FLOAT32), ("application/octet-stream", None), ("application/vnd.apache.arrow.file", None),
+    ("text/html;q=0.9, application/vnd.apache.arrow.stream;q=0.5", ARROW),
+    ("application/json;q=0.1, application/msgpack", MSGPACK), ("text/html", None), ("application/msgpack;q=0", None),
+])
+def test_negotiate(accept, expected):
+    assert negotiate(accept) == expected
+
+
+@pytest.mark.parametrize("content_type, expected", [
+    (None, JSON), ("", JSON), ("Application/JSON", JSON), ("application/x-msgpack", MSGPACK), (ARROW, ARROW),
+    (FLOAT32, None), ("application/octet-stream", None), ("application/vnd.apache.arrow.file", None),
+])
+def test_request_format(content_type, expected):
+    if expected is None:
+        with pytest.raises(UnsupportedFormat):
+            request_format(content_type)
+    else:
+        assert request_format(content_type) == expected
+
+
+def test_msgpack_and_arrow_keep_reasons():
+    from churn_client import decode_response
+    for mimetype in (MSGPACK, ARROW):
+        decoded = decode_response(mimetype, encode_response(RESPONSE, mimetype))
+        assert decoded['predictions'].tolist() == [1, 0]
+        assert decoded['probabilities_churn'].tolist() == [0.75, 0.125]
+        assert decoded['reasons'] == RESPONSE['reasons'] and decoded['reason_unit'] == 'log_odds'
+
+
+def test_float32_roundtrip_and_refuses_reasons():
+    response = {key: RESPONSE[key] for key in ('predictions', 'probabilities_churn')}
+    predictions, probabilities = decode_float32_response(encode_response(response, FLOAT32))
+    assert predictions.tolist() == [1, 0] and probabilities.tolist() == [0.75, 0.125]
+    with pytest.raises(UnsupportedFormat):
+        encode_response(RESPONSE, FLOAT32)
+    with pytest.raises(UnsupportedFormat):
+        decode_request(FLOAT32, b"")
+
+
+def test_flask_explain_with_float32_is_not_acceptable(client):
+    body = [SAMPLE_RECORD, SAMPLE_RECORD]
+    assert client.post("/predict?explain=true", json=body, headers={"Accept": FLOAT32}).status_code == 406
+    assert client.post("/predict", json=body, headers={"Accept": "application/octet-stream"}).status_code == 406
+    response = client.post("/predict?explain=true&top_k=2", json=body, headers={"Accept": ARROW})
+    assert response.status_code == 200 and response.mimetype == ARROW
+    from churn_client import decode_response
+    reasons = decode_response(ARROW, response.data)['reasons']
+    assert len(reasons) == 2 and all(len(row) <= 2 for row in reasons)
+    for content_type in (FLOAT32, "application/octet-stream", "application/vnd.apache.arrow.file"):
+        assert client.post("/predict", data=b"\0" * 8, content_type=content_type).status_code == 415
+
+
+def test_asgi_explain_with_float32_is_not_acceptable(exporter):
+    import asgi_app
+    body = json.dumps([SAMPLE_RECORD]).encode()
+
+    async def run():
+        return (await call_asgi(asgi_app.app, "POST", "/predict", body, headers=[("Accept", FLOAT32)]),
+                await call_asgi(asgi_app.app, "POST", "/predict?explain=true", body, headers=[("Accept", FLOAT32)]),
+                await call_asgi(asgi_app.app, "POST", "/predict", b"\0" * 8,
+                                headers=[("Content-Type", "application/octet-stream")]))
+
+    plain, explained, octet_stream = asyncio.run(run())
+    assert plain[0] == 200 and len(plain[1]) == 8
+    assert explained[0] == 406
+    assert octet_stream[0] == 415
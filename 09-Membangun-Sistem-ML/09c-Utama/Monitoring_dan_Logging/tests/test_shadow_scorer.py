@@ -0,0 +1,114 @@
+import threading
+import time
+import numpy as np
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram
+from shadow_scorer import DELTA_BUCKETS, ShadowScorer
+
+X = np.zeros((4, 3))
+PREDICTIONS = np.array([1, 0, 1, 0])
+PROBABILITIES = np.array([0.75, 0.25, 0.5, 0.5])
+
+
+class FakeScorer:
+    """Challenger palsu dengan hasil tetap; bisa ditahan dengan `gate` untuk mengisi antrian."""
+
+    def __init__(self, predictions, probabilities, gate=None, fail=False):
+        self.predictions = predictions
+        self.probabilities = probabilities
+        self.gate = gate
+        self.fail = fail
+        self.entered = threading.Event()
+        self.calls = 0
+
+    def score(self, X):
+        self.calls += 1
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5)
+        if self.fail:
+            raise ValueError("challenger rusak")
+        return self.predictions, self.probabilities
+
+
+def make_metrics():
+    registry = CollectorRegistry()
+    return registry, dict(
+        rows_counter=Counter('shadow_rows', 'r', ['result'], registry=registry),
+        delta_histogram=Histogram('shadow_delta', 'd', buckets=DELTA_BUCKETS, registry=registry),
+        latency_histogram=Histogram('shadow_latency', 'l', registry=registry),
+        shed_counter=Counter('shadow_shed', 's', registry=registry),
+        errors_counter=Counter('shadow_errors', 'e', registry=registry),
+        queue_depth_gauge=Gauge('shadow_depth', 'q', registry=registry),
+    )
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "kondisi tidak terpenuhi sebelum timeout"
+        time.sleep(0.01)
+
+
+def test_compare_records_agreement_and_deltas():
+    registry, metrics = make_metrics()
+    challenger = FakeScorer(np.array([1, 1, 1, 0]), np.array([0.5, 0.75, 0.5, 0.125]))
+    shadow = ShadowScorer(challenger, **metrics)
+    assert shadow.compare(X, PREDICTIONS, PROBABILITIES) == 3
+    assert registry.get_sample_value('shadow_rows_total', {'result': 'agree'}) == 3
+    assert registry.get_sample_value('shadow_rows_total', {'result': 'disagree'}) == 1
+    assert registry.get_sample_value('shadow_delta_count') == 4
+    # Selisih bertanda -0.25, 0.5, 0.0, -0.375 (bucket kumulatif)
+    assert [registry.get_sample_value('shadow_delta_bucket', {'le': le}) for le in ('-0.25', '-0.1', '0.01', '0.5')] == [2, 2, 3, 4]
+    assert registry.get_sample_value('shadow_latency_count') == 1
+
+
+def test_submit_scores_in_background():
+    registry, metrics = make_metrics()
+    challenger = FakeScorer(PREDICTIONS, PROBABILITIES)
+    shadow = ShadowScorer(challenger, **metrics)
+    assert shadow.submit(X, PREDICTIONS, PROBABILITIES)
+    wait_for(lambda: registry.get_sample_value('shadow_rows_total', {'result': 'agree'}) == len(X))
+    assert registry.get_sample_value('shadow_depth') == 0
+
+
+def test_full_queue_sheds_rows_without_blocking():
+    registry, metrics = make_metrics()
+    gate = threading.Event()
+    challenger = FakeScorer(PREDICTIONS, PROBABILITIES, gate=gate)
+    shadow = ShadowScorer(challenger, max_queue=1, **metrics)
+    try:
+        assert shadow.submit(X, PREDICTIONS, PROBABILITIES)
+        # Worker sedang tertahan di batch pertama, jadi antrian (1 slot) terisi oleh batch kedua
+        assert challenger.entered.wait(5)
+        assert shadow.submit(X, PREDICTIONS, PROBABILITIES)
+        start = time.perf_counter()
+        assert not shadow.submit(X, PREDICTIONS, PROBABILITIES)
+        assert time.perf_counter() - start < 0.5
+        assert registry.get_sample_value('shadow_shed_total') == len(X)
+        assert registry.get_sample_value('shadow_depth') == 1
+    finally:
+        gate.set()
+    wait_for(lambda: registry.get_sample_value('shadow_rows_total', {'result': 'agree'}) == 2 * len(X))
+
+
+def test_failing_challenger_is_counted_and_worker_survives():
+    registry, metrics = make_metrics()
+    challenger = FakeScorer(PREDICTIONS, PROBABILITIES, fail=True)
+    shadow = ShadowScorer(challenger, **metrics)
+    shadow.submit(X, PREDICTIONS, PROBABILITIES)
+    wait_for(lambda: registry.get_sample_value('shadow_errors_total') == 1)
+    challenger.fail = False
+    shadow.submit(X, PREDICTIONS, PROBABILITIES)
+    wait_for(lambda: registry.get_sample_value('shadow_rows_total', {'result': 'agree'}) == len(X))
+    assert shadow._worker.is_alive()
+
+
+def test_worker_and_queue_are_recreated_after_fork():
+    shadow = ShadowScorer(FakeScorer(PREDICTIONS, PROBABILITIES))
+    shadow._ensure_worker()
+    parent_queue = shadow._queue
+    # Meniru proses anak hasil fork: pid pemilik worker berbeda dari pid sekarang
+    shadow._worker_pid = -1
+    shadow._ensure_worker()
+    assert shadow._queue is not parent_queue
+    assert shadow._worker.is_alive()
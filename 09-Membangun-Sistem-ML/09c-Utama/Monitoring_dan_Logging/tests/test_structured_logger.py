@@ -0,0 +1,94 @@
+import ast
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+import pytest
+from prometheus_client import CollectorRegistry, Counter
+from conftest import MODULE_DIR
+from structured_logger import StructuredLogger, level_name
+
+EVENT_NAME = re.compile(r"^[a-z][a-z0-9]*(_[a-z0-9]+)*$")
+LOG_METHODS = {"debug", "info", "warning", "error", "critical"}
+
+
+def written_lines(logger, stream, n_lines, timeout=2.0):
+    """Menunggu penulis latar menulis `n_lines` baris."""
+    deadline = time.monotonic() + timeout
+    while stream.getvalue().count("\n") < n_lines and time.monotonic() < deadline:
+        logger.flush()
+        time.sleep(0.005)
+    return stream.getvalue().splitlines()
+
+
+def test_text_and_json_formats():
+    text, structured = io.StringIO(), io.StringIO()
+    text_logger, json_logger = StructuredLogger(text), StructuredLogger(structured, fmt="json")
+    text_logger.info("prediksi_gagal", error="x")
+    json_logger.warning("nilai_fitur_dilewati", feature="tenure", skipped=2)
+    assert written_lines(text_logger, text, 1) == ["[INFO] prediksi_gagal error=x"]
+    record = json.loads(written_lines(json_logger, structured, 1)[0])
+    assert record["level"] == "WARNING" and record["event"] == "nilai_fitur_dilewati" and record["skipped"] == 2
+
+
+def test_level_and_sampling_filter_records():
+    stream = io.StringIO()
+    logger = StructuredLogger(stream, level="INFO", sample_rates={"WARNING": 0.0})
+    logger.debug("tidak_ditulis")
+    logger.warning("tidak_ditulis")
+    logger.error("ditulis")
+    assert written_lines(logger, stream, 1) == ["[ERROR] ditulis"]
+
+
+@pytest.mark.parametrize("level, expected", [("warn", "WARNING"), ("WARN", "WARNING"), ("Critical", "CRITICAL"),
+                                             ("fatal", "CRITICAL"), (" info ", "INFO")])
+def test_standard_level_spellings_are_accepted(level, expected):
+    assert level_name(level) == expected
+
+
+def test_warn_and_critical_thresholds():
+    stream = io.StringIO()
+    logger = StructuredLogger(stream, level="WARN", sample_rates={"debug": 1.0})
+    logger.info("tidak_ditulis")
+    logger.log("warn", "ditulis_warn")
+    logger.critical("ditulis_critical")
+    assert written_lines(logger, stream, 2) == ["[WARNING] ditulis_warn", "[CRITICAL] ditulis_critical"]
+    assert not StructuredLogger(io.StringIO(), level="CRITICAL").is_enabled("ERROR")
+
+
+def test_unknown_level_fails_with_clear_message():
+    with pytest.raises(ValueError, match="Level log tidak dikenal: 'VERBOSE'"):
+        StructuredLogger(io.StringIO(), level="VERBOSE")
+    with pytest.raises(ValueError, match="Level log tidak dikenal"):
+        StructuredLogger(io.StringIO()).log("TRACE", "event_uji")
+
+
+def test_server_starts_with_log_level_warn():
+    result = subprocess.run([sys.executable, "-c", "import prometheus_exporter; print(prometheus_exporter.logger.level)"],
+                            cwd=MODULE_DIR, env={**os.environ, "LOG_LEVEL": "WARN"}, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip().splitlines()[-1] == "30"
+
+
+def test_full_queue_drops_and_counts():
+    dropped = Counter("dropped", "d", ["level"], registry=CollectorRegistry())
+    logger = StructuredLogger(io.StringIO(), max_queue=1, dropped_counter=dropped)
+    logger._ensure_worker = lambda: None  # tanpa penulis latar, antrian tidak pernah dikosongkan
+    for _ in range(5):
+        logger.info("event_uji")
+    assert dropped.labels(level="info")._value.get() == 4
+
+
+@pytest.mark.parametrize("module", ["prometheus_exporter.py", "asgi_app.py"])
+def test_event_names_are_snake_case(module):
+    with open(os.path.join(MODULE_DIR, module)) as f:
+        tree = ast.parse(f.read())
+    events = [node.args[0] for node in ast.walk(tree)
+              if isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and node.func.attr in LOG_METHODS
+              and isinstance(node.func.value, (ast.Name, ast.Attribute)) and "logger" in ast.unparse(node.func.value)]
+    assert events
+    for event in events:
+        assert isinstance(event, ast.Constant) and EVENT_NAME.match(event.value), ast.unparse(event)
@@ -0,0 +1,126 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from werkzeug.test import Client
+from werkzeug.wrappers import Response
+from replay_traffic import count_rows, find_logs, run_replay
+from traffic_recorder import REPLAY_HEADER, TrafficRecorder, TrafficRecordingMiddleware, read_traffic
+
+
+def wait_for_records(path, n, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        records = read_traffic(find_logs([path]))
+        if len(records) >= n or time.monotonic() > deadline:
+            return records
+        time.sleep(0.01)
+
+
+def echo_app(environ, start_response):
+    """Aplikasi WSGI yang mengembalikan body request, untuk memastikan middleware tidak menghabiskannya."""
+    body = environ['wsgi.input'].read(int(environ.get('CONTENT_LENGTH') or 0))
+    return Response(body)(environ, start_response)
+
+
+def test_recorder_roundtrip_and_file_rotation(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path), max_file_bytes=200)
+    for i in range(6):
+        recorder.record("POST", "/predict", {"Content-Type": "application/json"}, json.dumps([{"i": i}]).encode())
+        time.sleep(0.02)
+    records = wait_for_records(str(tmp_path), 6)
+    assert [json.loads(record["body"])[0]["i"] for record in records] == list(range(6))
+    assert [record["t"] for record in records] == sorted(record["t"] for record in records)
+    assert len(find_logs([str(tmp_path)])) > 1
+
+
+def test_middleware_records_predict_only_and_keeps_body(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path))
+    client = Client(TrafficRecordingMiddleware(echo_app, recorder))
+    body = json.dumps([{"tenure": 1}, {"tenure": 2}])
+    headers = {"Content-Type": "application/json", "X-Model-Name": "challenger", "Authorization": "rahasia"}
+    assert client.post("/predict?explain=true", data=body, headers=headers).get_data(as_text=True) == body
+    client.post("/predict/bulk", data=body, headers=headers)
+    client.post("/predict", data=body, headers={**headers, REPLAY_HEADER: "1"})
+    client.post("/admin/features", data=body, headers=headers)
+    client.post("/predict/by-id", data=json.dumps({"customerIDs": ["a"]}), headers=headers)
+
+    # Antrian ditulis berurutan: jika request terakhir sudah tercatat, yang dilewati memang tidak direkam
+    records = wait_for_records(str(tmp_path), 2)
+    assert [record["path"] for record in records] == ["/predict?explain=true", "/predict/by-id"]
+    assert records[0]["headers"] == {"Content-Type": "application/json", "X-Model-Name": "challenger"}
+    assert records[0]["body"] == body.encode()
+    assert [count_rows(record) for record in records] == [2, 1]
+
+
+def test_count_rows_for_binary_and_invalid_bodies():
+    assert count_rows({"headers": {"Content-Type": "application/x-msgpack"}, "body": b"\x92\x01\x02"}) == 1
+    assert count_rows({"headers": {}, "body": b"not json"}) == 1
+    assert count_rows({"headers": {}, "body": b'{"customerIDs": ["a", "b", "c"]}'}) == 3
+
+
+def test_find_logs_expands_directories(tmp_path):
+    for name in ("traffic-2-1-0001.msgpack", "traffic-1-1-0001.msgpack", "other.json"):
+        (tmp_path / name).write_bytes(b"")
+    extra = str(tmp_path / "extra.msgpack")
+    assert find_logs([str(tmp_path), extra]) == [str(tmp_path / "traffic-1-1-0001.msgpack"),
+                                                 str(tmp_path / "traffic-2-1-0001.msgpack"), extra]
+
+
+@pytest.fixture
+def target():
+    """Server palsu yang mencatat (path, header replay, waktu tiba) setiap request."""
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, self.headers.get(REPLAY_HEADER), time.perf_counter()))
+            status = 404 if self.path.startswith("/predict/unknown") else 200
+            self.send_response(status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"{}")
+
+        def log_message(self, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", received
+    httpd.shutdown()
+
+
+def make_records():
+    body = json.dumps([{"tenure": 1}, {"tenure": 2}]).encode()
+    headers = {"Content-Type": "application/json"}
+    return [{"t": 100.0 + offset, "method": "POST", "path": path, "headers": headers, "body": body}
+            for offset, path in [(0.0, "/predict"), (0.1, "/predict"), (0.2, "/predict?explain=true"),
+                                 (2.0, "/predict"), (2.4, "/predict/unknown/1")]]
+
+
+def test_replay_keeps_recorded_spacing(target):
+    url, received = target
+    result = asyncio.run(run_replay(url, make_records(), speed=4.0, concurrency=4, warmup_requests=1))
+    assert [path for path, _, _ in received] == ["/predict", "/predict", "/predict?explain=true", "/predict",
+                                                 "/predict/unknown/1"]
+    assert {replay for _, replay, _ in received} == {"1"}
+    # Jeda 1.8 detik di rekaman menjadi ~0.45 detik pada speed 4x
+    assert received[3][2] - received[2][2] >= 0.4
+    assert result["requests"] == 4 and result["ok"] == 3
+    assert result["config"]["warmup_requests"] == 1 and result["config"]["batch_size"] == 2
+    assert result["config"]["recorded_seconds"] == pytest.approx(2.3)
+    assert sorted(result["by_path"]) == ["/predict", "/predict/unknown/1"]
+    assert result["by_path"]["/predict"]["requests"] == 3 and result["by_path"]["/predict/unknown/1"]["errors"] == 1
+
+
+def test_unpaced_replay_and_empty_measurement(target):
+    url, _ = target
+    start = time.perf_counter()
+    result = asyncio.run(run_replay(url, make_records(), speed=0, concurrency=2))
+    assert time.perf_counter() - start < 2.0
+    assert result["config"]["mode"] == "replay maks" and result["requests"] == 5
+    with pytest.raises(ValueError):
+        asyncio.run(run_replay(url, make_records(), warmup_requests=5))
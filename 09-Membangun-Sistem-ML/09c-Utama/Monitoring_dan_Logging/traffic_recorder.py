@@ -0,0 +1,156 @@
+import io
+import os
+import queue
+import random
+import threading
+import time
+import msgpack
+
+# Perekam traffic untuk benchmark realistis: body request prediksi beserta timestamp-nya ditulis
+# ke log MessagePack (satu map per request, berurutan) yang bisa diputar ulang dengan
+# replay_traffic.py. Seperti structured_logger, perekaman tidak pernah menahan request:
+# record masuk antrian berbatas dan ditulis oleh thread latar; jika antrian penuh, record dibuang.
+
+# Header yang ikut direkam karena mempengaruhi cara request dilayani
+RECORDED_HEADERS = ('Content-Type', 'Accept', 'X-Model-Name', 'X-Model-Version', 'X-Client-Id')
+# /predict/bulk tidak direkam: body-nya streaming dan bisa sangat besar
+EXCLUDED_PATHS = ('/predict/bulk',)
+# Request dari replay_traffic.py membawa header ini dan tidak direkam ulang
+REPLAY_HEADER = 'X-Traffic-Replay'
+
+
+def recorded_headers(headers):
+    """Subset RECORDED_HEADERS dari mapping header yang case-insensitive (mis. header Starlette)."""
+    return {name: headers[name] for name in RECORDED_HEADERS if headers.get(name)}
+
+
+def read_traffic(paths):
+    """Membaca satu atau beberapa file log traffic; mengembalikan list record urut waktu."""
+    records = []
+    for path in paths:
+        with open(path, "rb") as f:
+            records.extend(msgpack.Unpacker(f, raw=False))
+    records.sort(key=lambda record: record["t"])
+    return records
+
+
+class TrafficRecorder:
+    """
+    Menulis record {t, method, path, headers, body} ke `output_dir/traffic-<waktu>-<pid>-<n>.msgpack`.
+    File baru dibuat setiap `max_file_bytes`. `sample_rate` < 1 hanya merekam sebagian request.
+    """
+
+    def __init__(self, output_dir, sample_rate=1.0, max_queue=10000, max_file_bytes=256 * 1024 * 1024,
+                 recorded_counter=None, dropped_counter=None):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        self.max_queue = max_queue
+        self.max_file_bytes = max_file_bytes
+        self.recorded_counter = recorded_counter
+        self.dropped_counter = dropped_counter
+        os.makedirs(output_dir, exist_ok=True)
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._worker = None
+        self._worker_pid = None
+        self._file = None
+        self._file_bytes = 0
+        self._file_index = 0
+
+    # --- 1. Jalur Request ---
+    def record(self, method, path, headers, body):
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait({"t": time.time(), "method": method, "path": path, "headers": headers, "body": body})
+        except queue.Full:
+            if self.dropped_counter is not None:
+                self.dropped_counter.inc()
+
+    # --- 2. Penulis Latar ---
+    def _ensure_worker(self):
+        # Thread tidak ikut tersalin saat fork, jadi writer (dan antriannya) dibuat ulang per proses
+        if self._worker_pid == os.getpid() and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker_pid == os.getpid() and self._worker.is_alive():
+                return
+            if self._worker_pid is not None and self._worker_pid != os.getpid():
+                self._queue = queue.Queue(maxsize=self.max_queue)
+                self._file = None
+            self._worker = threading.Thread(target=self._run, name="traffic-recorder", daemon=True)
+            self._worker.start()
+            self._worker_pid = os.getpid()
+
+    def _open_next_file(self):
+        if self._file is not None:
+            self._file.close()
+        self._file_index += 1
+        name = f"traffic-{time.strftime('%Y%m%dT%H%M%S', time.gmtime())}-{os.getpid()}-{self._file_index:04d}.msgpack"
+        self._file = open(os.path.join(self.output_dir, name), "ab")
+        self._file_bytes = 0
+
+    def _write(self, records):
+        packer = msgpack.Packer()
+        data = b"".join(packer.pack(record) for record in records)
+        if self._file is None or self._file_bytes + len(data) > self.max_file_bytes:
+            self._open_next_file()
+        self._file.write(data)
+        # Flush per batch agar replay bisa membaca file yang masih aktif
+        self._file.flush()
+        self._file_bytes += len(data)
+        if self.recorded_counter is not None:
+            self.recorded_counter.inc(len(records))
+
+    def _run(self):
+        while True:
+            records = [self._queue.get()]
+            while len(records) < 256:
+                try:
+                    records.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(records)
+            except Exception as e:
+                if self.dropped_counter is not None:
+                    self.dropped_counter.inc(len(records))
+                print(f"[ERROR] Gagal menulis log traffic: {e}")
+
+
+# --- 3. Middleware WSGI ---
+class TrafficRecordingMiddleware:
+    """
+    Merekam request ke path berawalan `path_prefixes` sebelum diteruskan ke aplikasi (termasuk yang
+    nanti ditolak admission control, agar replay mereproduksi beban yang ditawarkan).
+    Body dibaca sekali lalu dikembalikan ke environ sebagai BytesIO. Request tanpa Content-Length
+    (chunked) atau lebih besar dari `max_body_bytes` tidak direkam.
+    """
+
+    def __init__(self, app, recorder, path_prefixes=('/predict',), max_body_bytes=1024 * 1024):
+        self.app = app
+        self.recorder = recorder
+        self.path_prefixes = tuple(path_prefixes)
+        self.max_body_bytes = max_body_bytes
+
+    def __call__(self, environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if (path.startswith(self.path_prefixes) and not path.startswith(EXCLUDED_PATHS)
+                and not environ.get('HTTP_' + REPLAY_HEADER.upper().replace('-', '_'))):
+            try:
+                length = int(environ.get('CONTENT_LENGTH') or -1)
+            except ValueError:
+                length = -1
+            if 0 <= length <= self.max_body_bytes:
+                body = environ['wsgi.input'].read(length)
+                environ['wsgi.input'] = io.BytesIO(body)
+                query = environ.get('QUERY_STRING')
+                headers = {}
+                for name in RECORDED_HEADERS:
+                    key = 'CONTENT_TYPE' if name == 'Content-Type' else 'HTTP_' + name.upper().replace('-', '_')
+                    if environ.get(key):
+                        headers[name] = environ[key]
+                self.recorder.record(environ.get('REQUEST_METHOD', 'POST'), path + (f"?{query}" if query else ""),
+                                     headers, body)
+        return self.app(environ, start_response)